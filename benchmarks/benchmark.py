@@ -0,0 +1,223 @@
+"""Вимірювання швидкодії основних операцій станції на синтетичних автопарках різного розміру.
+
+Запуск (з кореня репозиторію):
+    python benchmarks/benchmark.py --sizes 100 1000 10000 100000 --output bench.json
+    python benchmarks/benchmark.py --output bench.json --compare baseline.json
+
+Для кожного розміру автопарку будується реєстр з автобусами, маршрутами та історією рейсів
+за допомогою справжніх моделей і класів станції, після чого вимірюється час одного виклику
+кожної операції (найкращий з кількох повторів). Результати записуються у JSON разом
+з показником зростання часу від розміру автопарку (нахил у логарифмічному масштабі:
+~0 - O(1), ~1 - O(n)). У режимі порівняння результати звіряються з раніше збереженими,
+і за наявності регресій процес завершується з кодом 1.
+"""
+import argparse
+import json
+import math
+import os
+import platform
+import random
+import sys
+from datetime import (datetime,
+                      timedelta)
+from timeit import Timer
+
+# Модулі станції імпортуються без пакета, як у каталозі buspark.
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.dirname(os.path.abspath(__file__))), "buspark"))
+
+from models import (Park,
+                    Driver,
+                    Bus,
+                    Departure)
+from registry import FleetRegistry
+from workers import (Manager,
+                     Dispatcher,
+                     Analytic)
+from station_decorators import (are_here_buses,
+                                are_here_buses_tied_to_route,
+                                are_here_free_buses,
+                                are_here_routes,
+                                are_here_departed_buses,
+                                are_here_departures)
+
+
+DEFAULT_SIZES = (100, 1_000, 10_000, 100_000)
+GUARDS = (are_here_buses,
+          are_here_buses_tied_to_route,
+          are_here_free_buses,
+          are_here_routes,
+          are_here_departed_buses,
+          are_here_departures)
+
+
+class Fleet:
+    """Синтетичний автопарк: реєстр, класи станції та випадково обрані автобуси для вимірювань."""
+
+    def __init__(self, size: int, trips_per_bus: int, seed: int):
+        generator = random.Random(seed)
+        self.park = Park()
+        self.park.clear()
+        self.registry = FleetRegistry()
+        self.manager = Manager(self.registry)
+        self.dispatcher = Dispatcher(self.registry)
+        self.analytic = Analytic(self.registry)
+
+        routes = [self.manager.create_route(f"Місто {index}", f"Місто {index + 1}")
+                  for index in range(max(1, size // 20))]
+        buses = [self.manager.create_bus(f"BUS{index:06}", "Водій", f"Номер{index}") for index in range(size)]
+
+        started_at = datetime.now() - timedelta(days = 1)
+        for bus in buses:
+            self.dispatcher.change_route(bus, generator.choice(routes))
+            departure_time = started_at + timedelta(minutes = generator.randrange(60))
+            for _ in range(trips_per_bus):
+                arrival_time = departure_time + timedelta(minutes = generator.randrange(20, 180))
+                self._travel(bus, departure_time, arrival_time)
+                departure_time = arrival_time + timedelta(minutes = generator.randrange(5, 30))
+
+        # Половина автопарку знаходиться у дорозі.
+        departed_buses = generator.sample(buses, size // 2)
+        for bus in departed_buses:
+            self.dispatcher.depart_bus(bus)
+        self.departed_bus = departed_buses[len(departed_buses) // 2]
+        self.parked_bus = list(self.park.parked_buses)[len(self.park) // 2]
+
+
+    def _travel(self, bus, departure_time: datetime, arrival_time: datetime):
+        departure = Departure(bus = bus, route = bus.route)
+        departure.start_travel(departure_time)
+        self.registry.open_departure(bus, departure)
+        self.registry.close_departure(bus, arrival_time)
+
+
+    def cases(self) -> dict:
+        """Повертає операції, що вимірюються, у вигляді функцій без аргументів."""
+        guarded = [guard(lambda station: None) for guard in GUARDS]
+
+        def check_guards():
+            for guard in guarded:
+                guard(self)
+
+        def park_remove_bus():
+            self.park.remove_bus(self.parked_bus)
+            self.park.add_bus(self.parked_bus)
+
+        state = self.registry.export_state()
+
+        def restore_state():
+            FleetRegistry().restore_state(state)
+
+        return {
+            "models.bus_validated": lambda: Bus(number = "BUS", driver = Driver(first_name = "Водій", second_name = "Номер")),
+            "models.bus_trusted": lambda: Bus.construct(number = "BUS",
+                                                        driver = Driver.construct(first_name = "Водій", second_name = "Номер")),
+            "registry.restore_state": restore_state,
+            "analytic.get_not_departed_buses": self.analytic.get_not_departed_buses,
+            "analytic.get_active_departures": self.analytic.get_active_departures,
+            "analytic.analyze_buses": self.analytic.analyze_buses,
+            "registry.get_bus_active_departure": lambda: self.registry.get_bus_active_departure(self.departed_bus),
+            "park.remove_bus": park_remove_bus,
+            "station_decorators.guards": check_guards,
+        }
+
+
+def measure(function, repeat: int) -> float:
+    """Повертає найменший час одного виклику функції у секундах."""
+    timer = Timer(function)
+    number, _ = timer.autorange()
+    return min(timer.repeat(repeat, number)) / number
+
+
+def growth_exponent(timings: dict[str, float]) -> float | None:
+    """Повертає нахил залежності часу від розміру автопарку у логарифмічному масштабі."""
+    points = sorted((int(size), seconds) for size, seconds in timings.items())
+    if len(points) < 2:
+        return None
+    (first_size, first_time), (last_size, last_time) = points[0], points[-1]
+    return math.log(last_time / first_time) / math.log(last_size / first_size)
+
+
+def run(sizes: list[int], trips_per_bus: int, repeat: int, seed: int) -> dict:
+    """Будує автопарки заданих розмірів та вимірює операції для кожного з них.
+
+    Returns:
+        dict: Середовище запуску, час кожної операції за розміром автопарку та показники зростання.
+    """
+    results: dict[str, dict[str, float]] = {}
+    for size in sizes:
+        print(f"Автопарк з {size} автобусів...", file = sys.stderr)
+        fleet = Fleet(size, trips_per_bus, seed)
+        for name, function in fleet.cases().items():
+            results.setdefault(name, {})[str(size)] = measure(function, repeat)
+    return {
+        "python": platform.python_version(),
+        "platform": platform.platform(),
+        "trips_per_bus": trips_per_bus,
+        "sizes": sizes,
+        "results": results,
+        "exponents": {name: growth_exponent(timings) for name, timings in results.items()},
+    }
+
+
+def compare(current: dict, baseline: dict, tolerance: float, exponent_tolerance: float) -> list[str]:
+    """Порівнює результати з базовими та повертає опис регресій.
+
+    Регресією вважається операція, час якої перевищує базовий більше ніж у (1 + tolerance) разів,
+    або показник зростання якої перевищує базовий більше ніж на exponent_tolerance
+    (наприклад, операція, що була O(1), стала O(n)).
+    """
+    regressions = []
+    for name, timings in current["results"].items():
+        baseline_timings = baseline["results"].get(name, {})
+        for size, seconds in timings.items():
+            baseline_seconds = baseline_timings.get(size)
+            if baseline_seconds is None:
+                continue
+            ratio = seconds / baseline_seconds
+            print(f"{name:<40} {size:>7} {baseline_seconds * 1e6:>12.2f} мкс -> {seconds * 1e6:>12.2f} мкс ({ratio:.2f}x)")
+            if ratio > 1 + tolerance:
+                regressions.append(f"{name} [{size}]: у {ratio:.2f} разів повільніше")
+
+        # Показники зростання порівнюються лише за розмірами, що є в обох результатах.
+        common_sizes = timings.keys() & baseline_timings.keys()
+        exponent = growth_exponent({size: timings[size] for size in common_sizes})
+        baseline_exponent = growth_exponent({size: baseline_timings[size] for size in common_sizes})
+        if exponent is not None and baseline_exponent is not None and exponent - baseline_exponent > exponent_tolerance:
+            regressions.append(f"{name}: зростання {baseline_exponent:.2f} -> {exponent:.2f}")
+    return regressions
+
+
+def main(arguments: list[str] | None = None) -> int:
+    parser = argparse.ArgumentParser(description = "Вимірювання швидкодії операцій станції")
+    parser.add_argument("--sizes", type = int, nargs = "+", default = list(DEFAULT_SIZES),
+                        help = "розміри автопарків (кількість автобусів)")
+    parser.add_argument("--trips", type = int, default = 3, help = "кількість завершених рейсів кожного автобуса")
+    parser.add_argument("--repeat", type = int, default = 3, help = "кількість повторів вимірювання")
+    parser.add_argument("--seed", type = int, default = 0, help = "зерно генератора випадкових чисел")
+    parser.add_argument("--output", help = "файл для запису результатів у JSON")
+    parser.add_argument("--compare", help = "файл з базовими результатами для порівняння")
+    parser.add_argument("--tolerance", type = float, default = 0.5,
+                        help = "допустиме відносне сповільнення операції")
+    parser.add_argument("--exponent-tolerance", type = float, default = 0.3,
+                        help = "допустиме збільшення показника зростання")
+    options = parser.parse_args(arguments)
+
+    current = run(options.sizes, options.trips, options.repeat, options.seed)
+    if options.output:
+        with open(options.output, "w", encoding = "utf-8") as file:
+            json.dump(current, file, ensure_ascii = False, indent = 2)
+    else:
+        print(json.dumps(current, ensure_ascii = False, indent = 2))
+
+    if options.compare:
+        with open(options.compare, encoding = "utf-8") as file:
+            baseline = json.load(file)
+        regressions = compare(current, baseline, options.tolerance, options.exponent_tolerance)
+        for regression in regressions:
+            print(f"[!] Регресія: {regression}")
+        return 1 if regressions else 0
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
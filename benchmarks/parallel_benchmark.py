@@ -0,0 +1,95 @@
+"""Вимірювання масштабування паралельної аналітики (Analytic.analyze_buses_in_period) за кількістю процесів.
+
+Запуск (з кореня репозиторію):
+    python benchmarks/parallel_benchmark.py --departures 20000000 --buses 10000 --workers 1 2 4 8 --output parallel_bench.json
+
+Будується синтетичний стан станції (див. store_benchmark.build_state), після чого для кожного способу поділу
+історії (TIME, BUS) та кожної кількості процесів вимірюється час підсумків за весь період історії
+(найкращий з кількох повторів; пул процесів запускається до вимірювання) та прискорення відносно одного процесу.
+Результат кожного запуску звіряється з результатом у поточному процесі.
+"""
+import argparse
+import json
+import os
+import platform
+import sys
+from datetime import timedelta
+
+# Модулі станції імпортуються без пакета, як у каталозі buspark.
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.dirname(os.path.abspath(__file__))), "buspark"))
+
+from registry import FleetRegistry
+from workers import Analytic
+from models import PartitionEnum
+from history import from_microseconds
+from parallel_analytics import np
+from store_benchmark import build_state
+from benchmark import measure
+
+
+def run(departures: int, buses: int, workers: list[int], repeat: int, seed: int) -> dict:
+    """Будує реєстр та вимірює підсумки за період для кожного способу поділу та кількості процесів.
+
+    Returns:
+        dict: Середовище запуску, час та прискорення для кожного способу поділу і кількості процесів.
+    """
+    print(f"Генерація {departures} рейсів для {buses} автобусів...", file = sys.stderr)
+    registry = FleetRegistry()
+    registry.restore_state(build_state(departures, buses, seed))
+    analytic = Analytic(registry)
+    departure_times = registry.get_history_columns()[2]
+    start = from_microseconds(min(departure_times))
+    end = from_microseconds(max(departure_times)) + timedelta(microseconds = 1)
+
+    def summary(workers_count: int, partition: PartitionEnum) -> list[tuple]:
+        return [(result.bus.id, result.total_count, result.finished_time)
+                for result in analytic.analyze_buses_in_period(start, end, partition, workers_count)]
+
+    expected = summary(1, PartitionEnum.TIME)
+    results = {}
+    for partition in PartitionEnum:
+        for workers_count in workers:
+            print(f"Вимірювання: {partition.name}, процесів: {workers_count}...", file = sys.stderr)
+            if summary(workers_count, partition) != expected:
+                raise AssertionError(f"Результат {partition.name} з {workers_count} процесами відрізняється від послідовного!")
+            results.setdefault(partition.name, {})[str(workers_count)] = measure(
+                lambda: analytic.analyze_buses_in_period(start, end, partition, workers_count), repeat
+            )
+    return {
+        "python": platform.python_version(),
+        "platform": platform.platform(),
+        "cpu_count": os.cpu_count(),
+        "numpy": np is not None,
+        "departures": departures,
+        "buses": buses,
+        "results": results,
+        "speedup": {partition: {count: timings[str(workers[0])] / seconds for count, seconds in timings.items()}
+                    for partition, timings in results.items()},
+    }
+
+
+def main(arguments: list[str] | None = None) -> int:
+    parser = argparse.ArgumentParser(description = "Масштабування паралельної аналітики за кількістю процесів")
+    parser.add_argument("--departures", type = int, default = 5_000_000, help = "кількість завершених рейсів")
+    parser.add_argument("--buses", type = int, default = 10_000, help = "кількість автобусів")
+    parser.add_argument("--workers", type = int, nargs = "+", default = [1, 2, 4], help = "кількість процесів")
+    parser.add_argument("--repeat", type = int, default = 3, help = "кількість повторів вимірювання")
+    parser.add_argument("--seed", type = int, default = 0, help = "зерно генератора випадкових чисел")
+    parser.add_argument("--output", help = "файл для запису результатів у JSON")
+    options = parser.parse_args(arguments)
+
+    current = run(options.departures, options.buses, options.workers, options.repeat, options.seed)
+    for partition, timings in current["results"].items():
+        for count, seconds in timings.items():
+            print(f"{partition:<5} процесів {count:>3}: {seconds * 1e3:>10.1f} мс | "
+                  f"прискорення {current['speedup'][partition][count]:.2f}", file = sys.stderr)
+    if options.output:
+        with open(options.output, "w", encoding = "utf-8") as file:
+            json.dump(current, file, ensure_ascii = False, indent = 2)
+    else:
+        print(json.dumps(current, ensure_ascii = False, indent = 2))
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,156 @@
+"""Порівняння швидкодії аналітики реєстру у пам'яті та сховища SQLite (sqlite_store.py) на великій історії рейсів.
+
+Запуск (з кореня репозиторію):
+    python benchmarks/store_benchmark.py --departures 10000000 --buses 10000 --output store_bench.json
+
+Будується синтетичний стан станції (маршрути, автобуси, завершені рейси, половина автопарку у дорозі),
+який відновлюється у реєстр (FleetRegistry.restore_state) та записується у сховище (FleetRegistry.sync_store).
+Після цього вимірюється час одного виклику операцій Analytic без сховища та з під'єднаним сховищем
+(найкращий з кількох повторів), а також час запису рейсу (відправлення та повернення автобуса).
+"""
+import argparse
+import json
+import os
+import platform
+import random
+import sys
+import tempfile
+from array import array
+from time import perf_counter
+
+# Модулі станції імпортуються без пакета, як у каталозі buspark.
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.dirname(os.path.abspath(__file__))), "buspark"))
+
+from registry import FleetRegistry
+from workers import (Dispatcher,
+                     Analytic)
+from sqlite_store import SqliteStore
+from history import to_microseconds
+from clock import current_time
+from benchmark import measure
+
+
+def build_state(departures: int, buses: int, seed: int) -> dict:
+    """Повертає стан реєстру (у форматі FleetRegistry.export_state) з заданою кількістю завершених рейсів."""
+    generator = random.Random(seed)
+    route_count = max(1, buses // 20)
+    trips_per_bus, extra_trips = divmod(departures, buses)
+    bus_ids, route_keys, departure_times, arrival_times = array('q'), array('q'), array('q'), array('q')
+    bus_routes, totals, active_departures = [], [], []
+    now = to_microseconds(current_time())
+    for bus_id in range(buses):
+        route_key = generator.randrange(route_count)
+        trip_count = trips_per_bus + (bus_id < extra_trips)
+        # Рейси автобуса йдуть один за одним і завершуються до поточного часу.
+        moment = now - trip_count * 4 * 3_600_000_000
+        finished_time = 0
+        for _ in range(trip_count):
+            travel_time = generator.randrange(20, 180) * 60_000_000
+            bus_ids.append(bus_id)
+            route_keys.append(route_key)
+            departure_times.append(moment)
+            arrival_times.append(moment + travel_time)
+            finished_time += travel_time
+            moment += 4 * 3_600_000_000
+        bus_routes.append((bus_id, f"BUS{bus_id:07}", "Водій", f"Номер{bus_id % 1_000}", route_key))
+        is_active = bus_id % 2 == 0
+        if is_active:
+            active_departures.append((f"BUS{bus_id:07}", now - generator.randrange(1, 120) * 60_000_000))
+        totals.append((f"BUS{bus_id:07}", trip_count + is_active, finished_time / 1_000_000))
+    return {
+        "next_route_key": route_count,
+        "next_bus_id": buses,
+        "total_trips": departures + len(active_departures),
+        "routes": [(key, f"Місто {key}", f"Місто {key + 1}") for key in range(route_count)],
+        "retired_routes": [],
+        "retired_buses": [],
+        "buses": bus_routes,
+        "active_departures": active_departures,
+        "history": (bus_ids.tobytes(), route_keys.tobytes(), departure_times.tobytes(), arrival_times.tobytes()),
+        "totals": totals,
+    }
+
+
+def run(departures: int, buses: int, repeat: int, seed: int, path: str) -> dict:
+    """Будує реєстр та сховище і вимірює операції обома способами.
+
+    Returns:
+        dict: Середовище запуску, час побудови та час кожної операції без сховища та зі сховищем.
+    """
+    print(f"Генерація {departures} рейсів для {buses} автобусів...", file = sys.stderr)
+    state = build_state(departures, buses, seed)
+    registry = FleetRegistry()
+    registry.restore_state(state)
+    del state
+    analytic = Analytic(registry)
+    dispatcher = Dispatcher(registry)
+
+    print("Запис у сховище SQLite...", file = sys.stderr)
+    started = perf_counter()
+    store = SqliteStore(path, batch_size = 10_000)
+    registry.store = store
+    registry.sync_store()
+    store.flush()
+    load_time = perf_counter() - started
+    store_departures = store.count_departures()
+
+    route = registry.routes[0]
+    bus = registry.get_bus("BUS0000001")
+
+    def trip():
+        dispatcher.depart_bus(bus)
+        dispatcher.return_bus_to_park(bus)
+
+    cases = {
+        "analytic.get_active_departures": analytic.get_active_departures,
+        "analytic.get_route_buses": lambda: analytic.get_route_buses(route),
+        "analytic.analyze_buses": analytic.analyze_buses,
+        "analytic.analyze_bus": lambda: analytic.analyze_bus(bus),
+        "dispatcher.trip": trip,
+    }
+    results = {}
+    for backend, backend_store in (("memory", None), ("sqlite", store)):
+        print(f"Вимірювання: {backend}...", file = sys.stderr)
+        registry.store = backend_store
+        for name, function in cases.items():
+            results.setdefault(name, {})[backend] = measure(function, repeat)
+    store.close()
+    return {
+        "python": platform.python_version(),
+        "platform": platform.platform(),
+        "departures": departures,
+        "buses": buses,
+        "store_departures": store_departures,
+        "store_size": os.path.getsize(path),
+        "store_load_seconds": load_time,
+        "results": results,
+    }
+
+
+def main(arguments: list[str] | None = None) -> int:
+    parser = argparse.ArgumentParser(description = "Порівняння аналітики реєстру у пам'яті та сховища SQLite")
+    parser.add_argument("--departures", type = int, default = 1_000_000, help = "кількість завершених рейсів")
+    parser.add_argument("--buses", type = int, default = 10_000, help = "кількість автобусів")
+    parser.add_argument("--repeat", type = int, default = 3, help = "кількість повторів вимірювання")
+    parser.add_argument("--seed", type = int, default = 0, help = "зерно генератора випадкових чисел")
+    parser.add_argument("--store", help = "файл сховища (за замовчуванням - тимчасовий файл)")
+    parser.add_argument("--output", help = "файл для запису результатів у JSON")
+    options = parser.parse_args(arguments)
+
+    with tempfile.TemporaryDirectory() as directory:
+        path = options.store or os.path.join(directory, "buspark.sqlite")
+        current = run(options.departures, options.buses, options.repeat, options.seed, path)
+
+    for name, timings in current["results"].items():
+        print(f"{name:<35} пам'ять {timings['memory'] * 1e3:>10.3f} мс | SQLite {timings['sqlite'] * 1e3:>10.3f} мс",
+              file = sys.stderr)
+    if options.output:
+        with open(options.output, "w", encoding = "utf-8") as file:
+            json.dump(current, file, ensure_ascii = False, indent = 2)
+    else:
+        print(json.dumps(current, ensure_ascii = False, indent = 2))
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,101 @@
+"""Годинник станції.
+
+Моделі та класи станції отримують поточний час через цей модуль, а не datetime.now(),
+тому годинник можна замінити: симуляція (simulator.py), тести та відтворення подій
+встановлюють ManualClock і самі керують часом.
+
+Час зберігається як ціле число наносекунд від початку епохи (current_ns). Системний годинник
+відлічує його від time.monotonic_ns(), прив'язаного до системного часу один раз при створенні годинника,
+тому корекції системного часу (NTP, ручна зміна) не спотворюють тривалість рейсів.
+Значення datetime (to_datetime, current_time) обчислюються лише для відображення та звітів.
+"""
+import threading
+import time
+from contextlib import contextmanager
+from datetime import (datetime,
+                      timedelta)
+
+
+class SystemClock:
+    """Системний годинник: монотонний час, прив'язаний до системного часу при створенні."""
+
+    def __init__(self):
+        self._wall_anchor = time.time_ns()
+        self._monotonic_anchor = time.monotonic_ns()
+
+
+    def now_ns(self) -> int:
+        return self._wall_anchor + time.monotonic_ns() - self._monotonic_anchor
+
+
+class ManualClock:
+    """Годинник, час якого змінюється лише явно (методами set та advance)."""
+
+    def __init__(self, start: datetime):
+        self._now = to_ns(start)
+        self._lock = threading.Lock()
+
+
+    def now_ns(self) -> int:
+        return self._now
+
+
+    def set(self, moment: datetime | int):
+        """Встановлює час (datetime або наносекунди від початку епохи)."""
+        with self._lock:
+            self._now = moment if isinstance(moment, int) else to_ns(moment)
+
+
+    def advance(self, delta: timedelta) -> datetime:
+        with self._lock:
+            self._now += delta // timedelta(microseconds = 1) * 1_000
+            return to_datetime(self._now)
+
+
+def to_ns(moment: datetime) -> int:
+    """Перетворює datetime у кількість наносекунд від початку епохи (без втрати мікросекунд)."""
+    return int(moment.replace(microsecond = 0).timestamp()) * 1_000_000_000 + moment.microsecond * 1_000
+
+
+def to_datetime(nanoseconds: int) -> datetime:
+    """Перетворює кількість наносекунд від початку епохи у місцевий datetime (з точністю до мікросекунди)."""
+    seconds, remainder = divmod(nanoseconds, 1_000_000_000)
+    return datetime.fromtimestamp(seconds).replace(microsecond = remainder // 1_000)
+
+
+def ns_to_timedelta(nanoseconds: int) -> timedelta:
+    return timedelta(microseconds = nanoseconds // 1_000)
+
+
+_clock: SystemClock | ManualClock = SystemClock()
+
+
+def current_ns() -> int:
+    """Повертає поточний час встановленого годинника у наносекундах від початку епохи."""
+    return _clock.now_ns()
+
+
+def current_time() -> datetime:
+    """Повертає поточний час встановленого годинника як datetime (для відображення та звітів)."""
+    return to_datetime(_clock.now_ns())
+
+
+def get_clock() -> SystemClock | ManualClock:
+    return _clock
+
+
+def set_clock(clock: SystemClock | ManualClock) -> SystemClock | ManualClock:
+    """Встановлює годинник станції та повертає попередній."""
+    global _clock
+    previous, _clock = _clock, clock
+    return previous
+
+
+@contextmanager
+def use_clock(clock: SystemClock | ManualClock):
+    """Встановлює годинник станції на час блоку with."""
+    previous = set_clock(clock)
+    try:
+        yield clock
+    finally:
+        set_clock(previous)
@@ -0,0 +1,464 @@
+import threading
+from contextlib import nullcontext
+from datetime import (datetime,
+                      time)
+from inspect import (Parameter,
+                     signature)
+from types import UnionType
+from typing import (Iterable,
+                    get_args)
+
+from pydantic import ValidationError
+
+from models import (City,
+                    Bus,
+                    Park,
+                    Route,
+                    Departure,
+                    BusStatusEnum,
+                    BusDepartureResults,
+                    BusDepartureSummary,
+                    ReportGroupEnum,
+                    TravelTimeStats,
+                    RouteWindowStats,
+                    PlannedDeparture,
+                    ScheduledDispatch,
+                    PlanCriterionEnum,
+                    PartitionEnum,
+                    RoutePlan)
+from registry import FleetRegistry
+from workers import (Manager,
+                     Dispatcher,
+                     Analytic)
+from scheduler import DepartureScheduler
+from search_index import (SEARCH_LIMIT,
+                          MAX_SEARCH_LIMIT)
+from signals import (SameRouteSelected,
+                     CommandRejected,
+                     InvalidArguments)
+
+
+class StationCommands:
+    """
+    Клас StationCommands - програмний (неінтерактивний) інтерфейс дій станції.
+
+    Кожна дія меню має відповідний метод, який приймає аргументи замість запитів до користувача:
+    автобуси визначаються номером, маршрути - ключем у реєстрі.
+    Методи делегують виконання класам Manager, Dispatcher та DepartureScheduler, а запити (QUERIES) - класу Analytic.
+    Якщо дію неможливо виконати, викидається CommandRejected з повідомленням для користувача.
+
+    Метод execute_batch виконує набір команд за один прохід із одним записом у журнал.
+    Методи можна викликати з кількох потоків (терміналів) одночасно - атомарність змін
+    забезпечують блокування реєстру (див. FleetRegistry).
+    """
+
+    def __init__(self, registry: FleetRegistry, manager: Manager, dispatcher: Dispatcher, analytic: Analytic,
+                 scheduler: DepartureScheduler):
+        self.registry = registry
+        self.manager = manager
+        self.dispatcher = dispatcher
+        self.analytic = analytic
+        self.scheduler = scheduler
+        self._local = threading.local()
+
+
+    def create_bus(self, number: str, first_name: str, second_name: str) -> Bus:
+        """Створює автобус та додає його до парку.
+
+        Returns:
+            Bus: Створений автобус.
+        """
+        return self.manager.create_bus(number, first_name, second_name, trusted = self._is_trusted())
+
+
+    def create_route(self, start_point: str, end_point: str) -> int:
+        """Створює маршрут.
+
+        Returns:
+            int: Ідентифікатор (ключ) створеного маршруту у реєстрі.
+        """
+        return self.manager.create_route(start_point, end_point, trusted = self._is_trusted()).id
+
+
+    def set_route_for_bus(self, number: str, route_key: int) -> Departure | None:
+        """Встановлює маршрут для автобуса. Активний рейс автобуса при цьому зупиняється.
+
+        Returns:
+            Departure | None: Рейс, зупинений через зміну маршруту, або None.
+
+        Raises:
+            CommandRejected: Автобус або маршрут не існує, або маршрут вже встановлено.
+        """
+        try:
+            return self.dispatcher.change_route(self.get_bus(number), self.get_route(route_key))
+        except SameRouteSelected as ex:
+            raise CommandRejected(str(ex))
+
+
+    def depart_bus(self, number: str) -> Departure:
+        """Відправляє автобус у рейс за його маршрутом.
+
+        Returns:
+            Departure: Розпочатий рейс.
+        """
+        return self.dispatcher.depart_bus(self.get_bus(number))
+
+
+    def return_bus_to_park(self, number: str) -> Departure:
+        """Повертає автобус у парк.
+
+        Returns:
+            Departure: Завершений рейс.
+        """
+        return self.dispatcher.return_bus_to_park(self.get_bus(number))
+
+
+    def delete_bus(self, number: str):
+        """Видаляє автобус. Активний рейс автобуса при цьому завершується."""
+        self.manager.delete_bus(self.get_bus(number))
+
+
+    def delete_route(self, route_key: int):
+        """Видаляє маршрут. Автобуси маршруту повертаються у парк та відв'язуються від нього."""
+        self.manager.delete_route(self.get_route(route_key))
+
+
+    def schedule_departure(self, route_key: int, departs_at: str) -> PlannedDeparture:
+        """Додає щоденний рейс маршруту до розкладу.
+
+        Параметри:
+            route_key (int): Ключ маршруту.
+            departs_at (str): Час відправлення у форматі ГГ:ХХ.
+
+        Returns:
+            PlannedDeparture: Створений рейс розкладу.
+
+        Raises:
+            CommandRejected: Маршрут не існує або час має невірний формат.
+        """
+        try:
+            departure_time = time.fromisoformat(departs_at)
+        except (TypeError, ValueError):
+            raise CommandRejected(f"[!] Час відправлення '{departs_at}' має бути у форматі ГГ:ХХ!")
+        return self.scheduler.add_departure(self.get_route(route_key), departure_time, trusted = self._is_trusted())
+
+
+    def cancel_scheduled_departure(self, planned_departure_id: int):
+        """Видаляє рейс з розкладу.
+
+        Raises:
+            CommandRejected: Рейс розкладу не існує.
+        """
+        planned_departure = self.registry.get_planned_departure(planned_departure_id)
+        if planned_departure is None:
+            raise CommandRejected(f"[!] Рейс розкладу '{planned_departure_id}' не існує!")
+        self.scheduler.cancel_departure(planned_departure)
+
+
+    def list_buses(self,
+                   route_key: int | None = None,
+                   driver: str | None = None,
+                   status: str | None = None,
+                   number_prefix: str | None = None) -> list[Bus]:
+        """Повертає автобуси, відсортовані за номером, з фільтрами за маршрутом, водієм,
+        статусом (ON_THE_ROAD або IN_THE_PARKING) та початком номера.
+
+        Raises:
+            CommandRejected: Маршрут не існує або невідомий статус.
+        """
+        route = None if route_key is None else self.get_route(route_key)
+        try:
+            bus_status = None if status is None else BusStatusEnum[status]
+        except KeyError:
+            raise CommandRejected(f"[!] Невідомий статус автобуса '{status}'!")
+        return sorted(self.analytic.iter_buses(route, driver, bus_status, number_prefix), key = lambda bus: bus.number)
+
+
+    def list_routes(self) -> list[Route]:
+        """Повертає усі маршрути у порядку створення."""
+        return list(self.registry.routes.values())
+
+
+    def list_parked_buses(self) -> list[Bus]:
+        """Повертає автобуси у парку у порядку повернення до парку."""
+        return Park().parked_buses
+
+
+    def list_active_departures(self) -> list[Departure]:
+        """Повертає активні рейси."""
+        return self.analytic.get_active_departures()
+
+
+    def analyze_buses(self) -> list[BusDepartureSummary]:
+        """Повертає підсумки рейсів кожного автобуса."""
+        return self.analytic.analyze_buses()
+
+
+    def analyze_buses_in_period(self, start: str, end: str, partition: str = "TIME") -> list[BusDepartureSummary]:
+        """Повертає підсумки рейсів кожного автобуса, відправлених у період [start, end).
+
+        Параметри:
+            start (str): Початок періоду у форматі ISO (РРРР-ММ-ДД або РРРР-ММ-ДДTГГ:ХХ).
+            end (str): Кінець періоду (не включно) у тому ж форматі.
+            partition (str): Поділ історії між процесами: TIME - на проміжки часу, BUS - за автобусами.
+
+        Raises:
+            CommandRejected: Невірний формат дати, порожній період або невідомий спосіб поділу.
+        """
+        try:
+            period_start, period_end = datetime.fromisoformat(start), datetime.fromisoformat(end)
+        except (TypeError, ValueError):
+            raise CommandRejected("[!] Початок та кінець періоду мають бути у форматі РРРР-ММ-ДД або РРРР-ММ-ДДTГГ:ХХ!")
+        if period_start >= period_end:
+            raise CommandRejected("[!] Початок періоду має бути раніше за його кінець!")
+        try:
+            history_partition = PartitionEnum[partition]
+        except KeyError:
+            raise CommandRejected(f"[!] Невідомий спосіб поділу історії '{partition}'!")
+        return self.analytic.analyze_buses_in_period(period_start, period_end, history_partition)
+
+
+    def analyze_bus(self, number: str) -> BusDepartureResults:
+        """Повертає рейси автобуса та їх підсумки."""
+        return self.analytic.analyze_bus(self.get_bus(number))
+
+
+    def travel_time_report(self, group_by: str) -> list[TravelTimeStats]:
+        """Повертає статистику часу у дорозі, згруповану за ознакою group_by (BUS, ROUTE, DRIVER або TIME).
+
+        Raises:
+            CommandRejected: Невідома ознака групування.
+        """
+        try:
+            group = ReportGroupEnum[group_by]
+        except KeyError:
+            raise CommandRejected(f"[!] Невідома ознака групування '{group_by}'!")
+        return self.analytic.travel_time_report(group)
+
+
+    def recent_route_stats(self) -> list[RouteWindowStats]:
+        """Повертає показники рейсів маршрутів у ковзному часовому вікні."""
+        return self.analytic.get_recent_route_stats()
+
+
+    def list_timetable(self, route_key: int | None = None) -> list[PlannedDeparture]:
+        """Повертає рейси розкладу (усі або заданого маршруту), відсортовані за часом відправлення."""
+        return self.registry.get_timetable(None if route_key is None else self.get_route(route_key))
+
+
+    def list_scheduled_dispatches(self) -> list[ScheduledDispatch]:
+        """Повертає останні відправлені та пропущені рейси розкладу, від нових до старих."""
+        return list(reversed(self.scheduler.results))
+
+
+    def search_buses(self, query: str, limit: int = SEARCH_LIMIT) -> list[Bus]:
+        """Повертає до limit автобусів, номер або ім'я водія яких починається з запиту чи містить його."""
+        return self.analytic.search_buses(query, self._search_limit(limit))
+
+
+    def search_cities(self, query: str, limit: int = SEARCH_LIMIT) -> list[City]:
+        """Повертає до limit міст мережі маршрутів, назва яких починається з запиту чи містить його."""
+        return self.analytic.search_cities(query, self._search_limit(limit))
+
+
+    def search_routes(self, query: str, limit: int = SEARCH_LIMIT) -> list[Route]:
+        """Повертає до limit маршрутів, що проходять через міста, знайдені за запитом."""
+        return self.analytic.search_routes(query, self._search_limit(limit))
+
+
+    def list_cities(self) -> list[City]:
+        """Повертає міста мережі маршрутів, відсортовані за назвою."""
+        return self.registry.network.get_cities()
+
+
+    def reachable_cities(self, city: str) -> list[City]:
+        """Повертає міста, до яких можна дістатися з міста city маршрутами станції (з пересадками)."""
+        return self.analytic.get_reachable_cities(self.get_city(city))
+
+
+    def plan_route(self, start_point: str, end_point: str, criterion: str = "HOPS") -> RoutePlan:
+        """Повертає шлях між містами та автобуси кожної ділянки.
+
+        Параметри:
+            start_point (str): Назва міста відправлення.
+            end_point (str): Назва міста прибуття.
+            criterion (str): HOPS - найменше пересадок, TIME - найменший середній час у дорозі.
+
+        Raises:
+            CommandRejected: Невідоме місто або критерій, або між містами немає шляху.
+        """
+        try:
+            plan_criterion = PlanCriterionEnum[criterion]
+        except KeyError:
+            raise CommandRejected(f"[!] Невідомий критерій пошуку шляху '{criterion}'!")
+        plan = self.analytic.plan_route(self.get_city(start_point), self.get_city(end_point), plan_criterion)
+        if plan is None:
+            raise CommandRejected(f"[!] Між містами {start_point} та {end_point} немає шляху маршрутами станції!")
+        return plan
+
+
+    def execute(self, command: dict):
+        """Виконує одну команду, описану словником.
+
+        Параметри:
+            command (dict): Назва команди (COMMANDS) або запиту (QUERIES) у ключі "command" та її аргументи в інших ключах,
+                наприклад {"command": "depart_bus", "number": "AA1234"}.
+
+        Returns:
+            Результат відповідного методу.
+
+        Команда має бути словником, а кожен аргумент - значенням типу, вказаного у сигнатурі методу
+        (рядок, ціле число або None), тому некоректна команда відхиляється до виконання методу.
+
+        Raises:
+            InvalidArguments: Команда не є словником, аргументи не відповідають команді або не пройшли валідацію.
+            CommandRejected: Невідома команда або дію неможливо виконати.
+        """
+        if not isinstance(command, dict):
+            raise InvalidArguments(f"[!] Команда має бути об'єктом з ключем 'command', а не {type(command).__name__}!")
+        arguments = dict(command)
+        name = arguments.pop("command", None)
+        if not isinstance(name, str) or (name not in COMMANDS and name not in QUERIES):
+            raise CommandRejected(f"[!] Невідома команда '{name}'!")
+        _check_arguments(name, arguments)
+        try:
+            return getattr(self, name)(**arguments)
+        except ValidationError as ex:
+            raise InvalidArguments(f"[!] Невірні аргументи команди '{name}': {ex}")
+
+
+    def execute_batch(self, commands: Iterable[dict], stop_on_error: bool = False, trusted: bool = False) -> list:
+        """Виконує набір команд за один прохід.
+
+        Події всіх команд записуються у журнал одним записом.
+        Команда, яку неможливо виконати, не зупиняє виконання інших (якщо stop_on_error не встановлено).
+
+        Параметри:
+            commands (Iterable[dict]): Команди у форматі методу execute.
+            stop_on_error (bool): Припинити виконання після першої відхиленої команди.
+            trusted (bool): Команди отримано з власного сховища станції (наприклад, масове завантаження),
+                тому автобуси та маршрути створюються без валідації pydantic.
+
+        Returns:
+            list: Результати команд у тому ж порядку; для відхилених команд (зокрема некоректних -
+                InvalidArguments) - об'єкт CommandRejected.
+        """
+        results = []
+        journal = self.registry.journal
+        self._local.trusted = trusted
+        try:
+            with journal.batch() if journal else nullcontext():
+                for command in commands:
+                    try:
+                        results.append(self.execute(command))
+                    except CommandRejected as ex:
+                        results.append(ex)
+                        if stop_on_error:
+                            break
+        finally:
+            self._local.trusted = False
+        return results
+
+
+    def _is_trusted(self) -> bool:
+        return getattr(self._local, "trusted", False)
+
+
+    def get_bus(self, number: str) -> Bus:
+        """Повертає автобус за номером.
+
+        Raises:
+            CommandRejected: Автобус з таким номером не існує.
+        """
+        bus = self.registry.get_bus(number)
+        if bus is None:
+            raise CommandRejected(f"[!] Автобус з номером '{number}' не існує!")
+        return bus
+
+
+    def _search_limit(self, limit: int) -> int:
+        if not isinstance(limit, int) or not 0 < limit <= MAX_SEARCH_LIMIT:
+            raise CommandRejected(f"[!] Ліміт пошуку має бути цілим числом від 1 до {MAX_SEARCH_LIMIT}!")
+        return limit
+
+
+    def get_city(self, title: str) -> City:
+        """Повертає місто мережі маршрутів за назвою.
+
+        Raises:
+            CommandRejected: Жоден маршрут не з'єднує це місто.
+        """
+        city = self.registry.network.get_city(title)
+        if city is None:
+            raise CommandRejected(f"[!] Жоден маршрут не проходить через місто '{title}'!")
+        return city
+
+
+    def get_route(self, route_key: int) -> Route:
+        """Повертає маршрут за ключем.
+
+        Raises:
+            CommandRejected: Маршрут з таким ключем не існує.
+        """
+        route = self.registry.routes.get(route_key)
+        if route is None:
+            raise CommandRejected(f"[!] Маршрут з ключем '{route_key}' не існує!")
+        return route
+
+
+COMMANDS = ("create_bus",
+            "create_route",
+            "set_route_for_bus",
+            "depart_bus",
+            "return_bus_to_park",
+            "delete_bus",
+            "delete_route",
+            "schedule_departure",
+            "cancel_scheduled_departure")
+
+QUERIES = ("list_buses",
+           "list_routes",
+           "list_parked_buses",
+           "list_active_departures",
+           "analyze_buses",
+           "analyze_buses_in_period",
+           "analyze_bus",
+           "travel_time_report",
+           "recent_route_stats",
+           "list_timetable",
+           "list_scheduled_dispatches",
+           "search_buses",
+           "search_cities",
+           "search_routes",
+           "list_cities",
+           "reachable_cities",
+           "plan_route")
+
+
+def _parameter_types(annotation) -> tuple[type, ...]:
+    types = get_args(annotation) if isinstance(annotation, UnionType) else (annotation,)
+    return tuple(type(None) if parameter_type is None else parameter_type for parameter_type in types)
+
+
+# Типи та обов'язковість параметрів команд, прочитані з сигнатур методів один раз, а не для кожної команди.
+_PARAMETERS = {name: {parameter.name: (_parameter_types(parameter.annotation), parameter.default is Parameter.empty)
+                      for parameter in list(signature(getattr(StationCommands, name)).parameters.values())[1:]}
+               for name in COMMANDS + QUERIES}
+
+
+def _check_arguments(name: str, arguments: dict):
+    parameters = _PARAMETERS[name]
+    unknown = [argument for argument in arguments if argument not in parameters]
+    missing = [parameter for parameter, (_, required) in parameters.items() if required and parameter not in arguments]
+    if unknown or missing:
+        raise InvalidArguments(f"[!] Невірні аргументи команди '{name}': "
+                               f"{'невідомі ' + ', '.join(unknown) if unknown else ''}"
+                               f"{'; ' if unknown and missing else ''}"
+                               f"{'відсутні ' + ', '.join(missing) if missing else ''}!")
+    for argument, value in arguments.items():
+        types = parameters[argument][0]
+        # bool - підклас int, але не є допустимим ключем чи номером.
+        if not isinstance(value, types) or (isinstance(value, bool) and bool not in types):
+            raise InvalidArguments(f"[!] Аргумент '{argument}' команди '{name}' має бути "
+                                   f"{' або '.join(parameter_type.__name__ for parameter_type in types)}, "
+                                   f"а не {type(value).__name__}!")
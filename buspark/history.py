@@ -0,0 +1,106 @@
+from array import array
+from bisect import bisect_left
+from datetime import datetime
+
+
+def to_microseconds(moment: datetime) -> int:
+    """Перетворює datetime у кількість мікросекунд від початку епохи."""
+    return round(moment.timestamp() * 1_000_000)
+
+
+def from_microseconds(microseconds: int) -> datetime:
+    """Перетворює кількість мікросекунд від початку епохи у datetime."""
+    return datetime.fromtimestamp(microseconds / 1_000_000)
+
+
+class DepartureHistory:
+    """
+    Клас DepartureHistory - колонкове сховище завершених рейсів.
+
+    Кожен рейс займає рядок у чотирьох масивах int64 (array('q')): ідентифікатор автобуса,
+    ключ маршруту, час відправлення та час прибуття у мікросекундах від початку епохи.
+    Додатково для кожного автобуса зберігаються номери його рядків, щоб рейси одного автобуса
+    читались без перегляду всієї історії. Один рейс займає близько 40 байт замість
+    кількох кілобайт для об'єкту Departure з вкладеними Bus та Route.
+    """
+
+    def __init__(self):
+        self.bus_ids = array('q')
+        self.route_keys = array('q')
+        self.departure_times = array('q')
+        self.arrival_times = array('q')
+        self._bus_rows: dict[int, array] = {}
+
+
+    def __len__(self) -> int:
+        return len(self.bus_ids)
+
+
+    def append(self, bus_id: int, route_key: int, departure_time: int, arrival_time: int):
+        """Додає завершений рейс до історії.
+
+        Параметри:
+            bus_id (int): Ідентифікатор автобуса.
+            route_key (int): Ключ маршруту.
+            departure_time (int): Час відправлення у мікросекундах.
+            arrival_time (int): Час прибуття у мікросекундах.
+        """
+        row = len(self.bus_ids)
+        self.bus_ids.append(bus_id)
+        self.route_keys.append(route_key)
+        self.departure_times.append(departure_time)
+        self.arrival_times.append(arrival_time)
+        self._bus_rows.setdefault(bus_id, array('q')).append(row)
+
+
+    def columns(self) -> tuple[array, array, array, array]:
+        """Повертає копії колонок однакової довжини: ідентифікатори автобусів, ключі маршрутів,
+        час відправлення та час прибуття.
+
+        Копії не змінюються під час подальшого додавання рейсів, тому їх можна обробляти
+        (зокрема через буфер NumPy) паралельно з роботою станції.
+        """
+        rows = len(self.arrival_times)
+        return (self.bus_ids[:rows], self.route_keys[:rows], self.departure_times[:rows], self.arrival_times[:rows])
+
+
+    def bus_rows(self, bus_id: int) -> array:
+        """Повертає номери рядків історії, що належать автобусу."""
+        return self._bus_rows.get(bus_id, array('q'))
+
+
+    def rows_by_bus(self, rows: int) -> dict[int, array]:
+        """Повертає копії номерів рядків кожного автобуса серед перших rows рядків історії."""
+        bus_rows = {bus_id: rows_of_bus[:bisect_left(rows_of_bus, rows)] for bus_id, rows_of_bus in self._bus_rows.items()}
+        return {bus_id: rows_of_bus for bus_id, rows_of_bus in bus_rows.items() if rows_of_bus}
+
+
+    def compact(self, before: int, bus_ids: set[int]):
+        """Залишає в історії лише рейси заданих автобусів, що прибули не раніше вказаного часу.
+
+        Параметри:
+            before (int): Час у мікросекундах; рейси, що прибули раніше, прибираються.
+            bus_ids (set[int]): Ідентифікатори автобусів, рейси яких зберігаються.
+        """
+        kept_rows = [row for row, (bus_id, arrival_time) in enumerate(zip(self.bus_ids, self.arrival_times))
+                     if arrival_time >= before and bus_id in bus_ids]
+        columns = (self.bus_ids, self.route_keys, self.departure_times, self.arrival_times)
+        self.restore(*(array('q', (column[row] for row in kept_rows)).tobytes() for column in columns))
+
+
+    def export(self) -> tuple[bytes, bytes, bytes, bytes]:
+        """Повертає колонки історії у вигляді байтів для збереження у знімку."""
+        return (self.bus_ids.tobytes(),
+                self.route_keys.tobytes(),
+                self.departure_times.tobytes(),
+                self.arrival_times.tobytes())
+
+
+    def restore(self, bus_ids: bytes, route_keys: bytes, departure_times: bytes, arrival_times: bytes):
+        """Замінює вміст історії колонками, отриманими методом export."""
+        self.bus_ids, self.route_keys, self.departure_times, self.arrival_times = (
+            array('q', bus_ids), array('q', route_keys), array('q', departure_times), array('q', arrival_times)
+        )
+        self._bus_rows = {}
+        for row, bus_id in enumerate(self.bus_ids):
+            self._bus_rows.setdefault(bus_id, array('q')).append(row)
@@ -0,0 +1,454 @@
+"""Локальний HTTP/JSON API автобусної станції.
+
+Ресурси (усі відповіді, крім /metrics, - JSON):
+    GET    /buses?offset=0&limit=100          автобуси, відсортовані за номером
+           &route_key=&driver=&status=&number_prefix=  (фільтри; status - ON_THE_ROAD або IN_THE_PARKING)
+    GET    /buses/<номер>                      автобус
+    POST   /buses                              створення автобуса ({"number", "first_name", "second_name"})
+    DELETE /buses/<номер>                      видалення автобуса
+    POST   /buses/<номер>/route                встановлення маршруту ({"route_key": ...})
+    POST   /buses/<номер>/depart               відправлення у рейс
+    POST   /buses/<номер>/return               повернення у парк
+    GET    /routes?offset=0&limit=100          маршрути
+    GET    /routes/<ключ>                      маршрут
+    POST   /routes                             створення маршруту ({"start_point", "end_point"})
+    DELETE /routes/<ключ>                      видалення маршруту
+    GET    /park?offset=0&limit=100            автобуси у парку
+    GET    /departures?offset=0&limit=100      активні рейси
+    POST   /batch                              пакет команд ({"commands": [...], "stop_on_error": false})
+    POST   /batch/buses                        створення автобусів ({"buses": [...]})
+    POST   /batch/routes                       створення маршрутів ({"routes": [...]})
+    POST   /batch/depart                       відправлення автобусів ({"numbers": [...]})
+    POST   /batch/return                       повернення автобусів у парк ({"numbers": [...]})
+    GET    /timetable?route_key=&offset=0&limit=100  розклад рейсів (усіх або одного маршруту)
+    POST   /timetable                          додавання рейсу до розкладу ({"route_key", "departs_at": "ГГ:ХХ"})
+    DELETE /timetable/<ідентифікатор>          видалення рейсу з розкладу
+    GET    /timetable/dispatches               останні відправлення за розкладом
+    GET    /search/buses?q=<текст>&limit=10   пошук автобусів за початком або частиною номера та імені водія
+    GET    /search/cities?q=<текст>&limit=10  пошук міст мережі маршрутів за назвою
+    GET    /search/routes?q=<текст>&limit=10  пошук маршрутів за назвою міста
+    GET    /cities                             міста мережі маршрутів
+    GET    /cities/<назва>/reachable           міста, досяжні з міста (з пересадками)
+    GET    /plan?from=<місто>&to=<місто>&criterion=HOPS  шлях між містами (HOPS або TIME) та автобуси ділянок
+    GET    /analytics/buses?offset=0&limit=100 підсумки рейсів автобусів
+    GET    /analytics/buses/<номер>            рейси автобуса
+    GET    /analytics/period?from=<дата>&to=<дата>&partition=TIME  підсумки рейсів автобусів за період
+           (offset, limit; TIME або BUS - поділ історії між процесами)
+    GET    /analytics/travel-time?group_by=ROUTE
+    GET    /analytics/recent-routes
+    GET    /metrics                            показники роботи станції (текстовий формат Prometheus)
+
+Пакетні запити виконуються за один прохід з одним записом у журнал і повертають результат
+кожної команди: [{"ok": true, "result": ...}, {"ok": false, "error": "..."}, ...].
+Помилки повертаються як {"error": "..."}: невірний запит або аргументи команди - 400, відсутній ресурс - 404,
+дію неможливо виконати у поточному стані - 409, непередбачена помилка сервера - 500 (деталі - у stderr).
+Списки повертаються сторінками: {"items": [...], "total": ..., "offset": ..., "limit": ...}.
+Відповіді на GET ресурсів стану (автобуси, маршрути, парк, активні рейси, мережа маршрутів) мають ETag з версією
+стану реєстру та випадковою міткою запуску сервера (версія після перезапуску починається знову з нуля); запит з If-None-Match отримує 304 без тіла, доки стан не зміниться,
+а тіло відповіді кешується до зміни версії. Аналітика залежить від поточного часу,
+тому не кешується. З'єднання підтримуються (HTTP/1.1 keep-alive).
+
+Запуск (з каталогу buspark):
+    python http_api.py --port 8080
+"""
+import argparse
+import json
+import re
+import secrets
+import sys
+import threading
+import traceback
+from contextlib import suppress
+from http import HTTPStatus
+from http.server import (BaseHTTPRequestHandler,
+                         ThreadingHTTPServer)
+from urllib.parse import (urlsplit,
+                          parse_qs,
+                          unquote)
+
+from station import (AutoStation,
+                     JOURNAL_PATH,
+                     SNAPSHOT_PATH)
+from serializers import to_primitive
+from search_index import SEARCH_LIMIT
+from signals import (CommandRejected,
+                     InvalidArguments)
+import metrics
+
+
+DEFAULT_PAGE_SIZE = 100
+MAX_PAGE_SIZE = 1_000
+MAX_BODY_SIZE = 16 * 1024 * 1024
+CACHE_SIZE = 1_024
+PROMETHEUS_CONTENT_TYPE = "text/plain; version=0.0.4; charset=utf-8"
+
+
+class ApiError(Exception):
+    """Запит, на який API відповідає помилкою з заданим HTTP-статусом."""
+
+    def __init__(self, status: HTTPStatus, message: str):
+        super().__init__(message)
+        self.status = status
+
+
+class FleetHTTPServer(ThreadingHTTPServer):
+    """
+    Клас FleetHTTPServer - HTTP-сервер API станції.
+
+    Кожне з'єднання обслуговується окремим потоком; безпеку паралельних змін забезпечують
+    блокування реєстру (див. FleetRegistry). Сервер можна запустити у тому ж процесі,
+    що й станцію (наприклад, у тестах): FleetHTTPServer(("127.0.0.1", 0), station)
+    та serve_forever() в окремому потоці.
+    """
+    daemon_threads = True
+
+
+    def __init__(self, address: tuple[str, int], station: AutoStation, quiet: bool = True):
+        self.station = station
+        self.commands = station.commands
+        self.registry = station.registry
+        self.quiet = quiet
+        self._cache: dict[str, tuple[int, bytes]] = {}
+        self._cache_lock = threading.Lock()
+        self.epoch = secrets.token_hex(4)
+        super().__init__(address, FleetRequestHandler)
+
+
+    def cached_body(self, key: str, version: int, render) -> bytes:
+        """Повертає тіло відповіді для версії стану, обчислюючи його лише після зміни версії."""
+        cached = self._cache.get(key)
+        if cached is not None and cached[0] == version:
+            return cached[1]
+        body = render()
+        with self._cache_lock:
+            if len(self._cache) >= CACHE_SIZE:
+                self._cache.clear()
+            self._cache[key] = (version, body)
+        return body
+
+
+class FleetRequestHandler(BaseHTTPRequestHandler):
+    """Обробник запитів API: зіставляє метод і шлях з ROUTES та надсилає відповідь у JSON."""
+    protocol_version = "HTTP/1.1"
+    disable_nagle_algorithm = True
+    server: FleetHTTPServer
+
+
+    def do_GET(self):
+        self._handle("GET")
+
+
+    def do_POST(self):
+        self._handle("POST")
+
+
+    def do_DELETE(self):
+        self._handle("DELETE")
+
+
+    def log_message(self, format: str, *args):
+        if not self.server.quiet:
+            super().log_message(format, *args)
+
+
+    def _handle(self, method: str):
+        url = urlsplit(self.path)
+        try:
+            body = self._read_body()
+            for route_method, pattern, action, versioned, status in ROUTES:
+                match = pattern.fullmatch(url.path)
+                if route_method == method and match:
+                    break
+            else:
+                raise ApiError(HTTPStatus.NOT_FOUND, f"[!] Ресурс '{url.path}' не існує!")
+
+            arguments = [unquote(argument) for argument in match.groups()]
+            request = (self.server.commands, parse_qs(url.query), body, *arguments)
+            if versioned:
+                self._send_versioned(url, lambda: action(*request))
+                return
+            result = action(*request)
+            if method != "GET":
+                self.server.station.checkpoint_if_needed()
+            if isinstance(result, str):
+                self._send(status, result.encode("utf-8"), content_type = PROMETHEUS_CONTENT_TYPE)
+                return
+            self._send(status, _encode(result))
+        except ApiError as ex:
+            self._send(ex.status, _encode({"error": str(ex)}))
+        except InvalidArguments as ex:
+            self._send(HTTPStatus.BAD_REQUEST, _encode({"error": str(ex)}))
+        except CommandRejected as ex:
+            self._send(HTTPStatus.CONFLICT, _encode({"error": str(ex)}))
+        except Exception:
+            traceback.print_exc(file = sys.stderr)
+            self._send(HTTPStatus.INTERNAL_SERVER_ERROR, _encode({"error": "[!] Внутрішня помилка сервера!"}))
+
+
+    def _send_versioned(self, url, render):
+        version = self.server.registry.version
+        etag = f'W/"{self.server.epoch}-{version}"'
+        if etag in (tag.strip() for tag in self.headers.get("If-None-Match", "").split(",")):
+            self._send(HTTPStatus.NOT_MODIFIED, b"", etag)
+            return
+        body = self.server.cached_body(url.path + "?" + url.query, version, lambda: _encode(render()))
+        self._send(HTTPStatus.OK, body, etag)
+
+
+    def _read_body(self):
+        length = self.headers.get("Content-Length", "0").strip()
+        if not re.fullmatch(r"[0-9]+", length):
+            # Довжину тіла неможливо визначити, тому з'єднання закривається.
+            self.close_connection = True
+            raise ApiError(HTTPStatus.BAD_REQUEST, "[!] Невірний заголовок Content-Length!")
+        length = int(length)
+        if length > MAX_BODY_SIZE:
+            # Непрочитане тіло залишилось би у з'єднанні, тому воно закривається.
+            self.close_connection = True
+            raise ApiError(HTTPStatus.REQUEST_ENTITY_TOO_LARGE, "[!] Завеликий запит!")
+        if not length:
+            return None
+        try:
+            return json.loads(self.rfile.read(length))
+        except ValueError:
+            raise ApiError(HTTPStatus.BAD_REQUEST, "[!] Тіло запиту має бути JSON!")
+
+
+    def _send(self, status: HTTPStatus, body: bytes, etag: str | None = None,
+              content_type: str = "application/json; charset=utf-8"):
+        self.send_response(status)
+        if etag:
+            self.send_header("ETag", etag)
+        else:
+            self.send_header("Cache-Control", "no-cache")
+        if self.close_connection:
+            self.send_header("Connection", "close")
+        if status != HTTPStatus.NOT_MODIFIED:
+            self.send_header("Content-Type", content_type)
+            self.send_header("Content-Length", str(len(body)))
+        self.end_headers()
+        if body:
+            self.wfile.write(body)
+
+
+def _encode(value) -> bytes:
+    return json.dumps(to_primitive(value), ensure_ascii = False, separators = (',', ':')).encode('utf-8')
+
+
+def _page(items: list, query: dict) -> dict:
+    try:
+        offset = int(query.get("offset", ["0"])[0])
+        limit = int(query.get("limit", [str(DEFAULT_PAGE_SIZE)])[0])
+    except ValueError:
+        raise ApiError(HTTPStatus.BAD_REQUEST, "[!] offset та limit мають бути цілими числами!")
+    if offset < 0 or not 0 < limit <= MAX_PAGE_SIZE:
+        raise ApiError(HTTPStatus.BAD_REQUEST, f"[!] offset має бути невід'ємним, limit - від 1 до {MAX_PAGE_SIZE}!")
+    return {"items": items[offset:offset + limit], "total": len(items), "offset": offset, "limit": limit}
+
+
+def _object(body, *fields: str) -> dict:
+    if not isinstance(body, dict) or body.keys() - set(fields):
+        raise ApiError(HTTPStatus.BAD_REQUEST, f"[!] Тіло запиту має бути об'єктом з полями {', '.join(fields)}!")
+    return body
+
+
+def _found(lookup, *arguments):
+    try:
+        return lookup(*arguments)
+    except CommandRejected as ex:
+        raise ApiError(HTTPStatus.NOT_FOUND, str(ex))
+
+
+def _route_key(key: str) -> int:
+    if not key.isdigit():
+        raise ApiError(HTTPStatus.NOT_FOUND, f"[!] Маршрут з ключем '{key}' не існує!")
+    return int(key)
+
+
+def _batch(commands, body, stop_on_error: bool = False) -> list[dict]:
+    results = commands.execute_batch(body, stop_on_error = stop_on_error)
+    return [{"ok": False, "error": str(result)} if isinstance(result, CommandRejected)
+            else {"ok": True, "result": result}
+            for result in results]
+
+
+def _list(body, field: str) -> list:
+    items = _object(body, field, "stop_on_error").get(field)
+    if not isinstance(items, list):
+        raise ApiError(HTTPStatus.BAD_REQUEST, f"[!] Поле {field} має бути списком!")
+    return items
+
+
+def _create(command: str, *fields: str):
+    def create(commands, query, body):
+        return commands.execute({"command": command} | _object(body, *fields))
+    return create
+
+
+def _create_many(command: str, field: str, *fields: str):
+    def create_many(commands, query, body):
+        return _batch(commands, [{"command": command} | _object(item, *fields) for item in _list(body, field)],
+                      bool(body.get("stop_on_error")))
+    return create_many
+
+
+def _bus_command(command: str):
+    def bus_command(commands, query, body, number):
+        _found(commands.get_bus, number)
+        return getattr(commands, command)(number)
+    return bus_command
+
+
+def _bus_commands(command: str):
+    def bus_commands(commands, query, body):
+        return _batch(commands, [{"command": command, "number": number} for number in _list(body, "numbers")],
+                      bool(body.get("stop_on_error")))
+    return bus_commands
+
+
+def _execute_batch(commands, query, body):
+    return _batch(commands, _list(body, "commands"), bool(body.get("stop_on_error")))
+
+
+def _set_route(commands, query, body, number):
+    route_key = _object(body, "route_key").get("route_key")
+    if not isinstance(route_key, int):
+        raise ApiError(HTTPStatus.BAD_REQUEST, "[!] Поле route_key має бути цілим числом!")
+    _found(commands.get_bus, number)
+    return commands.set_route_for_bus(number, route_key)
+
+
+def _list_buses(commands, query, body):
+    route_key = query.get("route_key", [None])[0]
+    route_key = None if route_key is None else _route_key(route_key)
+    if route_key is not None:
+        _found(commands.get_route, route_key)
+    try:
+        buses = commands.list_buses(route_key, *(query.get(name, [None])[0] for name in ("driver", "status", "number_prefix")))
+    except CommandRejected as ex:
+        raise ApiError(HTTPStatus.BAD_REQUEST, str(ex))
+    return _page(buses, query)
+
+
+def _delete_route(commands, query, body, key):
+    _found(commands.get_route, _route_key(key))
+    return commands.delete_route(int(key))
+
+
+def _timetable(commands, query, body):
+    route_key = query.get("route_key", [None])[0]
+    return _page(commands.list_timetable(None if route_key is None else _route_key(route_key)), query)
+
+
+def _cancel_scheduled_departure(commands, query, body, planned_departure_id):
+    if not planned_departure_id.isdigit() or commands.registry.get_planned_departure(int(planned_departure_id)) is None:
+        raise ApiError(HTTPStatus.NOT_FOUND, f"[!] Рейс розкладу '{planned_departure_id}' не існує!")
+    return commands.cancel_scheduled_departure(int(planned_departure_id))
+
+
+def _city(commands, title: str) -> str:
+    if commands.registry.network.get_city(title) is None:
+        raise ApiError(HTTPStatus.NOT_FOUND, f"[!] Жоден маршрут не проходить через місто '{title}'!")
+    return title
+
+
+def _plan_route(commands, query, body):
+    if "from" not in query or "to" not in query:
+        raise ApiError(HTTPStatus.BAD_REQUEST, "[!] Необхідно вказати міста 'from' та 'to'!")
+    return commands.plan_route(_city(commands, query["from"][0]), _city(commands, query["to"][0]),
+                               query.get("criterion", ["HOPS"])[0])
+
+
+def _search(kind: str):
+    def search(commands, query, body):
+        limit = query.get("limit", [str(SEARCH_LIMIT)])[0]
+        if not limit.isdigit():
+            raise ApiError(HTTPStatus.BAD_REQUEST, "[!] limit має бути цілим числом!")
+        try:
+            return getattr(commands, f"search_{kind}")(query.get("q", [""])[0], int(limit))
+        except CommandRejected as ex:
+            raise ApiError(HTTPStatus.BAD_REQUEST, str(ex))
+    return search
+
+
+def _analyze_buses_in_period(commands, query, body):
+    if "from" not in query or "to" not in query:
+        raise ApiError(HTTPStatus.BAD_REQUEST, "[!] Необхідно вказати початок 'from' та кінець 'to' періоду!")
+    try:
+        summaries = commands.analyze_buses_in_period(query["from"][0], query["to"][0], query.get("partition", ["TIME"])[0])
+    except CommandRejected as ex:
+        raise ApiError(HTTPStatus.BAD_REQUEST, str(ex))
+    return _page(summaries, query)
+
+
+def _travel_time_report(commands, query, body):
+    return commands.travel_time_report(query.get("group_by", ["ROUTE"])[0])
+
+
+def _route(method: str, path: str, action, versioned: bool = False, status: HTTPStatus = HTTPStatus.OK) -> tuple:
+    return method, re.compile(path), action, versioned, status
+
+
+# Дії викликаються як action(commands, query, body, *аргументи зі шляху).
+ROUTES = (
+    _route("GET", r"/buses", _list_buses, versioned = True),
+    _route("GET", r"/buses/([^/]+)",
+           lambda commands, query, body, number: _found(commands.get_bus, number), versioned = True),
+    _route("POST", r"/buses", _create("create_bus", "number", "first_name", "second_name"), status = HTTPStatus.CREATED),
+    _route("DELETE", r"/buses/([^/]+)", _bus_command("delete_bus")),
+    _route("POST", r"/buses/([^/]+)/route", _set_route),
+    _route("POST", r"/buses/([^/]+)/depart", _bus_command("depart_bus")),
+    _route("POST", r"/buses/([^/]+)/return", _bus_command("return_bus_to_park")),
+    _route("GET", r"/routes", lambda commands, query, body: _page(commands.list_routes(), query), versioned = True),
+    _route("GET", r"/routes/([^/]+)",
+           lambda commands, query, body, key: _found(commands.get_route, _route_key(key)), versioned = True),
+    _route("POST", r"/routes", _create("create_route", "start_point", "end_point"), status = HTTPStatus.CREATED),
+    _route("DELETE", r"/routes/([^/]+)", _delete_route),
+    _route("GET", r"/park", lambda commands, query, body: _page(commands.list_parked_buses(), query), versioned = True),
+    _route("GET", r"/departures",
+           lambda commands, query, body: _page(commands.list_active_departures(), query), versioned = True),
+    _route("POST", r"/batch", _execute_batch),
+    _route("POST", r"/batch/buses", _create_many("create_bus", "buses", "number", "first_name", "second_name")),
+    _route("POST", r"/batch/routes", _create_many("create_route", "routes", "start_point", "end_point")),
+    _route("POST", r"/batch/depart", _bus_commands("depart_bus")),
+    _route("POST", r"/batch/return", _bus_commands("return_bus_to_park")),
+    _route("GET", r"/timetable", _timetable, versioned = True),
+    _route("POST", r"/timetable", _create("schedule_departure", "route_key", "departs_at"), status = HTTPStatus.CREATED),
+    _route("DELETE", r"/timetable/([^/]+)", _cancel_scheduled_departure),
+    _route("GET", r"/timetable/dispatches", lambda commands, query, body: commands.list_scheduled_dispatches()),
+    _route("GET", r"/search/buses", _search("buses"), versioned = True),
+    _route("GET", r"/search/cities", _search("cities"), versioned = True),
+    _route("GET", r"/search/routes", _search("routes"), versioned = True),
+    _route("GET", r"/cities", lambda commands, query, body: commands.list_cities(), versioned = True),
+    _route("GET", r"/cities/([^/]+)/reachable",
+           lambda commands, query, body, title: commands.reachable_cities(_city(commands, title)), versioned = True),
+    _route("GET", r"/plan", _plan_route, versioned = True),
+    _route("GET", r"/analytics/period", _analyze_buses_in_period),
+    _route("GET", r"/analytics/buses", lambda commands, query, body: _page(commands.analyze_buses(), query)),
+    _route("GET", r"/analytics/buses/([^/]+)",
+           lambda commands, query, body, number: _found(commands.analyze_bus, number)),
+    _route("GET", r"/analytics/travel-time", _travel_time_report),
+    _route("GET", r"/analytics/recent-routes", lambda commands, query, body: commands.recent_route_stats()),
+    _route("GET", r"/metrics", lambda commands, query, body: metrics.export_prometheus()),
+)
+
+
+def main(arguments: list[str] | None = None):
+    parser = argparse.ArgumentParser(description = "HTTP/JSON API автобусної станції")
+    parser.add_argument("--host", default = "127.0.0.1")
+    parser.add_argument("--port", type = int, default = 8080)
+    parser.add_argument("--journal", default = JOURNAL_PATH)
+    parser.add_argument("--snapshot", default = SNAPSHOT_PATH)
+    parser.add_argument("--verbose", action = "store_true", help = "записувати кожен запит у stderr")
+    options = parser.parse_args(arguments)
+
+    station = AutoStation()
+    station.open_journal(options.journal, options.snapshot)
+    station.scheduler.start()
+    with FleetHTTPServer((options.host, options.port), station, quiet = not options.verbose) as server:
+        with suppress(KeyboardInterrupt):
+            server.serve_forever()
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,335 @@
+import atexit
+import json
+import os
+import threading
+from contextlib import contextmanager
+from datetime import time
+
+from models import (City,
+                    Driver,
+                    Bus,
+                    Route,
+                    Departure,
+                    PlannedDeparture)
+
+
+class EventJournal:
+    """
+    Клас EventJournal - журнал змін стану станції, у який записи лише додаються (write-ahead log).
+
+    Кожна подія записується окремим рядком JSON-масиву: перший елемент - тип події, далі - її дані.
+    Перший рядок журналу - заголовок ["journal", generation] з номером покоління журналу.
+    Після створення знімку стану (snapshot.py) журнал переходить до нового покоління (метод rotate),
+    а події попередніх поколінь вважаються включеними у знімок.
+    Запис лише додає рядок до буфера файлу, тому не затримує дії меню.
+    Буфер скидається на диск (fsync) пакетами: коли накопичується sync_every подій
+    або фоновим потоком кожні sync_interval секунд. Під час завершення процесу журнал закривається
+    з остаточним скиданням буфера.
+
+    Події пакета (batch) записуються лише після його завершення, тому знімок стану не можна створювати,
+    поки відкрито хоча б один пакет: інакше знімок включив би зміни пакета, а їх події потрапили б
+    у нове покоління журналу і застосувались би повторно. Для цього знімок створюється всередині
+    блоку without_batches, який чекає завершення відкритих пакетів і не дає відкривати нові.
+    """
+
+    def __init__(self, path: str, generation: int = 0, sync_every: int = 256, sync_interval: float = 1.0):
+        self.path = path
+        self.sync_every = sync_every
+        self.generation = read_generation(path)
+        self.events_written = 0
+        self._lock = threading.Lock()
+        self._pending = 0
+        self._local = threading.local()
+        self._batches = 0
+        self._batches_blocked = False
+        self._batches_changed = threading.Condition()
+        if self.generation is None or self.generation < generation:
+            self._start_generation(generation)
+        self._file = open(path, 'a', encoding = 'utf-8')
+        self._closed = threading.Event()
+        self._syncer = threading.Thread(target = self._sync_periodically,
+                                        args = (sync_interval,),
+                                        daemon = True)
+        self._syncer.start()
+        atexit.register(self.close)
+
+
+    def append(self, *event):
+        """Додає подію до журналу.
+
+        Параметри:
+            event: Тип події та її дані (прості значення, що серіалізуються у JSON).
+        """
+        line = json.dumps(event, ensure_ascii = False, separators = (',', ':')) + '\n'
+        batch = getattr(self._local, "batch", None)
+        if batch is not None:
+            batch.append(line)
+            return
+        with self._lock:
+            self._write(line, 1)
+
+
+    @contextmanager
+    def batch(self):
+        """Накопичує події, додані всередині блоку with, та записує їх одним записом.
+
+        Використовується для пакетного виконання команд, щоб не записувати та не скидати
+        журнал на диск для кожної події окремо. Пакет належить потоку, що його відкрив:
+        події інших потоків записуються як звичайно.
+        """
+        if getattr(self._local, "batch", None) is not None:
+            yield
+            return
+        with self._batches_changed:
+            self._batches_changed.wait_for(lambda: not self._batches_blocked)
+            self._batches += 1
+        self._local.batch = []
+        try:
+            yield
+        finally:
+            lines, self._local.batch = self._local.batch, None
+            try:
+                if lines:
+                    with self._lock:
+                        self._write(''.join(lines), len(lines))
+            finally:
+                with self._batches_changed:
+                    self._batches -= 1
+                    self._batches_changed.notify_all()
+
+
+    @contextmanager
+    def without_batches(self):
+        """Чекає завершення відкритих пакетів і не дає відкривати нові пакети на час блоку with.
+
+        Пакет відкривається до виконання команд, тож потік, що чекає на відкриття пакета,
+        не тримає блокувань реєстру. Не можна викликати всередині пакета.
+        """
+        with self._batches_changed:
+            self._batches_changed.wait_for(lambda: not self._batches_blocked)
+            self._batches_blocked = True
+            self._batches_changed.wait_for(lambda: not self._batches)
+        try:
+            yield
+        finally:
+            with self._batches_changed:
+                self._batches_blocked = False
+                self._batches_changed.notify_all()
+
+
+    def rotate(self, generation: int):
+        """Починає нове покоління журналу, відкидаючи події, які вже включено у знімок стану.
+
+        Параметри:
+            generation (int): Номер нового покоління.
+        """
+        with self._lock:
+            if self._batches:
+                raise RuntimeError("Журнал не можна перевести до нового покоління, поки відкрито пакет подій")
+            self._sync()
+            self._file.close()
+            self._start_generation(generation)
+            self._file = open(self.path, 'a', encoding = 'utf-8')
+
+
+    def sync(self):
+        """Скидає накопичені події на диск."""
+        with self._lock:
+            if not self._file.closed:
+                self._sync()
+
+
+    def close(self):
+        """Скидає накопичені події на диск та закриває журнал."""
+        if self._closed.is_set():
+            return
+        self._closed.set()
+        with self._lock:
+            self._sync()
+            self._file.close()
+
+
+    def _write(self, data: str, count: int):
+        self._file.write(data)
+        self._pending += count
+        self.events_written += count
+        if self._pending >= self.sync_every:
+            self._sync()
+
+
+    def _start_generation(self, generation: int):
+        temporary_path = self.path + '.tmp'
+        with open(temporary_path, 'w', encoding = 'utf-8') as file:
+            file.write(json.dumps(["journal", generation]) + '\n')
+            file.flush()
+            os.fsync(file.fileno())
+        os.replace(temporary_path, self.path)
+        self.generation = generation
+        self.events_written = 0
+
+
+    def _sync(self):
+        if not self._pending:
+            return
+        self._file.flush()
+        os.fsync(self._file.fileno())
+        self._pending = 0
+
+
+    def _sync_periodically(self, interval: float):
+        while not self._closed.wait(interval):
+            self.sync()
+
+
+def read_generation(path: str) -> int | None:
+    """Повертає номер покоління журналу з його заголовка.
+
+    Параметри:
+        path (str): Шлях до файлу журналу.
+
+    Returns:
+        int | None: Номер покоління або None, якщо журнал порожній чи відсутній.
+
+    Raises:
+        ValueError: Файл не починається із заголовка журналу.
+    """
+    if not os.path.exists(path):
+        return None
+    with open(path, 'rb') as file:
+        first_line = file.readline()
+    if not first_line:
+        return None
+    try:
+        kind, generation = json.loads(first_line)
+    except (ValueError, TypeError):
+        kind = generation = None
+    if kind != "journal" or type(generation) is not int:
+        raise ValueError(f"Файл '{path}' не є журналом станції")
+    return generation
+
+
+def read_events(path: str) -> list[list]:
+    """Читає усі події з журналу.
+
+    Події розбираються одним викликом json.loads для всього файлу, що значно швидше
+    за розбір кожного рядка окремо. Якщо останній рядок журналу записано не повністю
+    (процес завершився аварійно під час запису), цей рядок відкидається,
+    а файл обрізається до останньої цілої події.
+
+    Параметри:
+        path (str): Шлях до файлу журналу.
+
+    Returns:
+        list[list]: Події журналу у порядку запису.
+    """
+    if not os.path.exists(path):
+        return []
+    with open(path, 'rb') as file:
+        data = file.read()
+
+    lines = data.decode('utf-8', errors = 'replace').splitlines()
+    if lines and not data.endswith(b'\n'):
+        try:
+            json.loads(lines[-1])
+        except ValueError:
+            lines.pop()
+            with open(path, 'r+b') as file:
+                file.truncate(data.rfind(b'\n') + 1)
+        else:
+            with open(path, 'ab') as file:
+                file.write(b'\n')
+    return json.loads('[' + ','.join(lines) + ']')
+
+
+def replay_journal(path: str, registry, generation: int = 0) -> int:
+    """Відновлює стан реєстру, повторно застосовуючи події журналу.
+
+    Під час відновлення журнал реєстру має бути від'єднано, щоб події не записувались повторно.
+    Події записані самою станцією, тому моделі створюються без валідації (construct).
+    Журнал покоління, старшого за generation, вже включено у знімок стану, тому він пропускається.
+
+    Параметри:
+        path (str): Шлях до файлу журналу.
+        registry (FleetRegistry): Реєстр, у який відновлюється стан.
+        generation (int): Покоління журналу, яке очікується після завантаженого знімку стану.
+
+    Returns:
+        int: Кількість застосованих подій.
+
+    Raises:
+        ValueError: Файл не є журналом станції або містить невідому подію.
+    """
+    journal_generation = read_generation(path)
+    if journal_generation is None or journal_generation < generation:
+        return 0
+    count = 0
+    for kind, *data in read_events(path):
+        if kind not in _APPLIERS:
+            raise ValueError(f"Невідома подія журналу '{kind}' у файлі '{path}'")
+        _APPLIERS[kind](registry, *data)
+        count += 1
+    return count
+
+
+def _apply_bus(registry, number: str, first_name: str, second_name: str, bus_id: int):
+    registry.add_bus(Bus.construct(id = bus_id, number = number,
+                                   driver = Driver.construct(first_name = first_name, second_name = second_name)))
+
+
+def _apply_bus_del(registry, number: str):
+    registry.remove_bus(registry.get_bus(number))
+
+
+def _apply_route(registry, key: int, start_point: str, end_point: str):
+    registry.add_route(Route.construct(id = key, start_point = City.intern(start_point), end_point = City.intern(end_point)))
+
+
+def _apply_route_del(registry, key: int):
+    registry.remove_route(registry.routes[key])
+
+
+def _apply_set_route(registry, number: str, key: int | None):
+    registry.set_bus_route(registry.get_bus(number), None if key is None else registry.routes[key])
+
+
+def _apply_depart(registry, number: str, moment: int):
+    bus = registry.get_bus(number)
+    registry.open_departure(bus, Departure.construct(bus = bus, route = bus.route, departed_ns = _event_ns(moment)))
+
+
+def _apply_return(registry, number: str, moment: int):
+    registry.close_departure(registry.get_bus(number), _event_ns(moment))
+
+
+def _event_ns(moment: int) -> int:
+    # Час подій записується у наносекундах годинника станції.
+    if type(moment) is not int:
+        raise ValueError(f"Невірний час події журналу: {moment!r}")
+    return moment
+
+
+def _apply_plan(registry, planned_departure_id: int, key: int, departs_at: str):
+    registry.add_planned_departure(PlannedDeparture.construct(id = planned_departure_id, route = registry.routes[key],
+                                                              departs_at = time.fromisoformat(departs_at)))
+
+
+def _apply_plan_del(registry, planned_departure_id: int):
+    registry.remove_planned_departure(registry.get_planned_departure(planned_departure_id))
+
+
+def _apply_journal(registry, generation: int):
+    pass
+
+
+_APPLIERS = {
+    "journal": _apply_journal,
+    "bus": _apply_bus,
+    "bus_del": _apply_bus_del,
+    "route": _apply_route,
+    "route_del": _apply_route_del,
+    "set_route": _apply_set_route,
+    "depart": _apply_depart,
+    "return": _apply_return,
+    "plan": _apply_plan,
+    "plan_del": _apply_plan_del,
+}
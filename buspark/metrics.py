@@ -0,0 +1,220 @@
+"""Показники роботи станції: кількість викликів, гістограми затримок та розмірів результатів.
+
+Інструментуються дії AutoStation, методи Dispatcher, Manager, Analytic (декоратор класу instrument_methods)
+та перевірки station_decorators (декоратор instrument_guard). Збір вимкнено за замовчуванням:
+тоді обгортка лише перевіряє прапорець і викликає метод. Збір вмикається змінною середовища
+BUSPARK_METRICS=1, функцією enable() або у меню діагностики.
+
+Показники експортуються у текстовому форматі Prometheus (функція export_prometheus).
+"""
+import os
+import threading
+from bisect import bisect_left
+from functools import wraps
+from time import perf_counter_ns
+
+
+# Межі кошиків гістограми затримок у наносекундах (від 1 мкс до 10 с) та розмірів результатів.
+DURATION_BUCKETS = tuple(int(base * 10 ** exponent) for exponent in range(3, 10) for base in (1, 2.5, 5)) + (10_000_000_000,)
+SIZE_BUCKETS = (0, 1, 10, 100, 1_000, 10_000, 100_000, 1_000_000)
+
+_enabled = os.environ.get("BUSPARK_METRICS", "") not in ("", "0")
+_operations: dict[str, "OperationMetrics"] = {}
+_operations_lock = threading.Lock()
+
+
+class OperationMetrics:
+    """Показники однієї операції."""
+
+    def __init__(self):
+        self.count = 0
+        self.total_ns = 0
+        self.duration_buckets = [0] * (len(DURATION_BUCKETS) + 1)
+        self.size_count = 0
+        self.size_total = 0
+        self.size_buckets = [0] * (len(SIZE_BUCKETS) + 1)
+        self.errors: dict[str, int] = {}
+        self.rejections = 0
+        self._lock = threading.Lock()
+
+
+    def record(self, duration_ns: int, result = None, error: BaseException | None = None):
+        with self._lock:
+            self.count += 1
+            self.total_ns += duration_ns
+            self.duration_buckets[bisect_left(DURATION_BUCKETS, duration_ns)] += 1
+            if error is not None:
+                name = type(error).__name__
+                self.errors[name] = self.errors.get(name, 0) + 1
+            elif hasattr(result, "__len__") and not isinstance(result, (str, bytes)):
+                size = len(result)
+                self.size_count += 1
+                self.size_total += size
+                self.size_buckets[bisect_left(SIZE_BUCKETS, size)] += 1
+
+
+    def quantile(self, value: float) -> float | None:
+        """Повертає оцінку квантиля затримки у секундах (верхню межу кошика гістограми)."""
+        if not self.count:
+            return None
+        rank = value * self.count
+        seen = 0
+        for index, bucket_count in enumerate(self.duration_buckets):
+            seen += bucket_count
+            if seen >= rank:
+                return (DURATION_BUCKETS[index] if index < len(DURATION_BUCKETS) else DURATION_BUCKETS[-1]) / 1e9
+        return DURATION_BUCKETS[-1] / 1e9
+
+
+def is_enabled() -> bool:
+    return _enabled
+
+
+def enable():
+    global _enabled
+    _enabled = True
+
+
+def disable():
+    global _enabled
+    _enabled = False
+
+
+def reset():
+    """Видаляє накопичені показники."""
+    with _operations_lock:
+        _operations.clear()
+
+
+def get_operations() -> dict[str, OperationMetrics]:
+    """Повертає показники операцій за назвою, відсортовані за назвою."""
+    with _operations_lock:
+        return dict(sorted(_operations.items()))
+
+
+def _metrics(name: str) -> OperationMetrics:
+    operation = _operations.get(name)
+    if operation is None:
+        with _operations_lock:
+            operation = _operations.setdefault(name, OperationMetrics())
+    return operation
+
+
+def instrumented(name: str):
+    """Декоратор функції: записує кількість викликів, затримку, розмір результату та виключення під назвою name."""
+    def decorator(func):
+        @wraps(func)
+        def wrapper(*args, **kwargs):
+            if not _enabled:
+                return func(*args, **kwargs)
+            started = perf_counter_ns()
+            try:
+                result = func(*args, **kwargs)
+            except BaseException as ex:
+                _metrics(name).record(perf_counter_ns() - started, error = ex)
+                raise
+            _metrics(name).record(perf_counter_ns() - started, result)
+            return result
+        return wrapper
+    return decorator
+
+
+def instrument_methods(prefix: str, exclude: tuple[str, ...] = ()):
+    """Декоратор класу: інструментує публічні методи екземпляра класу під назвами "prefix.метод".
+
+    Методи з exclude, статичні методи та методи класу не інструментуються.
+    """
+    def decorator(cls):
+        for name, attribute in list(vars(cls).items()):
+            if (name.startswith("_") or name in exclude or isinstance(attribute, (staticmethod, classmethod, type))
+                    or not callable(attribute)):
+                continue
+            setattr(cls, name, instrumented(f"{prefix}.{name}")(attribute))
+        return cls
+    return decorator
+
+
+def instrument_guard(guard):
+    """Декоратор перевірок station_decorators.
+
+    Вимірюється лише сама перевірка (до виклику захищеного методу), а не дія, яку вона захищає.
+    Перевірки, що не пропустили виклик, рахуються як відхилені (rejections).
+    """
+    name = f"guard.{guard.__name__}"
+
+    @wraps(guard)
+    def decorator(func):
+        local = threading.local()
+
+        def passed(*args, **kwargs):
+            if getattr(local, "started", None) is not None:
+                _metrics(name).record(perf_counter_ns() - local.started)
+                local.started = None
+            return func(*args, **kwargs)
+
+        checked = guard(passed)
+
+        @wraps(func)
+        def wrapper(*args, **kwargs):
+            if not _enabled:
+                return checked(*args, **kwargs)
+            local.started = perf_counter_ns()
+            result = checked(*args, **kwargs)
+            if local.started is not None:
+                operation = _metrics(name)
+                operation.record(perf_counter_ns() - local.started)
+                with operation._lock:
+                    operation.rejections += 1
+                local.started = None
+            return result
+        return wrapper
+    return decorator
+
+
+def export_prometheus() -> str:
+    """Повертає знімок показників у текстовому форматі Prometheus (версія 0.0.4)."""
+    operations = get_operations()
+    lines = [
+        "# HELP buspark_operation_duration_seconds Час виконання операцій станції.",
+        "# TYPE buspark_operation_duration_seconds histogram",
+    ]
+    for name, operation in operations.items():
+        cumulative = 0
+        for bound, bucket_count in zip(DURATION_BUCKETS, operation.duration_buckets):
+            cumulative += bucket_count
+            lines.append(f'buspark_operation_duration_seconds_bucket{{operation="{name}",le="{bound / 1e9:g}"}} {cumulative}')
+        lines.append(f'buspark_operation_duration_seconds_bucket{{operation="{name}",le="+Inf"}} {operation.count}')
+        lines.append(f'buspark_operation_duration_seconds_sum{{operation="{name}"}} {operation.total_ns / 1e9:.9f}')
+        lines.append(f'buspark_operation_duration_seconds_count{{operation="{name}"}} {operation.count}')
+
+    lines += [
+        "# HELP buspark_operation_result_size Кількість елементів у результатах операцій.",
+        "# TYPE buspark_operation_result_size histogram",
+    ]
+    for name, operation in operations.items():
+        if not operation.size_count:
+            continue
+        cumulative = 0
+        for bound, bucket_count in zip(SIZE_BUCKETS, operation.size_buckets):
+            cumulative += bucket_count
+            lines.append(f'buspark_operation_result_size_bucket{{operation="{name}",le="{bound}"}} {cumulative}')
+        lines.append(f'buspark_operation_result_size_bucket{{operation="{name}",le="+Inf"}} {operation.size_count}')
+        lines.append(f'buspark_operation_result_size_sum{{operation="{name}"}} {operation.size_total}')
+        lines.append(f'buspark_operation_result_size_count{{operation="{name}"}} {operation.size_count}')
+
+    lines += [
+        "# HELP buspark_operation_errors_total Кількість викликів операцій, що завершились виключенням.",
+        "# TYPE buspark_operation_errors_total counter",
+    ]
+    for name, operation in operations.items():
+        for error, error_count in sorted(operation.errors.items()):
+            lines.append(f'buspark_operation_errors_total{{operation="{name}",error="{error}"}} {error_count}')
+
+    lines += [
+        "# HELP buspark_guard_rejections_total Кількість викликів, не пропущених перевірками станції.",
+        "# TYPE buspark_guard_rejections_total counter",
+    ]
+    for name, operation in operations.items():
+        if name.startswith("guard."):
+            lines.append(f'buspark_guard_rejections_total{{operation="{name}"}} {operation.rejections}')
+    return "\n".join(lines) + "\n"
@@ -1,18 +1,121 @@
-from typing import Self
+import threading
+from contextlib import contextmanager
+from typing import (Iterator,
+                    Self,
+                    ValuesView)
 from pydantic import BaseModel
 from enum import Enum
 from datetime import (datetime, 
-                      timedelta)
+                      timedelta,
+                      time)
 
+from clock import (current_ns,
+                   to_ns,
+                   to_datetime,
+                   ns_to_timedelta)
 
-class City(BaseModel):
+
+_next_ids: dict[type, int] = {}
+_ids_lock = threading.Lock()
+_cities: dict[str, "City"] = {}
+_cities_lock = threading.Lock()
+_defaults: dict[type, dict] = {}
+
+
+def reserve_ids(model: type, next_id: int):
+    """Гарантує, що нові об'єкти моделі отримають ідентифікатори, не менші за next_id."""
+    with _ids_lock:
+        _next_ids[model] = max(_next_ids.get(model, 0), next_id)
+
+
+def next_id(model: type) -> int:
+    """Повертає ідентифікатор, який отримає наступний створений об'єкт моделі."""
+    return _next_ids.get(model, 0)
+
+
+def _allocate_id(model: type, requested_id: int | None) -> int:
+    with _ids_lock:
+        free_id = _next_ids.get(model, 0)
+        model_id = free_id if requested_id is None else requested_id
+        _next_ids[model] = max(free_id, model_id + 1)
+        return model_id
+
+
+class IdentifiedModel(BaseModel):
+    """
+    Базова модель зі стабільним цілим ідентифікатором.
+
+    Якщо ідентифікатор не передано, видається наступний ідентифікатор моделі.
+    Хешування та порівняння виконуються лише за типом та ідентифікатором (O(1)),
+    тому об'єкти можна використовувати як ключі словників та елементи множин.
+    Вкладені моделі не копіюються під час валідації, тож рейс містить той самий об'єкт автобуса.
+    Ідентифікатори видаються під блокуванням, тому об'єкти можна створювати з кількох потоків.
+
+    Дані, що вводить оператор, проходять повну валідацію pydantic. Дані з власного сховища станції
+    (журнал, знімок) та довірених пакетів команд створюються методом construct без валідації.
+    """
+    id: int = None
+
+
+    class Config:
+        copy_on_model_validation = 'none'
+
+
+    def __init__(self, **data):
+        data["id"] = _allocate_id(type(self), data.get("id"))
+        super().__init__(**data)
+
+    @classmethod
+    def construct(cls, _fields_set: set[str] | None = None, **values) -> Self:
+        """Створює об'єкт з довірених даних без валідації, видаючи ідентифікатор так само, як __init__."""
+        values["id"] = _allocate_id(cls, values.get("id"))
+        # Значення за замовчуванням моделей незмінні (None, елементи Enum), тому не копіюються,
+        # на відміну від BaseModel.construct.
+        defaults = _defaults.get(cls)
+        if defaults is None:
+            defaults = _defaults[cls] = {name: field.default for name, field in cls.__fields__.items() if not field.required}
+        model = cls.__new__(cls)
+        object.__setattr__(model, "__dict__", defaults | values)
+        object.__setattr__(model, "__fields_set__", set(values) if _fields_set is None else _fields_set)
+        return model
+
+    def __hash__(self) -> int:
+        return hash(self.id)
+
+    def __eq__(self, other) -> bool:
+        if not isinstance(other, IdentifiedModel):
+            return NotImplemented
+        return type(other) is type(self) and other.id == self.id
+
+
+class City(IdentifiedModel):
     title: str
 
+
+    class Config:
+        allow_mutation = False
+
+
+    @classmethod
+    def intern(cls, title: str) -> Self:
+        """Повертає єдиний об'єкт міста з заданою назвою, створюючи його за потреби.
+
+        Місто створюється під блокуванням, тому потоки, що одночасно додають маршрути з новим містом,
+        отримують той самий об'єкт, а ідентифікатор видається один раз.
+        """
+        city = _cities.get(title)
+        if city is None:
+            with _cities_lock:
+                city = _cities.get(title)
+                if city is None:
+                    city = _cities[title] = cls(title = title)
+        return city
+
     def __str__(self) -> str:
         return self.title
 
 
-class Route(BaseModel):
+class Route(IdentifiedModel):
     start_point: City
     end_point: City
 
@@ -26,7 +129,7 @@ class BusStatusEnum(str, Enum):
     IN_THE_PARKING = 'У парку'
 
 
-class Driver(BaseModel):
+class Driver(IdentifiedModel):
     first_name: str
     second_name: str
 
@@ -38,7 +141,7 @@ class Driver(BaseModel):
         return self.initials
 
 
-class Bus(BaseModel):
+class Bus(IdentifiedModel):
     number: str
     driver: Driver
     route: Route = None
@@ -49,52 +152,289 @@ class Bus(BaseModel):
 
 
 class Departure(BaseModel): 
+    """
+    Рейс автобуса.
+
+    Час відправлення та прибуття зберігається у наносекундах годинника станції (departed_ns, arrived_ns),
+    тож тривалість рейсу не залежить від корекцій системного часу, а її обчислення не створює datetime.
+    departure_time та arrival_time обчислюються з них лише для відображення.
+    """
     bus: Bus
     route: Route
-    departure_time: datetime = None
-    arrival_time: datetime | None = None
+    departed_ns: int = None
+    arrived_ns: int | None = None
 
 
-    def start_travel(self):
-        self.departure_time = datetime.now()
+    def start_travel(self, at: datetime | int | None = None):
+        """Фіксує відправлення: at - datetime, наносекунди годинника станції або None (поточний час)."""
+        self.departed_ns = _to_clock_ns(at)
 
 
-    def finish_travel(self):
-        self.arrival_time = datetime.now()
+    def finish_travel(self, at: datetime | int | None = None):
+        """Фіксує прибуття: at - datetime, наносекунди годинника станції або None (поточний час)."""
+        self.arrived_ns = _to_clock_ns(at)
+
+
+    @property
+    def departure_time(self) -> datetime:
+        return to_datetime(self.departed_ns)
+
+
+    @property
+    def arrival_time(self) -> datetime | None:
+        return None if self.arrived_ns is None else to_datetime(self.arrived_ns)
+
+
+    def travel_ns(self, now_ns: int | None = None) -> int:
+        """Повертає тривалість рейсу у наносекундах; для активного рейсу - до now_ns (за замовчуванням - поточний час).
+        Щоб обчислити тривалість багатьох активних рейсів, достатньо один раз прочитати годинник (current_ns).
+        """
+        if self.arrived_ns is not None:
+            return self.arrived_ns - self.departed_ns
+        return (current_ns() if now_ns is None else now_ns) - self.departed_ns
 
 
     @property
     def travel_time(self) -> timedelta:
-        if not self.arrival_time:
-            time_difference = datetime.now() - self.departure_time
-        else:
-            time_difference = self.arrival_time - self.departure_time
-        return time_difference
+        return ns_to_timedelta(self.travel_ns())
+
+
+    def __iter__(self):
+        # Поля для відображення та серіалізації (serializers.to_primitive): час - у вигляді datetime.
+        yield "bus", self.bus
+        yield "route", self.route
+        yield "departure_time", self.departure_time
+        yield "arrival_time", self.arrival_time
     
 
+def _to_clock_ns(at: datetime | int | None) -> int:
+    if at is None:
+        return current_ns()
+    return at if isinstance(at, int) else to_ns(at)
+
+
+class DepartureRecord(BaseModel):
+    """
+    Рейс, прочитаний з колонкової історії рейсів (або активний рейс).
+
+    Час зберігається у мікросекундах від початку епохи, як у колонках історії (departed_us, arrived_us),
+    тому тривалість рейсу не залежить від переходу на літній/зимовий час.
+    departure_time та arrival_time обчислюються з них лише для відображення.
+    """
+    route: Route
+    departed_us: int
+    arrived_us: int | None = None
+
+
+    @property
+    def departure_time(self) -> datetime:
+        return to_datetime(self.departed_us * 1_000)
+
+
+    @property
+    def arrival_time(self) -> datetime | None:
+        return None if self.arrived_us is None else to_datetime(self.arrived_us * 1_000)
+
+
+    def travel_us(self, now_us: int | None = None) -> int:
+        """Повертає тривалість рейсу у мікросекундах; для активного рейсу - до now_us (за замовчуванням - поточний час)."""
+        if self.arrived_us is not None:
+            return self.arrived_us - self.departed_us
+        return (current_ns() // 1_000 if now_us is None else now_us) - self.departed_us
+
+
+    @property
+    def travel_time(self) -> timedelta:
+        return timedelta(microseconds = self.travel_us())
+
+
+    def __iter__(self):
+        yield "route", self.route
+        yield "departure_time", self.departure_time
+        yield "arrival_time", self.arrival_time
+
+
 class BusDepartureResults(BaseModel):
     bus: Bus
-    departures: list[Departure]
+    departures: list[DepartureRecord]
     total_count: int
     total_time: timedelta
 
 
+class BusTotals(BaseModel):
+    trip_count: int = 0
+    finished_time: timedelta = timedelta()
+
+
+class BusDepartureSummary(BaseModel):
+    bus: Bus
+    total_count: int
+    total_time: timedelta
+    finished_time: timedelta
+    open_time: timedelta
+
+
+class ReportGroupEnum(str, Enum):
+    BUS = 'Автобус'
+    ROUTE = 'Маршрут'
+    DRIVER = 'Водій'
+    TIME = 'Період часу'
+
+
+class PartitionEnum(str, Enum):
+    BUS = 'Автобус'
+    TIME = 'Період часу'
+
+
+class PlanCriterionEnum(str, Enum):
+    HOPS = 'Найменше пересадок'
+    TIME = 'Найменший час у дорозі'
+
+
+class RoutePlanLeg(BaseModel):
+    start_point: City
+    end_point: City
+    routes: list[Route]
+    buses: list[Bus]
+    mean_time: timedelta | None
+
+
+class RoutePlan(BaseModel):
+    start_point: City
+    end_point: City
+    criterion: PlanCriterionEnum
+    legs: list[RoutePlanLeg]
+    total_time: timedelta | None
+
+
+class TravelTimeStats(BaseModel):
+    group: str
+    count: int
+    total_time: timedelta
+    mean_time: timedelta
+    min_time: timedelta
+    max_time: timedelta
+    percentiles: dict[float, timedelta]
+
+
+class RouteWindowStats(BaseModel):
+    route: Route
+    window_start: datetime
+    window_end: datetime
+    started_count: int
+    finished_count: int
+    total_time: timedelta
+    mean_time: timedelta | None
+
+
+class PlannedDeparture(IdentifiedModel):
+    """Щоденний рейс маршруту за розкладом."""
+    route: Route
+    departs_at: time
+
+    def __str__(self) -> str:
+        return f'{self.departs_at:%H:%M} | {self.route}'
+
+
+class ScheduleStatusEnum(str, Enum):
+    DISPATCHED = 'Відправлено'
+    MISSED = 'Пропущено'
+
+
+class ScheduledDispatch(BaseModel):
+    planned_departure: PlannedDeparture
+    planned_time: datetime
+    status: ScheduleStatusEnum
+    departure: Departure | None = None
+
+
 class Park(BaseModel):
+    """
+    Клас Park - автобуси, що знаходяться у парку (синглтон).
+
+    Автобуси зберігаються у словнику за ідентифікатором, який зберігає порядок додавання,
+    тому додавання, видалення та перевірка наявності виконуються за O(1) без порівняння моделей.
+    Повторне додавання автобуса нічого не змінює. Для кожного маршруту підтримується
+    кількість автобусів у парку; маршрут автобуса, що змінився у парку, оновлюється методом change_bus_route.
+    Зміни виконуються під блокуванням парку; parked_buses повертає копію списку автобусів під тим самим блокуванням,
+    тож її можна переглядати, поки інші потоки змінюють парк. Частим викликам, яким копія не потрібна,
+    locked_buses надає самі автобуси парку без копіювання, утримуючи блокування на час блоку with.
+    count_route_buses не блокується.
+    """
     __instance = None
+    __instance_lock = threading.Lock()
 
     
     def __new__(cls, *args, **kwargs) -> Self:
-        if not cls.__instance:
-            cls.__instance = super().__new__(cls, *args, **kwargs)
-            cls.bus_list: list[Bus] = []
+        with cls.__instance_lock:
+            # Порожній парк хибний (__len__), тому перевіряється саме наявність екземпляра.
+            if cls.__instance is None:
+                cls.__instance = super().__new__(cls, *args, **kwargs)
+                cls._lock = threading.Lock()
+                cls._buses: dict[int, Bus] = {}
+                cls._bus_routes: dict[int, Route | None] = {}
+                cls._route_counts: dict[int, int] = {}
         return cls.__instance
 
+    def __len__(self) -> int:
+        return len(self._buses)
+
+    def __contains__(self, bus: Bus) -> bool:
+        return bus.id in self._buses
+
     def add_bus(self, bus: Bus):
-        self.bus_list.append(bus)
-    
+        with self._lock:
+            if bus.id in self._buses:
+                return
+            self._buses[bus.id] = bus
+            self._count_route(bus.id, bus.route)
+
     def remove_bus(self, bus: Bus):
-        self.bus_list.remove(bus)
+        with self._lock:
+            if self._buses.pop(bus.id, None) is not None:
+                self._uncount_route(bus.id)
+
+    def change_bus_route(self, bus: Bus):
+        """Оновлює кількість автобусів маршрутів після зміни маршруту автобуса, що знаходиться у парку."""
+        with self._lock:
+            if bus.id in self._buses:
+                self._uncount_route(bus.id)
+                self._count_route(bus.id, bus.route)
+
+    def clear(self):
+        with self._lock:
+            self._buses.clear()
+            self._bus_routes.clear()
+            self._route_counts.clear()
+
+    def count_route_buses(self, route: Route) -> int:
+        """Повертає кількість автобусів маршруту, що знаходяться у парку."""
+        return self._route_counts.get(route.id, 0)
 
     @property
     def parked_buses(self) -> list[Bus]:
-        return self.bus_list
+        """Автобуси у парку в порядку додавання (копія, зроблена під блокуванням парку)."""
+        with self._lock:
+            return list(self._buses.values())
+
+    @contextmanager
+    def locked_buses(self) -> Iterator[ValuesView[Bus]]:
+        """Надає автобуси парку в порядку додавання без копіювання, утримуючи блокування парку на час блоку with.
+
+        Поки блок виконується, інші потоки не можуть змінити парк, тому в ньому не можна додавати
+        чи видаляти автобуси парку; перегляд не слід використовувати після виходу з блоку.
+        """
+        with self._lock:
+            yield self._buses.values()
+
+    def _count_route(self, bus_id: int, route: Route | None):
+        self._bus_routes[bus_id] = route
+        if route is not None:
+            self._route_counts[route.id] = self._route_counts.get(route.id, 0) + 1
+
+    def _uncount_route(self, bus_id: int):
+        route = self._bus_routes.pop(bus_id)
+        if route is not None:
+            self._route_counts[route.id] -= 1
+            if not self._route_counts[route.id]:
+                del self._route_counts[route.id]
@@ -0,0 +1,198 @@
+import atexit
+import multiprocessing
+import os
+import threading
+from array import array
+from concurrent.futures import ProcessPoolExecutor
+from heapq import (heapify,
+                   heapreplace)
+from multiprocessing.shared_memory import SharedMemory
+
+try:
+    import numpy as np
+except ImportError:
+    np = None
+
+
+# Без змінної середовища кількість процесів обмежена: на машинах з багатьма ядрами аналітика
+# не повинна займати їх усі (та пам'ять для кожного процесу) поряд зі станцією.
+MAX_ANALYTICS_WORKERS = 8
+ANALYTICS_WORKERS = (int(os.environ.get("BUSPARK_ANALYTICS_WORKERS", "0"))
+                     or min(os.cpu_count() or 1, MAX_ANALYTICS_WORKERS))
+# Для меншої історії запуск завдань у процесах не окупається, і рейси агрегуються у поточному процесі.
+PARALLEL_MIN_ROWS = 1_000_000
+
+_executors: dict[int, ProcessPoolExecutor] = {}
+_executors_lock = threading.Lock()
+
+
+def aggregate_bus_totals(bus_ids, departure_times, arrival_times, start: int, end: int) -> dict[int, tuple[int, int]]:
+    """Рахує для кожного автобуса кількість та сумарний час (у мікросекундах) рейсів, відправлених у [start, end).
+
+    Якщо встановлено NumPy, агрегування виконується векторизовано (сортування за автобусом та reduceat),
+    інакше - одним проходом на чистому Python з тим самим результатом.
+
+    Параметри:
+        bus_ids, departure_times, arrival_times: Колонки історії (array('q'), memoryview формату 'q' або масиви NumPy).
+        start (int): Початок періоду у мікросекундах.
+        end (int): Кінець періоду у мікросекундах (не включно).
+
+    Returns:
+        dict[int, tuple[int, int]]: Кількість рейсів та сумарний час за ідентифікатором автобуса.
+    """
+    if np is not None:
+        return _aggregate_with_numpy(bus_ids, departure_times, arrival_times, start, end)
+    totals = {}
+    for bus_id, departure_time, arrival_time in zip(bus_ids, departure_times, arrival_times):
+        if start <= departure_time < end:
+            bus_totals = totals.get(bus_id)
+            if bus_totals is None:
+                totals[bus_id] = [1, arrival_time - departure_time]
+            else:
+                bus_totals[0] += 1
+                bus_totals[1] += arrival_time - departure_time
+    return {bus_id: (count, total) for bus_id, (count, total) in totals.items()}
+
+
+def merge_bus_totals(partials) -> dict[int, tuple[int, int]]:
+    """Об'єднує часткові результати aggregate_bus_totals (кількість та час додаються)."""
+    merged = {}
+    for partial in partials:
+        for bus_id, (count, total) in partial.items():
+            merged_count, merged_total = merged.get(bus_id, (0, 0))
+            merged[bus_id] = (merged_count + count, merged_total + total)
+    return merged
+
+
+def partition_rows(rows: int, partitions: int) -> list[tuple[int, int]]:
+    """Ділить рядки історії на partitions суміжних діапазонів однакового розміру.
+
+    Рейси додаються до історії у порядку прибуття, тож кожен діапазон - це рейси одного проміжку часу.
+    """
+    bounds = [rows * index // partitions for index in range(partitions + 1)]
+    return [(low, high) for low, high in zip(bounds, bounds[1:]) if low < high]
+
+
+def partition_buses(bus_rows: dict[int, array], partitions: int) -> list[list[int]]:
+    """Розподіляє автобуси між partitions частинами з приблизно однаковою кількістю рейсів
+    (автобуси з найбільшою кількістю рейсів - першими, кожен до найменш завантаженої частини)."""
+    loads = [(0, index) for index in range(partitions)]
+    groups = [[] for _ in range(partitions)]
+    heapify(loads)
+    for bus_id in sorted(bus_rows, key = lambda bus_id: len(bus_rows[bus_id]), reverse = True):
+        load, index = loads[0]
+        groups[index].append(bus_id)
+        heapreplace(loads, (load + len(bus_rows[bus_id]), index))
+    return [group for group in groups if group]
+
+
+def aggregate_in_processes(columns: tuple[array, array, array], start: int, end: int,
+                           workers: int, bus_rows: dict[int, array] | None = None) -> dict[int, tuple[int, int]]:
+    """Рахує aggregate_bus_totals частинами історії у пулі з workers процесів та об'єднує результати.
+
+    Колонки (та номери рядків автобусів) копіюються в один блок спільної пам'яті, тож процеси
+    отримують лише назву блоку та межі своєї частини, а не серіалізовані рейси.
+    Історія ділиться за автобусами, якщо передано номери рядків автобусів (bus_rows, див. partition_buses),
+    інакше - на проміжки часу (див. partition_rows).
+    Результат не залежить від кількості процесів і способу поділу: кількість та час лише додаються.
+
+    Параметри:
+        columns (tuple[array, array, array]): Ідентифікатори автобусів, час відправлення та час прибуття.
+        start (int): Початок періоду у мікросекундах.
+        end (int): Кінець періоду у мікросекундах (не включно).
+        workers (int): Кількість процесів.
+        bus_rows (dict[int, array] | None): Номери рядків історії кожного автобуса.
+
+    Returns:
+        dict[int, tuple[int, int]]: Кількість рейсів та сумарний час за ідентифікатором автобуса.
+    """
+    rows = len(columns[0])
+    if bus_rows is None:
+        parts, row_index = partition_rows(rows, workers), b""
+    else:
+        parts, offset, chunks = [], 0, []
+        for group in partition_buses(bus_rows, workers):
+            chunks.extend(bus_rows[bus_id].tobytes() for bus_id in group)
+            size = sum(len(bus_rows[bus_id]) for bus_id in group)
+            parts.append((offset, offset + size))
+            offset += size
+        row_index = b"".join(chunks)
+
+    shared = SharedMemory(create = True, size = max(1, 3 * rows * 8 + len(row_index)))
+    try:
+        position = 0
+        for chunk in (*(memoryview(column).cast('B') for column in columns), row_index):
+            shared.buf[position:position + len(chunk)] = chunk
+            position += len(chunk)
+        executor = _get_executor(workers)
+        futures = [executor.submit(_aggregate_shared_part, shared.name, rows, low, high, bus_rows is not None, start, end)
+                   for low, high in parts]
+        return merge_bus_totals(future.result() for future in futures)
+    finally:
+        shared.close()
+        shared.unlink()
+
+
+def _aggregate_shared_part(name: str, rows: int, low: int, high: int, by_bus: bool,
+                           start: int, end: int) -> dict[int, tuple[int, int]]:
+    shared = SharedMemory(name = name)
+    data = shared.buf.cast('q')
+    try:
+        return _aggregate_part(data, rows, low, high, by_bus, start, end)
+    finally:
+        data.release()
+        shared.close()
+
+
+def _aggregate_part(data: memoryview, rows: int, low: int, high: int, by_bus: bool,
+                    start: int, end: int) -> dict[int, tuple[int, int]]:
+    columns = [data[index * rows:(index + 1) * rows] for index in range(3)]
+    if not by_bus:
+        return aggregate_bus_totals(*(column[low:high] for column in columns), start, end)
+    part_rows = data[3 * rows + low:3 * rows + high]
+    if np is not None:
+        indexes = np.frombuffer(part_rows, dtype = np.int64)
+        return aggregate_bus_totals(*(np.frombuffer(column, dtype = np.int64)[indexes] for column in columns), start, end)
+    return aggregate_bus_totals(*(array('q', (column[row] for row in part_rows)) for column in columns), start, end)
+
+
+def shutdown_executors():
+    """Зупиняє пули процесів аналітики; наступний паралельний підрахунок створить пул знову.
+
+    Викликається під час завершення процесу (atexit).
+    """
+    with _executors_lock:
+        executors = list(_executors.values())
+        _executors.clear()
+    for executor in executors:
+        executor.shutdown(wait = True, cancel_futures = True)
+
+
+atexit.register(shutdown_executors)
+
+
+def _get_executor(workers: int) -> ProcessPoolExecutor:
+    # Пул створюється один раз для кожної кількості процесів. Процеси запускаються не через fork,
+    # бо станція працює з кількома потоками (термінали, HTTP API, розклад).
+    with _executors_lock:
+        executor = _executors.get(workers)
+        if executor is None:
+            method = "forkserver" if "forkserver" in multiprocessing.get_all_start_methods() else "spawn"
+            executor = _executors[workers] = ProcessPoolExecutor(workers, multiprocessing.get_context(method))
+        return executor
+
+
+def _aggregate_with_numpy(bus_ids, departure_times, arrival_times, start: int, end: int) -> dict[int, tuple[int, int]]:
+    bus_ids, departure_times, arrival_times = (np.asarray(column, dtype = np.int64)
+                                               for column in (bus_ids, departure_times, arrival_times))
+    selected = (departure_times >= start) & (departure_times < end)
+    bus_ids = bus_ids[selected]
+    if not len(bus_ids):
+        return {}
+    order = np.argsort(bus_ids, kind = "stable")
+    bus_ids = bus_ids[order]
+    durations = (arrival_times[selected] - departure_times[selected])[order]
+    starts = np.flatnonzero(np.concatenate(([True], bus_ids[1:] != bus_ids[:-1])))
+    counts = np.diff(np.append(starts, len(bus_ids)))
+    totals = np.add.reduceat(durations, starts)
+    return {int(bus_id): (int(count), int(total)) for bus_id, count, total in zip(bus_ids[starts], counts, totals)}
@@ -0,0 +1,605 @@
+import threading
+from array import array
+from contextlib import (contextmanager,
+                        ExitStack)
+from datetime import (datetime,
+                      timedelta,
+                      time)
+from itertools import count
+from typing import Callable
+
+from models import (City,
+                    Driver,
+                    Bus,
+                    Route,
+                    Departure,
+                    BusStatusEnum,
+                    BusTotals,
+                    PlannedDeparture,
+                    reserve_ids,
+                    next_id)
+from journal import EventJournal
+from sqlite_store import SqliteStore
+from history import (DepartureHistory,
+                     to_microseconds)
+from route_network import RouteNetwork
+from search_index import (SearchIndex,
+                          SEARCH_LIMIT)
+from windows import (DepartureWindows,
+                     WindowTotals)
+from clock import ns_to_timedelta
+from signals import CommandRejected
+
+
+LOCK_STRIPES = 64
+
+
+class FleetRegistry:
+    """
+    Клас FleetRegistry зберігає автобуси, маршрути та рейси станції разом з індексами до них.
+    Належить класу AutoStation та передається у Manager, Dispatcher, Analytic.
+
+    Автобуси та маршрути визначаються стабільними ідентифікаторами моделей (Bus.id, Route.id),
+    за якими побудовані всі внутрішні індекси; ідентифікатор маршруту є його ключем у реєстрі.
+
+    Індекси:
+    - автобуси за номером;
+    - автобуси за маршрутом;
+    - автобуси за статусом;
+    - активний рейс за номером автобуса;
+    - автобуси з маршрутом та автобуси, готові до відправлення (усі та за маршрутом);
+    - рейси розкладу (PlannedDeparture) за ідентифікатором та за маршрутом;
+    - накопичені підсумки рейсів автобуса (BusTotals);
+    - показники рейсів маршрутів у часових вікнах (DepartureWindows);
+    - мережа маршрутів - граф міст, з'єднаних маршрутами (RouteNetwork);
+    - пошукові індекси автобусів (за номером та ім'ям водія) та міст (SearchIndex).
+
+    Активні рейси зберігаються як об'єкти Departure, а завершені - у колонковій історії
+    DepartureHistory, де автобус та маршрут визначаються ідентифікаторами.
+    Видалені маршрути та автобуси залишаються доступними за ключем/ідентифікатором для відображення історії
+    (до ущільнення історії).
+
+    Усі зміни стану (створення/видалення, відправлення, повернення, зміна маршруту)
+    мають проходити через методи цього класу, щоб індекси залишались актуальними.
+    Якщо до реєстру під'єднано журнал (атрибут journal), кожна зміна також записується у нього.
+    Якщо під'єднано сховище SQLite (атрибут store), кожна зміна також передається у нього,
+    а завершені рейси залишаються у сховищі і після ущільнення історії реєстру.
+    Запити повертають результат за O(1) або O(розмір результату).
+
+    Паралельна робота кількох терміналів:
+    - запити не блокуються: вони повертають копії індексів, які створюються без перемикання потоків;
+    - зміни автобуса виконуються під його блокуванням (lock_bus) - одним з LOCK_STRIPES блокувань,
+      обраним за ідентифікатором автобуса, тож зміни різних автобусів не чекають одна на одну;
+    - створення та видалення автобусів і маршрутів, а також зміна маршруту виконуються
+      під блокуванням структури (structure_lock), яке береться до блокування автобуса;
+    - історія, часові вікна та підсумки оновлюються під окремим коротким блокуванням;
+    - кожна зміна збільшує версію стану (атрибут version), за якою клієнти визначають, чи змінився стан;
+    - exclusive() зупиняє всі зміни, наприклад для створення знімку стану.
+    """
+
+    def __init__(self):
+        self.journal: EventJournal | None = None
+        self.store: SqliteStore | None = None
+        self.buses: dict[str, Bus] = {}
+        self.routes: dict[int, Route] = {}
+        self.history = DepartureHistory()
+        self.total_trips = 0
+        self.windows = DepartureWindows()
+        self.network = RouteNetwork()
+        self.bus_search = SearchIndex()
+        self.city_search = SearchIndex()
+        self._buses_by_id: dict[int, Bus] = {}
+        self._retired_buses: dict[int, Bus] = {}
+        self._retired_routes: dict[int, Route] = {}
+        self._route_buses: dict[int, dict[int, Bus]] = {}
+        self._status_buses: dict[BusStatusEnum, dict[int, Bus]] = {status: {} for status in BusStatusEnum}
+        self._routed_buses: dict[int, Bus] = {}
+        self._ready_buses: dict[int, Bus] = {}
+        self._route_ready_buses: dict[int, dict[int, Bus]] = {}
+        self._planned_departures: dict[int, PlannedDeparture] = {}
+        self._route_planned_departures: dict[int, dict[int, PlannedDeparture]] = {}
+        self._active_departures: dict[int, Departure] = {}
+        self._bus_totals: dict[int, BusTotals] = {}
+        self.version = 0
+        self._versions = count(1)
+        self.structure_lock = threading.RLock()
+        self._bus_locks = tuple(threading.RLock() for _ in range(LOCK_STRIPES))
+        self._stats_lock = threading.RLock()
+
+
+    @contextmanager
+    def lock_bus(self, bus: Bus):
+        """Блокує зміни автобуса іншими потоками на час блоку with.
+
+        Raises:
+            CommandRejected: Автобус видалено іншим потоком до отримання блокування.
+        """
+        with self._bus_locks[bus.id % LOCK_STRIPES]:
+            if self._buses_by_id.get(bus.id) is not bus:
+                raise CommandRejected(f"[!] {bus} вже видалено!")
+            yield
+
+
+    @contextmanager
+    def exclusive(self):
+        """Зупиняє всі зміни реєстру на час блоку with."""
+        with ExitStack() as stack:
+            stack.enter_context(self.structure_lock)
+            for lock in self._bus_locks:
+                stack.enter_context(lock)
+            stack.enter_context(self._stats_lock)
+            yield
+
+
+    def add_bus(self, bus: Bus):
+        """Реєструє автобус у всіх індексах.
+
+        Параметри:
+            bus (Bus): Новий автобус.
+        """
+        self.buses[bus.number] = bus
+        self._buses_by_id[bus.id] = bus
+        with self._stats_lock:
+            self._bus_totals[bus.id] = BusTotals()
+        self._status_buses[bus.status][bus.id] = bus
+        if bus.route is not None:
+            self._route_buses[bus.route.id][bus.id] = bus
+            self._routed_buses[bus.id] = bus
+        self._refresh_ready(bus)
+        self.bus_search.add(bus.id, f"{bus.number} {bus.driver.first_name} {bus.driver.second_name}", bus)
+        if self.store:
+            self.store.add_bus(bus.id, bus.number, bus.driver.first_name, bus.driver.second_name,
+                               None if bus.route is None else bus.route.id)
+        self._record("bus", bus.number, bus.driver.first_name, bus.driver.second_name, bus.id)
+
+
+    def remove_bus(self, bus: Bus):
+        """Прибирає автобус з усіх індексів.
+
+        Параметри:
+            bus (Bus): Автобус для видалення.
+        """
+        del self.buses[bus.number]
+        self._status_buses[bus.status].pop(bus.id, None)
+        if bus.route is not None:
+            self._route_buses[bus.route.id].pop(bus.id, None)
+            self._route_ready_buses[bus.route.id].pop(bus.id, None)
+        self._routed_buses.pop(bus.id, None)
+        self._ready_buses.pop(bus.id, None)
+        self._active_departures.pop(bus.id, None)
+        with self._stats_lock:
+            del self._bus_totals[bus.id]
+        self._retired_buses[bus.id] = self._buses_by_id.pop(bus.id)
+        self.bus_search.remove(bus.id)
+        if self.store:
+            self.store.remove_bus(bus.id)
+        self._record("bus_del", bus.number)
+
+
+    def get_bus(self, number: str) -> Bus | None:
+        """Повертає автобус за номером або None."""
+        return self.buses.get(number)
+
+
+    def get_bus_by_id(self, bus_id: int) -> Bus:
+        """Повертає автобус за ідентифікатором, у тому числі вже видалений автобус."""
+        return self._buses_by_id.get(bus_id) or self._retired_buses[bus_id]
+
+
+    def search_buses(self, query: str, limit: int = SEARCH_LIMIT, accept: Callable[[Bus], bool] | None = None) -> list[Bus]:
+        """Повертає до limit автобусів, номер або ім'я водія яких відповідає запиту (див. SearchIndex)."""
+        return self.bus_search.search(query, limit, accept)
+
+
+    def search_cities(self, query: str, limit: int = SEARCH_LIMIT) -> list[City]:
+        """Повертає до limit міст мережі маршрутів, назва яких відповідає запиту."""
+        return self.city_search.search(query, limit)
+
+
+    def search_routes(self, query: str, limit: int = SEARCH_LIMIT) -> list[Route]:
+        """Повертає до limit маршрутів, що проходять через міста, назва яких відповідає запиту."""
+        routes = {}
+        for city in self.city_search.search(query, limit):
+            for route in self.network.get_city_routes(city):
+                routes.setdefault(route.id, route)
+        return list(routes.values())[:limit]
+
+
+    def get_known_buses(self) -> dict[int, Bus]:
+        """Повертає усі автобуси за ідентифікаторами, у тому числі видалені автобуси, рейси яких є в історії."""
+        return self._buses_by_id | self._retired_buses
+
+
+    def add_route(self, route: Route):
+        """Реєструє маршрут за його ідентифікатором.
+
+        Параметри:
+            route (Route): Новий маршрут.
+        """
+        self.routes[route.id] = route
+        self._route_buses[route.id] = {}
+        self._route_ready_buses[route.id] = {}
+        self._route_planned_departures[route.id] = {}
+        self.network.add_route(route)
+        for city in (route.start_point, route.end_point):
+            if city not in self.city_search:
+                self.city_search.add(city.id, city.title, city)
+        if self.store:
+            self.store.add_route(route.id, route.start_point.title, route.end_point.title)
+        self._record("route", route.id, route.start_point.title, route.end_point.title)
+
+
+    def remove_route(self, route: Route):
+        """Прибирає маршрут та його рейси розкладу з реєстру. Автобуси маршруту мають бути відв'язані заздалегідь.
+
+        Параметри:
+            route (Route): Маршрут для видалення.
+        """
+        self._retired_routes[route.id] = self.routes.pop(route.id)
+        del self._route_buses[route.id]
+        del self._route_ready_buses[route.id]
+        for planned_departure_id in self._route_planned_departures.pop(route.id):
+            del self._planned_departures[planned_departure_id]
+        self.network.remove_route(route)
+        for city in (route.start_point, route.end_point):
+            if self.network.get_city(city.title) is None:
+                self.city_search.remove(city.id)
+        if self.store:
+            self.store.remove_route(route.id)
+        self._record("route_del", route.id)
+
+
+    def add_planned_departure(self, planned_departure: PlannedDeparture):
+        """Додає рейс до розкладу маршруту.
+
+        Параметри:
+            planned_departure (PlannedDeparture): Новий рейс розкладу.
+        """
+        self._planned_departures[planned_departure.id] = planned_departure
+        self._route_planned_departures[planned_departure.route.id][planned_departure.id] = planned_departure
+        self._record("plan", planned_departure.id, planned_departure.route.id, planned_departure.departs_at.isoformat())
+
+
+    def remove_planned_departure(self, planned_departure: PlannedDeparture):
+        """Прибирає рейс з розкладу маршруту.
+
+        Параметри:
+            planned_departure (PlannedDeparture): Рейс розкладу для видалення.
+        """
+        del self._planned_departures[planned_departure.id]
+        del self._route_planned_departures[planned_departure.route.id][planned_departure.id]
+        self._record("plan_del", planned_departure.id)
+
+
+    def get_planned_departure(self, planned_departure_id: int) -> PlannedDeparture | None:
+        """Повертає рейс розкладу за ідентифікатором або None."""
+        return self._planned_departures.get(planned_departure_id)
+
+
+    def get_timetable(self, route: Route | None = None) -> list[PlannedDeparture]:
+        """Повертає рейси розкладу (усі або заданого маршруту), відсортовані за часом відправлення."""
+        planned_departures = (self._planned_departures if route is None
+                              else self._route_planned_departures[route.id])
+        return sorted(planned_departures.values(), key = lambda planned_departure: planned_departure.departs_at)
+
+
+    def get_route_by_key(self, key: int) -> Route:
+        """Повертає маршрут за ідентифікатором, у тому числі вже видалений маршрут."""
+        return self.routes.get(key) or self._retired_routes[key]
+
+
+    def set_bus_route(self, bus: Bus, route: Route | None):
+        """Змінює маршрут автобуса та оновлює індекси.
+
+        Параметри:
+            bus (Bus): Автобус.
+            route (Route | None): Новий маршрут або None, щоб відв'язати автобус.
+        """
+        if bus.route is not None:
+            self._route_buses[bus.route.id].pop(bus.id, None)
+            self._route_ready_buses[bus.route.id].pop(bus.id, None)
+        bus.route = route
+        if route is not None:
+            self._route_buses[route.id][bus.id] = bus
+            self._routed_buses[bus.id] = bus
+        else:
+            self._routed_buses.pop(bus.id, None)
+        self._refresh_ready(bus)
+        if self.store:
+            self.store.set_bus_route(bus.id, None if route is None else route.id)
+        self._record("set_route", bus.number, None if route is None else route.id)
+
+
+    def open_departure(self, bus: Bus, departure: Departure):
+        """Реєструє розпочатий рейс автобуса.
+
+        Параметри:
+            bus (Bus): Відправлений автобус.
+            departure (Departure): Рейс, у якому знаходиться автобус.
+
+        Рейси автобуса в історії та сховищі ідентифікуються часом відправлення у мікросекундах, тому рейс,
+        відправлений у ту саму мікросекунду, що й попередній рейс автобуса (наприклад, з ManualClock),
+        зсувається на наступну мікросекунду. У журнал записується вже зсунутий час.
+        """
+        with self._stats_lock:
+            bus_rows = self.history.bus_rows(bus.id)
+            previous_time = self.history.departure_times[bus_rows[-1]] if bus_rows else None
+        if previous_time is not None and departure.departed_ns // 1_000 <= previous_time:
+            departure.departed_ns = (previous_time + 1) * 1_000
+        self._active_departures[bus.id] = departure
+        self._set_status(bus, BusStatusEnum.ON_THE_ROAD)
+        with self._stats_lock:
+            self._bus_totals[bus.id].trip_count += 1
+            self.total_trips += 1
+            self.windows.record_start(departure.route.id, departure.departed_ns // 1_000)
+        if self.store:
+            self.store.open_departure(bus.id, departure.route.id, departure.departed_ns // 1_000)
+        self._record("depart", bus.number, departure.departed_ns)
+
+
+    def close_departure(self, bus: Bus, at: datetime | int | None = None) -> Departure | None:
+        """Завершує активний рейс автобуса, якщо він є.
+
+        Параметри:
+            bus (Bus): Автобус.
+            at (datetime | int | None): Час прибуття (при відновленні з журналу; datetime або наносекунди годинника станції),
+                інакше поточний час.
+
+        Returns:
+            Departure | None: Завершений рейс або None, якщо автобус не був у дорозі.
+        """
+        departure = self._active_departures.pop(bus.id, None)
+        if departure is None:
+            return None
+        departure.finish_travel(at)
+        departure.arrived_ns = max(departure.arrived_ns, departure.departed_ns)
+        departure_time, arrival_time = departure.departed_ns // 1_000, departure.arrived_ns // 1_000
+        with self._stats_lock:
+            self.history.append(bus.id, departure.route.id, departure_time, arrival_time)
+            self.windows.record_finish(departure.route.id, departure_time, arrival_time)
+            self._bus_totals[bus.id].finished_time += ns_to_timedelta(departure.travel_ns())
+        self._set_status(bus, BusStatusEnum.IN_THE_PARKING)
+        if self.store:
+            self.store.close_departure(bus.id, departure_time, arrival_time)
+        self._record("return", bus.number, departure.arrived_ns)
+        return departure
+
+
+    def compact(self, before: datetime):
+        """Прибирає з історії завершені рейси, що прибули раніше заданого часу, та рейси видалених автобусів.
+        Видалені маршрути, на які більше не посилаються рейси історії та часові вікна, також прибираються.
+
+        Час та кількість прибраних рейсів залишаються у накопичених підсумках автобусів (BusTotals),
+        тому аналітика не змінюється, а пам'ять залежить лише від розміру автопарку.
+
+        Параметри:
+            before (datetime): Рейси, що прибули раніше цього часу, прибираються з історії.
+        """
+        with self._stats_lock:
+            self.history.compact(to_microseconds(before), set(self._buses_by_id))
+            self._retired_buses.clear()
+            referenced_keys = set(self.history.route_keys) | self.windows.route_keys()
+            for key in [key for key in self._retired_routes if key not in referenced_keys]:
+                del self._retired_routes[key]
+
+
+    def sync_store(self):
+        """Записує у під'єднане сховище SQLite поточний стан реєстру: маршрути, автобуси (у тому числі видалені),
+        активні рейси та завершені рейси з історії.
+
+        Зміни, що відбуваються після під'єднання сховища, передаються у нього одразу, тому синхронізація
+        потрібна лише для стану, відновленого без них (колонки історії зі знімку) або створеного до під'єднання.
+        Записи сховища ідемпотентні, тож повторна синхронізація не дублює рядки.
+        """
+        store = self.store
+        with self.exclusive():
+            for key, route in (self._retired_routes | self.routes).items():
+                store.add_route(key, route.start_point.title, route.end_point.title, retired = key not in self.routes)
+            for bus_id, bus in self._retired_buses.items():
+                store.add_bus(bus_id, bus.number, bus.driver.first_name, bus.driver.second_name, retired = True)
+            for bus in self._buses_by_id.values():
+                store.add_bus(bus.id, bus.number, bus.driver.first_name, bus.driver.second_name,
+                              None if bus.route is None else bus.route.id)
+            for bus_id, departure in self._active_departures.items():
+                store.open_departure(bus_id, departure.route.id, departure.departed_ns // 1_000)
+            store.add_departures(*self.history.columns())
+
+
+    def export_state(self) -> dict:
+        """Повертає стан реєстру у вигляді простих значень для збереження у знімку.
+
+        Returns:
+            dict: Маршрути, автобуси, активні рейси, колонки історії, підсумки автобусів та лічильники реєстру.
+        """
+        return {
+            "next_route_key": next_id(Route),
+            "next_bus_id": next_id(Bus),
+            "total_trips": self.total_trips,
+            "routes": [(key, route.start_point.title, route.end_point.title)
+                       for key, route in self.routes.items()],
+            "retired_routes": [(key, route.start_point.title, route.end_point.title)
+                               for key, route in self._retired_routes.items()],
+            "retired_buses": [(bus_id, bus.number, bus.driver.first_name, bus.driver.second_name)
+                              for bus_id, bus in self._retired_buses.items()],
+            "buses": [(bus.id, bus.number, bus.driver.first_name, bus.driver.second_name,
+                       None if bus.route is None else bus.route.id)
+                      for bus in self.buses.values()],
+            "active_departures": [(departure.bus.number, departure.departed_ns // 1_000)
+                                  for departure in self._active_departures.values()],
+            "history": self.history.export(),
+            "next_planned_departure_id": next_id(PlannedDeparture),
+            "timetable": [(planned_departure.id, planned_departure.route.id, planned_departure.departs_at.isoformat())
+                          for planned_departure in self._planned_departures.values()],
+            "totals": [(self._buses_by_id[bus_id].number, totals.trip_count, totals.finished_time.total_seconds())
+                       for bus_id, totals in self._bus_totals.items()],
+        }
+
+
+    def restore_state(self, state: dict):
+        """Відновлює стан порожнього реєстру зі значень, отриманих методом export_state.
+
+        Знімок записано самою станцією, тому моделі створюються без валідації (construct).
+
+        Параметри:
+            state (dict): Стан реєстру.
+        """
+        for key, start_point, end_point in state["routes"]:
+            self.add_route(Route.construct(id = key, start_point = City.intern(start_point), end_point = City.intern(end_point)))
+        for key, start_point, end_point in state["retired_routes"]:
+            self._retired_routes[key] = Route.construct(id = key,
+                                                        start_point = City.intern(start_point),
+                                                        end_point = City.intern(end_point))
+        reserve_ids(Route, state["next_route_key"])
+
+        for bus_id, number, first_name, second_name, route_key in state["buses"]:
+            bus = Bus.construct(id = bus_id, number = number,
+                                driver = Driver.construct(first_name = first_name, second_name = second_name))
+            self.add_bus(bus)
+            if route_key is not None:
+                self.set_bus_route(bus, self.routes[route_key])
+        for bus_id, number, first_name, second_name in state["retired_buses"]:
+            self._retired_buses[bus_id] = Bus.construct(id = bus_id, number = number,
+                                                        driver = Driver.construct(first_name = first_name,
+                                                                                  second_name = second_name))
+        reserve_ids(Bus, state["next_bus_id"])
+
+        for number, departure_time in state["active_departures"]:
+            bus = self.buses[number]
+            self.open_departure(bus, Departure.construct(bus = bus, route = bus.route, departed_ns = departure_time * 1_000))
+
+        # Знімки, записані до появи розкладу, не містять рейсів розкладу.
+        for planned_departure_id, route_key, departs_at in state["timetable"]:
+            self.add_planned_departure(PlannedDeparture.construct(id = planned_departure_id, route = self.routes[route_key],
+                                                                  departs_at = time.fromisoformat(departs_at)))
+        reserve_ids(PlannedDeparture, state["next_planned_departure_id"])
+
+        self.history.restore(*state["history"])
+        for number, trip_count, finished_seconds in state["totals"]:
+            self._bus_totals[self.buses[number].id] = BusTotals(trip_count = trip_count,
+                                                 finished_time = timedelta(seconds = finished_seconds))
+        self.total_trips = state["total_trips"]
+
+
+    def get_history_columns(self) -> tuple[array, array, array, array]:
+        """Повертає узгоджені копії колонок історії (див. DepartureHistory.columns)."""
+        with self._stats_lock:
+            return self.history.columns()
+
+
+    def get_history_columns_by_bus(self) -> tuple[tuple[array, array, array, array], dict[int, array]]:
+        """Повертає узгоджені копії колонок історії та номерів рядків кожного автобуса у цих колонках."""
+        with self._stats_lock:
+            columns = self.history.columns()
+            return columns, self.history.rows_by_bus(len(columns[0]))
+
+
+    def get_bus_history(self, bus: Bus) -> list[tuple[int, int, int]]:
+        """Повертає завершені рейси автобуса з історії: ключ маршруту, час відправлення та час прибуття у мікросекундах.
+        Якщо під'єднано сховище SQLite, рейси читаються зі сховища (у тому числі прибрані з історії реєстру ущільненням)."""
+        if self.store:
+            return self.store.get_bus_history(bus.id)
+        with self._stats_lock:
+            history = self.history
+            return [(history.route_keys[row], history.departure_times[row], history.arrival_times[row])
+                    for row in history.bus_rows(bus.id)]
+
+
+    def get_window_totals(self, now: int) -> tuple[tuple[int, int, dict[int, WindowTotals]], list[tuple[int, int, dict[int, WindowTotals]]]]:
+        """Повертає копії показників часових вікон на момент now (мікросекунди).
+
+        Returns:
+            Ковзне вікно та список погодинних вікон у вигляді (початок, кінець, показники за ключами маршрутів).
+        """
+        with self._stats_lock:
+            sliding, tumbling = self.windows.sliding, self.windows.tumbling
+            return ((now - sliding.length, now, sliding.totals(now)),
+                    [(window_start, window_start + tumbling.size,
+                      {route_key: WindowTotals(totals.started, totals.finished, totals.travel_time)
+                       for route_key, totals in window.items()})
+                     for window_start, window in tumbling.windows(now)])
+
+
+    def get_active_departures(self) -> list[Departure]:
+        """Повертає список активних рейсів."""
+        return list(self._active_departures.values())
+
+
+    def get_bus_active_departure(self, bus: Bus) -> Departure | None:
+        """Повертає активний рейс автобуса або None."""
+        return self._active_departures.get(bus.id)
+
+
+    def get_bus_totals(self, bus: Bus) -> BusTotals:
+        """Повертає накопичені підсумки рейсів автобуса."""
+        return self._bus_totals[bus.id]
+
+
+    def get_buses_totals(self) -> list[tuple[Bus, int, timedelta]]:
+        """Повертає для кожного автобуса кількість рейсів та час завершених рейсів (узгоджений зріз підсумків)."""
+        with self._stats_lock:
+            return [(self._buses_by_id[bus_id], totals.trip_count, totals.finished_time)
+                    for bus_id, totals in self._bus_totals.items()]
+
+
+    def get_route_buses(self, route: Route) -> list[Bus]:
+        """Повертає список автобусів, які обслуговують заданий маршрут."""
+        return list(self._route_buses[route.id].values())
+
+
+    def get_buses_by_status(self, status: BusStatusEnum) -> list[Bus]:
+        """Повертає список автобусів з заданим статусом."""
+        return list(self._status_buses[status].values())
+
+
+    def get_buses_tied_to_route(self) -> list[Bus]:
+        """Повертає список автобусів, які пов'язані з маршрутом."""
+        return list(self._routed_buses.values())
+
+
+    def get_not_departed_buses(self) -> list[Bus]:
+        """Повертає список автобусів з маршрутом, які не знаходяться у рейсі."""
+        return list(self._ready_buses.values())
+
+
+    def get_route_ready_bus(self, route: Route) -> Bus | None:
+        """Повертає автобус маршруту, готовий до відправлення, який найдовше чекає у парку, або None."""
+        return next(iter(self._route_ready_buses.get(route.id, {}).values()), None)
+
+
+    def has_routed_buses(self) -> bool:
+        return bool(self._routed_buses)
+
+
+    def has_ready_buses(self) -> bool:
+        return bool(self._ready_buses)
+
+
+    def has_planned_departures(self) -> bool:
+        return bool(self._planned_departures)
+
+
+    def has_active_departures(self) -> bool:
+        return bool(self._active_departures)
+
+
+    def _record(self, *event):
+        self.version = next(self._versions)
+        if self.journal:
+            self.journal.append(*event)
+
+
+    def _set_status(self, bus: Bus, status: BusStatusEnum):
+        self._status_buses[bus.status].pop(bus.id, None)
+        bus.status = status
+        self._status_buses[status][bus.id] = bus
+        self._refresh_ready(bus)
+
+
+    def _refresh_ready(self, bus: Bus):
+        if bus.route is not None and bus.id not in self._active_departures:
+            self._ready_buses[bus.id] = bus
+            self._route_ready_buses[bus.route.id][bus.id] = bus
+        else:
+            self._ready_buses.pop(bus.id, None)
+            if bus.route is not None:
+                self._route_ready_buses[bus.route.id].pop(bus.id, None)
@@ -0,0 +1,185 @@
+import threading
+from collections import deque
+from heapq import (heappush,
+                   heappop)
+from typing import Callable
+
+from models import (City,
+                    Route)
+
+
+# Ділянка шляху: місто відправлення, місто прибуття та маршрути, що їх з'єднують.
+Leg = tuple[City, City, tuple[Route, ...]]
+
+
+class RouteNetwork:
+    """
+    Клас RouteNetwork - мережа маршрутів станції: граф суміжності міст, з'єднаних маршрутами.
+
+    Маршрут з'єднує свої кінцеві міста в обох напрямках (автобус їздить туди й назад),
+    між двома містами може бути кілька маршрутів. Належить класу FleetRegistry, який оновлює граф
+    при створенні та видаленні маршрутів (add_route, remove_route) - граф не перебудовується.
+    Кожна зміна збільшує версію графу (атрибут version).
+
+    Запити (досяжні міста, шлях з найменшою кількістю ділянок, шлях з найменшим середнім часом у дорозі)
+    кешуються до зміни версії графу, тож повторні запити планувальника не обходять граф.
+    Середній час маршрутів (у мікросекундах) передається функцією load_times і кешується
+    разом з результатами за номером епохи (times_epoch), який визначає викликач;
+    при зміні епохи шляхи, знайдені за попереднім часом, прибираються з кешу.
+    """
+
+    def __init__(self):
+        self.version = 0
+        self._adjacency: dict[City, dict[City, dict[int, Route]]] = {}
+        self._cities: dict[str, City] = {}
+        self._cache: dict[tuple, object] = {}
+        self._cache_version = 0
+        self._times: dict[int, int] = {}
+        self._times_epoch: int | None = None
+        self._lock = threading.Lock()
+
+
+    def add_route(self, route: Route):
+        """Додає маршрут до графу."""
+        with self._lock:
+            self._link(route.start_point, route.end_point, route)
+            self._link(route.end_point, route.start_point, route)
+            self.version += 1
+
+
+    def remove_route(self, route: Route):
+        """Прибирає маршрут з графу; міста, до яких не веде жоден маршрут, прибираються також."""
+        with self._lock:
+            self._unlink(route.start_point, route.end_point, route)
+            self._unlink(route.end_point, route.start_point, route)
+            self.version += 1
+
+
+    def get_city(self, title: str) -> City | None:
+        """Повертає місто мережі за назвою або None."""
+        return self._cities.get(title)
+
+
+    def get_cities(self) -> list[City]:
+        """Повертає міста мережі, відсортовані за назвою."""
+        with self._lock:
+            return sorted(self._cities.values(), key = lambda city: city.title)
+
+
+    def get_city_routes(self, city: City) -> list[Route]:
+        """Повертає маршрути, що проходять через місто."""
+        with self._lock:
+            return [route for routes in self._adjacency.get(city, {}).values() for route in routes.values()]
+
+
+    def reachable_cities(self, start: City) -> list[City]:
+        """Повертає міста, до яких можна дістатися з міста start (з пересадками), відсортовані за назвою."""
+        return self._cached(("reachable", start.id), lambda: sorted(
+            (city for city in self._search(start, None) if city is not start), key = lambda city: city.title
+        ))
+
+
+    def fewest_legs(self, start: City, end: City) -> list[Leg] | None:
+        """Повертає шлях з найменшою кількістю ділянок (пошук у ширину) або None, якщо шляху немає."""
+        return self._cached(("hops", start.id, end.id), lambda: self._path(self._search(start, end), start, end))
+
+
+    def fastest_legs(self, start: City, end: City,
+                     times_epoch: int, load_times: Callable[[], dict[int, int]],
+                     default_time: int) -> list[Leg] | None:
+        """Повертає шлях з найменшим сумарним середнім часом у дорозі (алгоритм Дейкстри) або None, якщо шляху немає.
+
+        Параметри:
+            start (City): Місто відправлення.
+            end (City): Місто прибуття.
+            times_epoch (int): Епоха середнього часу маршрутів; при її зміні час завантажується знову.
+            load_times (Callable[[], dict[int, int]]): Повертає середній час маршрутів у мікросекундах за ключем маршруту.
+            default_time (int): Час маршруту, для якого середній час невідомий.
+        """
+        with self._lock:
+            if self._times_epoch != times_epoch:
+                self._times, self._times_epoch = load_times(), times_epoch
+                # Шляхи попередніх епох більше не запитуються, тож прибираються з кешу одразу, а не при зміні графу.
+                self._cache = {key: value for key, value in self._cache.items() if key[0] != "time"}
+        return self._cached(("time", start.id, end.id, times_epoch),
+                            lambda: self._path(self._dijkstra(start, end, default_time), start, end))
+
+
+    def get_route_time(self, route: Route) -> int | None:
+        """Повертає середній час маршруту у мікросекундах, за яким шукався найшвидший шлях, або None."""
+        return self._times.get(route.id)
+
+
+    def _link(self, city: City, neighbour: City, route: Route):
+        self._cities[city.title] = city
+        self._adjacency.setdefault(city, {}).setdefault(neighbour, {})[route.id] = route
+
+
+    def _unlink(self, city: City, neighbour: City, route: Route):
+        neighbours = self._adjacency.get(city)
+        if neighbours is None or neighbour not in neighbours:
+            return
+        neighbours[neighbour].pop(route.id, None)
+        if not neighbours[neighbour]:
+            del neighbours[neighbour]
+        if not neighbours:
+            del self._adjacency[city]
+            del self._cities[city.title]
+
+
+    def _cached(self, key: tuple, compute: Callable[[], object]):
+        with self._lock:
+            if self._cache_version != self.version:
+                self._cache.clear()
+                self._cache_version = self.version
+            if key not in self._cache:
+                self._cache[key] = compute()
+            return self._cache[key]
+
+
+    def _search(self, start: City, end: City | None) -> dict[City, City | None]:
+        """Пошук у ширину від start (до end, якщо задано); повертає попереднє місто для кожного досягнутого міста."""
+        previous = {start: None}
+        queue = deque((start,))
+        while queue:
+            city = queue.popleft()
+            if city is end:
+                break
+            for neighbour in self._adjacency.get(city, ()):
+                if neighbour not in previous:
+                    previous[neighbour] = city
+                    queue.append(neighbour)
+        return previous
+
+
+    def _dijkstra(self, start: City, end: City, default_time: int) -> dict[City, City | None]:
+        """Пошук найшвидшого шляху; вага ділянки - найменший середній час маршрутів, що її з'єднують."""
+        previous = {start: None}
+        distances = {start: 0}
+        queue = [(0, start.id, start)]
+        visited = set()
+        while queue:
+            distance, _, city = heappop(queue)
+            if city in visited:
+                continue
+            visited.add(city)
+            if city is end:
+                break
+            for neighbour, routes in self._adjacency.get(city, {}).items():
+                candidate = distance + min(self._times.get(route_key, default_time) for route_key in routes)
+                if candidate < distances.get(neighbour, candidate + 1):
+                    distances[neighbour] = candidate
+                    previous[neighbour] = city
+                    heappush(queue, (candidate, neighbour.id, neighbour))
+        return previous
+
+
+    def _path(self, previous: dict[City, City | None], start: City, end: City) -> list[Leg] | None:
+        if end not in previous:
+            return None
+        cities = [end]
+        while cities[-1] is not start:
+            cities.append(previous[cities[-1]])
+        cities.reverse()
+        return [(city, neighbour, tuple(self._adjacency[city][neighbour].values()))
+                for city, neighbour in zip(cities, cities[1:])]
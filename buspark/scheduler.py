@@ -0,0 +1,207 @@
+import threading
+from collections import deque
+from datetime import (datetime,
+                      timedelta,
+                      time)
+from heapq import (heapify,
+                   heappush,
+                   heappop)
+
+from models import (Route,
+                    PlannedDeparture,
+                    ScheduleStatusEnum,
+                    ScheduledDispatch)
+from registry import FleetRegistry
+from workers import Dispatcher
+from history import (to_microseconds,
+                     from_microseconds)
+from clock import current_time
+from signals import CommandRejected
+
+
+class DepartureScheduler:
+    """
+    Клас DepartureScheduler відправляє автобуси у рейси за щоденним розкладом маршрутів.
+
+    Розклад (рейси PlannedDeparture) зберігається у реєстрі, тож записується у журнал та знімок стану.
+    Планувальник тримає чергу з пріоритетом (купу) найближчих відправлень: по одному елементу
+    (час відправлення у мікросекундах, ідентифікатор рейсу розкладу, запланований час) на кожен рейс розкладу.
+    Метод tick забирає з черги рейси, час яких настав, та відправляє для кожного вільний автобус маршруту
+    (той, що найдовше чекає у парку - індекс готових автобусів маршруту у реєстрі).
+    Кожен рейс коштує O(log n) операцій з купою та O(1) пошук автобуса, без перебору автопарку.
+    Видалені рейси розкладу (та рейси видалених маршрутів) прибираються з черги, коли настає їх час.
+
+    Якщо вільного автобуса немає (конфлікт), відправлення повторюється кожні retry_interval,
+    доки затримка не перевищить max_delay - тоді рейс вважається пропущеним.
+    Після відправлення або пропуску у чергу додається відправлення цього рейсу наступного дня.
+    Результати (ScheduledDispatch) останніх history_size відправлень зберігаються в атрибуті results.
+
+    Метод start запускає фоновий потік, який викликає tick щосекунди.
+    """
+
+    def __init__(self, registry: FleetRegistry, dispatcher: Dispatcher,
+                 retry_interval: timedelta = timedelta(minutes = 1),
+                 max_delay: timedelta = timedelta(minutes = 15),
+                 history_size: int = 1_000):
+        self.registry = registry
+        self.dispatcher = dispatcher
+        self.retry_interval = retry_interval // timedelta(microseconds = 1)
+        self.max_delay = max_delay // timedelta(microseconds = 1)
+        self.results: deque[ScheduledDispatch] = deque(maxlen = history_size)
+        self.dispatched_count = 0
+        self.missed_count = 0
+        self._queue: list[tuple[int, int, int]] = []
+        self._lock = threading.Lock()
+        self._stop = threading.Event()
+        self._thread: threading.Thread | None = None
+
+
+    def load(self, now: datetime | None = None):
+        """Будує чергу відправлень з розкладу реєстру (після відновлення стану станції)."""
+        now = to_microseconds(now or current_time())
+        with self._lock:
+            self._queue = []
+            for planned_departure in self.registry.get_timetable():
+                planned_time = self._next_time(planned_departure.departs_at, now)
+                self._queue.append((planned_time, planned_departure.id, planned_time))
+            heapify(self._queue)
+
+
+    def add_departure(self, route: Route, departs_at: time, trusted: bool = False,
+                      now: datetime | None = None) -> PlannedDeparture:
+        """Додає щоденний рейс до розкладу маршруту.
+
+        Параметри:
+            route (Route): Маршрут.
+            departs_at (time): Час відправлення.
+            trusted (bool): Дані отримано з довіреного джерела, рейс створюється без валідації.
+            now (datetime | None): Поточний час; перше відправлення - найближчий departs_at після нього.
+
+        Returns:
+            PlannedDeparture: Створений рейс розкладу.
+
+        Raises:
+            CommandRejected: Маршрут видалено.
+        """
+        model = PlannedDeparture.construct if trusted else PlannedDeparture
+        planned_departure = model(route = route, departs_at = departs_at.replace(microsecond = 0))
+        with self.registry.structure_lock:
+            if route.id not in self.registry.routes:
+                raise CommandRejected(f"[!] {route} вже видалено!")
+            self.registry.add_planned_departure(planned_departure)
+        planned_time = self._next_time(planned_departure.departs_at, to_microseconds(now or current_time()))
+        with self._lock:
+            heappush(self._queue, (planned_time, planned_departure.id, planned_time))
+        return planned_departure
+
+
+    def cancel_departure(self, planned_departure: PlannedDeparture):
+        """Видаляє рейс з розкладу. Елемент черги прибирається, коли настає його час.
+
+        Raises:
+            CommandRejected: Рейс вже видалено з розкладу.
+        """
+        with self.registry.structure_lock:
+            if self.registry.get_planned_departure(planned_departure.id) is not planned_departure:
+                raise CommandRejected(f"[!] Рейс '{planned_departure}' вже видалено з розкладу!")
+            self.registry.remove_planned_departure(planned_departure)
+
+
+    def next_due(self) -> datetime | None:
+        """Повертає час найближчого відправлення у черзі або None."""
+        with self._lock:
+            return from_microseconds(self._queue[0][0]) if self._queue else None
+
+
+    def tick(self, now: datetime | None = None) -> list[ScheduledDispatch]:
+        """Відправляє рейси розкладу, час яких настав.
+
+        Параметри:
+            now (datetime | None): Поточний час.
+
+        Returns:
+            list[ScheduledDispatch]: Відправлені та пропущені рейси; рейси, що очікують на вільний автобус, не повертаються.
+        """
+        now = to_microseconds(now or current_time())
+        dispatches = []
+        while True:
+            with self._lock:
+                if not self._queue or self._queue[0][0] > now:
+                    break
+                _, planned_departure_id, planned_time = heappop(self._queue)
+            planned_departure = self.registry.get_planned_departure(planned_departure_id)
+            if planned_departure is None:
+                continue
+
+            dispatch = self._dispatch(planned_departure, planned_time, now)
+            with self._lock:
+                if dispatch is None:
+                    heappush(self._queue, (now + self.retry_interval, planned_departure_id, planned_time))
+                    continue
+                next_time = self._next_time(planned_departure.departs_at, max(now - self.max_delay, planned_time + 1))
+                heappush(self._queue, (next_time, planned_departure_id, next_time))
+                if dispatch.status is ScheduleStatusEnum.DISPATCHED:
+                    self.dispatched_count += 1
+                else:
+                    self.missed_count += 1
+                self.results.append(dispatch)
+            dispatches.append(dispatch)
+        return dispatches
+
+
+    def run(self, interval: float = 1.0):
+        """Викликає tick кожні interval секунд (або раніше, якщо наближається відправлення) до виклику stop."""
+        while not self._stop.is_set():
+            self.tick()
+            next_due = self.next_due()
+            timeout = interval if next_due is None else (next_due - current_time()).total_seconds()
+            self._stop.wait(min(interval, max(timeout, 0)))
+
+
+    def start(self, interval: float = 1.0):
+        """Запускає фоновий потік планувальника."""
+        if self._thread is not None and self._thread.is_alive():
+            return
+        self._stop.clear()
+        self._thread = threading.Thread(target = self.run, args = (interval,), name = "buspark-scheduler", daemon = True)
+        self._thread.start()
+
+
+    def stop(self):
+        """Зупиняє фоновий потік планувальника."""
+        self._stop.set()
+        if self._thread is not None:
+            self._thread.join()
+            self._thread = None
+
+
+    def _dispatch(self, planned_departure: PlannedDeparture, planned_time: int, now: int) -> ScheduledDispatch | None:
+        """Відправляє вільний автобус маршруту; повертає None, якщо вільного автобуса немає і ще можна чекати."""
+        route = planned_departure.route
+        # Автобус може бути відправлено іншим терміналом між вибором та відправленням -
+        # тоді він вже не готовий, і обирається наступний.
+        while (bus := self.registry.get_route_ready_bus(route)) is not None:
+            try:
+                departure = self.dispatcher.depart_bus(bus)
+            except CommandRejected:
+                continue
+            return ScheduledDispatch.construct(planned_departure = planned_departure,
+                                               planned_time = from_microseconds(planned_time),
+                                               status = ScheduleStatusEnum.DISPATCHED,
+                                               departure = departure)
+        if now - planned_time < self.max_delay:
+            return None
+        return ScheduledDispatch.construct(planned_departure = planned_departure,
+                                           planned_time = from_microseconds(planned_time),
+                                           status = ScheduleStatusEnum.MISSED,
+                                           departure = None)
+
+
+    @staticmethod
+    def _next_time(departs_at: time, after: int) -> int:
+        """Повертає найближчий час відправлення о departs_at, не раніший за after (мікросекунди)."""
+        moment = from_microseconds(after)
+        planned_time = to_microseconds(datetime.combine(moment.date(), departs_at))
+        while planned_time < after:
+            planned_time = to_microseconds(datetime.combine(from_microseconds(planned_time).date() + timedelta(days = 1), departs_at))
+        return planned_time
@@ -0,0 +1,166 @@
+import threading
+from bisect import (bisect_left,
+                    insort)
+from typing import (Callable,
+                    Hashable)
+
+
+SEARCH_LIMIT = 10
+MAX_SEARCH_LIMIT = 100
+# Якщо до пошуку накопичилось більше нових слів, список слів сортується заново, а не вставкою кожного слова.
+RESORT_THRESHOLD = 64
+# Символ, більший за будь-який символ слів: слова з префіксом p лежать між (p,) та (p + PREFIX_END,).
+PREFIX_END = chr(0x10FFFF)
+
+
+def normalize(text: str) -> str:
+    """Приводить текст до вигляду для пошуку: без урахування регістру, слова розділені одним пробілом."""
+    return " ".join(text.casefold().split())
+
+
+def trigrams(word: str) -> set[str]:
+    return {word[index:index + 3] for index in range(len(word) - 2)}
+
+
+class SearchIndex:
+    """
+    Клас SearchIndex - пошуковий індекс для швидкого пошуку об'єктів за текстом (під час введення).
+
+    Об'єкт додається з ключем та текстом (наприклад, номер автобуса та ім'я водія). Об'єкт знаходиться запитом,
+    кожне слово якого є початком одного зі слів тексту (пошук за префіксом у відсортованому списку слів),
+    або, якщо таких об'єктів менше за ліміт, - запитом, кожне слово якого міститься у тексті
+    (пошук за триграмами - трійками сусідніх літер слів; слова запиту, коротші за 3 літери, шукаються лише за префіксом).
+    Регістр не враховується. Спочатку повертаються збіги за префіксом (за алфавітом слова, що збіглося),
+    потім - за входженням (знайдені об'єкти - за алфавітом тексту).
+
+    Нові слова накопичуються та додаються до відсортованого списку під час наступного пошуку,
+    тож масове додавання (відновлення стану) не сортує список після кожного об'єкта.
+    Слова видалених об'єктів пропускаються пошуком і прибираються, коли їх стає більше, ніж актуальних.
+    Зміни та пошук виконуються під блокуванням індексу.
+    """
+
+    def __init__(self):
+        self._items: dict[Hashable, tuple[str, object]] = {}
+        self._words: list[tuple[str, Hashable]] = []
+        self._pending: list[tuple[str, Hashable]] = []
+        self._stale = 0
+        self._trigrams: dict[str, set] = {}
+        self._lock = threading.Lock()
+
+
+    def __len__(self) -> int:
+        return len(self._items)
+
+
+    def __contains__(self, key: Hashable) -> bool:
+        return key in self._items
+
+
+    def add(self, key: Hashable, text: str, item: object):
+        """Додає об'єкт до індексу (або замінює текст об'єкта з тим самим ключем)."""
+        with self._lock:
+            if key in self._items:
+                self._remove(key)
+            text = normalize(text)
+            # Текст зберігається з пробілами на початку та в кінці: префікс слова p - це входження " p",
+            # слово w - входження " w ", а частина слова - просте входження.
+            self._items[key] = (f" {text} ", item)
+            for word in set(text.split()):
+                self._pending.append((word, key))
+                for trigram in trigrams(word):
+                    keys = self._trigrams.get(trigram)
+                    if keys is None:
+                        self._trigrams[trigram] = {key}
+                    else:
+                        keys.add(key)
+
+
+    def remove(self, key: Hashable):
+        """Прибирає об'єкт з індексу; відсутній ключ ігнорується."""
+        with self._lock:
+            if key in self._items:
+                self._remove(key)
+
+
+    def search(self, query: str, limit: int = SEARCH_LIMIT,
+               accept: Callable[[object], bool] | None = None) -> list:
+        """Повертає до limit об'єктів, що відповідають запиту.
+
+        Параметри:
+            query (str): Текст запиту.
+            limit (int): Найбільша кількість об'єктів.
+            accept (Callable[[object], bool] | None): Умова, якій мають відповідати об'єкти (None - будь-які).
+
+        Returns:
+            list: Знайдені об'єкти.
+        """
+        words = normalize(query).split()
+        if not words or limit <= 0:
+            return []
+        with self._lock:
+            self._merge_pending()
+            found = {}
+            self._search_prefix(words, limit, accept, found)
+            if len(found) < limit:
+                self._search_trigrams(words, limit, accept, found)
+            return list(found.values())
+
+
+    def _remove(self, key: Hashable):
+        text, _ = self._items.pop(key)
+        for word in set(text.split()):
+            self._stale += 1
+            for trigram in trigrams(word):
+                keys = self._trigrams[trigram]
+                keys.discard(key)
+                if not keys:
+                    del self._trigrams[trigram]
+
+
+    def _merge_pending(self):
+        if self._stale > len(self._words) // 2:
+            self._words = [(word, key) for word, key in self._words if key in self._items]
+            self._pending = [(word, key) for word, key in self._pending if key in self._items]
+            self._stale = 0
+        if len(self._pending) > RESORT_THRESHOLD:
+            self._words.extend(self._pending)
+            self._words.sort()
+        else:
+            for entry in self._pending:
+                insort(self._words, entry)
+        self._pending.clear()
+
+
+    def _matches(self, key: Hashable, patterns: list[str], accept) -> bool:
+        text, item = self._items[key]
+        return all(pattern in text for pattern in patterns) and (accept is None or accept(item))
+
+
+    def _search_prefix(self, words: list[str], limit: int, accept, found: dict):
+        # Переглядається найкоротший діапазон слів, що починаються з одного зі слів запиту;
+        # решта слів запиту перевіряється для кожного об'єкта.
+        index, end = min(((bisect_left(self._words, (word,)), bisect_left(self._words, (word + PREFIX_END,)))
+                          for word in words), key = lambda bounds: bounds[1] - bounds[0])
+        patterns = [f" {word}" for word in words]
+        while index < end and len(found) < limit:
+            word, key = self._words[index]
+            # Слова видалених об'єктів та замінених текстів пропускаються.
+            if key in self._items and key not in found and f" {word} " in self._items[key][0]:
+                if self._matches(key, patterns, accept):
+                    found[key] = self._items[key][1]
+            index += 1
+
+
+    def _search_trigrams(self, words: list[str], limit: int, accept, found: dict):
+        query_trigrams = set().union(*(trigrams(word) for word in words))
+        if not query_trigrams:
+            return
+        keys = sorted((self._trigrams.get(trigram, set()) for trigram in query_trigrams), key = len)
+        matches = []
+        for key in keys[0].intersection(*keys[1:]):
+            if key not in found and self._matches(key, words, accept):
+                matches.append(key)
+                if len(found) + len(matches) >= limit:
+                    break
+        for key in sorted(matches, key = lambda key: self._items[key][0]):
+            found[key] = self._items[key][1]
@@ -1,4 +1,8 @@
-from datetime import timedelta
+from datetime import (datetime,
+                      timedelta)
+from enum import Enum
+
+from pydantic import BaseModel
 
 def timedelta_to_str(time_difference: timedelta) -> str:
     '''Перетворює об'єкт datetime.timedelta у строку у форматі ГГ:ХХ:СС.
@@ -8,4 +12,29 @@ def timedelta_to_str(time_difference: timedelta) -> str:
     minutes = (time_difference.total_seconds() // 60) % 60
     seconds = time_difference.total_seconds() % 60
     time_str = f"{int(hours):02d}:{int(minutes):02d}:{int(seconds):02d}"
-    return time_str
\ No newline at end of file
+    return time_str
+
+
+def to_primitive(value):
+    '''Перетворює результат команди станції (моделі, списки, час) у значення, що серіалізуються у JSON.
+    Моделі перетворюються у словники полів, datetime - у рядок ISO 8601,
+    timedelta - у кількість секунд, елементи Enum - у їх значення, виключення - у рядок повідомлення.
+    Повертає: значення з dict, list, str, int, float, bool або None
+    '''
+    if isinstance(value, BaseModel):
+        return {name: to_primitive(field) for name, field in value}
+    if isinstance(value, Enum):
+        return value.value
+    if isinstance(value, datetime):
+        return value.isoformat()
+    if isinstance(value, timedelta):
+        return value.total_seconds()
+    if isinstance(value, dict):
+        return {str(key): to_primitive(item) for key, item in value.items()}
+    if isinstance(value, (list, tuple)):
+        if hasattr(value, "_asdict"):
+            return to_primitive(value._asdict())
+        return [to_primitive(item) for item in value]
+    if isinstance(value, Exception):
+        return str(value)
+    return value
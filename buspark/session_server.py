@@ -0,0 +1,179 @@
+"""Сервер сесій операторів на asyncio.
+
+Багато терміналів одночасно працюють з однією станцією через локальний сокет (TCP або Unix)
+або через stdin/stdout. Кожен рядок запиту - JSON-об'єкт у форматі StationCommands.execute,
+наприклад {"command": "depart_bus", "number": "AA1234"}, або пакет
+{"command": "batch", "commands": [...], "stop_on_error": false}.
+Кожна відповідь - один рядок JSON: {"ok": true, "result": ...} або {"ok": false, "error": "..."}.
+Відповіді надсилаються у порядку запитів сесії.
+
+Запуск (з каталогу buspark):
+    python session_server.py --port 8765
+    python session_server.py --unix /tmp/buspark.sock
+    python session_server.py --stdio
+"""
+import argparse
+import asyncio
+import json
+import sys
+import traceback
+from concurrent.futures import (Executor,
+                                ThreadPoolExecutor)
+from contextlib import suppress
+
+from station import (AutoStation,
+                     JOURNAL_PATH,
+                     SNAPSHOT_PATH)
+from commands import (StationCommands,
+                      QUERIES)
+from serializers import to_primitive
+from signals import CommandRejected
+
+# Запити, що обчислюються довго: виконуються в окремому пулі, щоб не займати потоки коротких команд.
+ANALYTICS = ("analyze_buses",
+             "analyze_buses_in_period",
+             "analyze_bus",
+             "travel_time_report",
+             "recent_route_stats")
+
+
+class SessionServer:
+    """
+    Клас SessionServer обслуговує сесії операторів у циклі подій asyncio.
+
+    Усі команди, запити та пакети виконуються у пулі потоків разом з перетворенням результату у JSON:
+    команди, що змінюють стан, чекають на блокування реєстру, поки інший потік створює знімок стану,
+    тож цикл подій не блокується. Аналітика (ANALYTICS) та створення знімка стану виконуються
+    в окремому пулі analytics_executor, тому довгі звіти не займають потоки коротких команд терміналів.
+    Безпеку паралельних змін забезпечують блокування реєстру (див. FleetRegistry).
+    Помилка створення знімка стану виводиться у stderr.
+    """
+
+    def __init__(self, station: AutoStation, executor: Executor | None = None,
+                 analytics_executor: Executor | None = None):
+        self.station = station
+        self.commands: StationCommands = station.commands
+        self.executor = executor or ThreadPoolExecutor(max_workers = 4, thread_name_prefix = "buspark-command")
+        self.analytics_executor = analytics_executor or ThreadPoolExecutor(max_workers = 2,
+                                                                           thread_name_prefix = "buspark-analytics")
+        self.sessions = 0
+        self._checkpoint: asyncio.Future | None = None
+
+
+    async def handle_session(self, reader: asyncio.StreamReader, writer: asyncio.StreamWriter):
+        """Обслуговує одну сесію: читає запити по рядку та надсилає відповіді до закриття з'єднання."""
+        self.sessions += 1
+        try:
+            while line := await reader.readline():
+                if line.strip():
+                    writer.write(await self.process(line))
+                    await writer.drain()
+        except (ConnectionError, ValueError):
+            # ValueError - рядок запиту довший за ліміт StreamReader; сесія закривається.
+            pass
+        finally:
+            self.sessions -= 1
+            writer.close()
+            with suppress(ConnectionError):
+                await writer.wait_closed()
+
+
+    async def process(self, line: bytes) -> bytes:
+        """
+        Виконує один запит та повертає рядок відповіді.
+
+        Відхилена або некоректна команда (CommandRejected, ValueError, TypeError) повертає відповідь
+        з помилкою, а сесія продовжує роботу.
+        """
+        try:
+            command = json.loads(line)
+        except ValueError:
+            command = None
+        if not isinstance(command, dict):
+            return _response(error = "[!] Запит має бути JSON-об'єктом!")
+
+        loop = asyncio.get_running_loop()
+        try:
+            if command.get("command") == "batch":
+                result = await loop.run_in_executor(self.executor, self._execute_batch, command)
+            elif command.get("command") in ANALYTICS:
+                result = await loop.run_in_executor(self.analytics_executor, self._execute, command)
+            else:
+                result = await loop.run_in_executor(self.executor, self._execute, command)
+        except CommandRejected as ex:
+            return _response(error = str(ex))
+        except (ValueError, TypeError) as ex:
+            return _response(error = f"[!] Невірний запит: {ex}")
+
+        if command.get("command") not in QUERIES and self.station.needs_checkpoint() \
+                and (self._checkpoint is None or self._checkpoint.done()):
+            self._checkpoint = loop.run_in_executor(self.analytics_executor, self.station.checkpoint_if_needed)
+            self._checkpoint.add_done_callback(_report_checkpoint_error)
+        return _response(result = result)
+
+
+    async def serve_stdio(self):
+        """Обслуговує одну сесію через stdin/stdout."""
+        loop = asyncio.get_running_loop()
+        reader = asyncio.StreamReader()
+        await loop.connect_read_pipe(lambda: asyncio.StreamReaderProtocol(reader), sys.stdin)
+        transport, protocol = await loop.connect_write_pipe(asyncio.streams.FlowControlMixin, sys.stdout)
+        writer = asyncio.StreamWriter(transport, protocol, reader, loop)
+        await self.handle_session(reader, writer)
+
+
+    def _execute(self, command: dict):
+        return to_primitive(self.commands.execute(command))
+
+
+    def _execute_batch(self, command: dict):
+        arguments = dict(command)
+        arguments.pop("command")
+        commands = arguments.pop("commands", None)
+        if not isinstance(commands, list) or arguments.keys() - {"stop_on_error"}:
+            raise CommandRejected("[!] Пакет має містити список commands та необов'язковий stop_on_error!")
+        results = self.commands.execute_batch(commands, stop_on_error = bool(arguments.get("stop_on_error")))
+        return [{"ok": False, "error": str(result)} if isinstance(result, CommandRejected)
+                else {"ok": True, "result": to_primitive(result)}
+                for result in results]
+
+
+def _report_checkpoint_error(future: asyncio.Future):
+    if not future.cancelled() and future.exception() is not None:
+        print("[!] Не вдалося створити знімок стану:", file = sys.stderr)
+        traceback.print_exception(future.exception(), file = sys.stderr)
+
+
+def _response(result = None, error: str | None = None) -> bytes:
+    response = {"ok": False, "error": error} if error is not None else {"ok": True, "result": result}
+    return (json.dumps(response, ensure_ascii = False, separators = (',', ':')) + '\n').encode('utf-8')
+
+
+async def main(arguments: list[str] | None = None):
+    parser = argparse.ArgumentParser(description = "Сервер сесій операторів автобусної станції")
+    parser.add_argument("--host", default = "127.0.0.1")
+    parser.add_argument("--port", type = int, default = 8765)
+    parser.add_argument("--unix", help = "шлях до Unix-сокета замість TCP")
+    parser.add_argument("--stdio", action = "store_true", help = "одна сесія через stdin/stdout")
+    parser.add_argument("--journal", default = JOURNAL_PATH)
+    parser.add_argument("--snapshot", default = SNAPSHOT_PATH)
+    options = parser.parse_args(arguments)
+
+    station = AutoStation()
+    station.open_journal(options.journal, options.snapshot)
+    station.scheduler.start()
+    server = SessionServer(station)
+    if options.stdio:
+        await server.serve_stdio()
+        return
+    if options.unix:
+        listener = await asyncio.start_unix_server(server.handle_session, path = options.unix)
+    else:
+        listener = await asyncio.start_server(server.handle_session, options.host, options.port)
+    async with listener:
+        await listener.serve_forever()
+
+
+if __name__ == "__main__":
+    with suppress(KeyboardInterrupt):
+        asyncio.run(main())
@@ -1,4 +1,11 @@
 class ReturnMenu(Exception): pass
 class SameRouteSelected(Exception): pass
-class RouteChangedDuringDeparture(Exception): pass
-class RouteSet(Exception): pass
+class CommandRejected(Exception): pass
+class InvalidArguments(CommandRejected): pass
+
+
+class MenuResult:
+    """Результат дії меню: повернення до головного меню з необов'язковим повідомленням."""
+
+    def __init__(self, message: str | None = None):
+        self.message = message
@@ -0,0 +1,313 @@
+"""Дискретно-подійна симуляція роботи автобусної станції.
+
+Симуляція генерує маршрути та автобуси і проганяє відправлення, повернення, зміни маршрутів,
+аналітичні запити та ущільнення історії через справжні класи станції (Manager, Dispatcher, Analytic,
+DepartureScheduler) у симульованому часі: годинник станції замінюється на ManualClock,
+який переводиться на час кожної події. Тому місяці роботи симулюються за секунди.
+Симуляція детермінована: однакові параметри та зерно дають однакову послідовність подій та результат.
+
+Для кожної операції вимірюється реальний час виконання; у звіті - кількість викликів,
+пропускна здатність (викликів за секунду) та затримка (середня, p50, p99, максимальна).
+
+Запуск (з каталогу buspark):
+    python simulator.py --routes 20 --buses 500 --days 90
+    python simulator.py --buses 2000 --timetable 48 --distribution lognormal --output simulation.json
+"""
+import argparse
+import json
+import math
+import random
+import sys
+from array import array
+from datetime import (datetime,
+                      time)
+from heapq import (heappush,
+                   heappop)
+from time import perf_counter_ns
+
+from models import (Park,
+                    Bus,
+                    ReportGroupEnum,
+                    ScheduleStatusEnum)
+from registry import FleetRegistry
+from journal import EventJournal
+from workers import (Manager,
+                     Dispatcher,
+                     Analytic)
+from scheduler import DepartureScheduler
+from history import (to_microseconds,
+                     from_microseconds)
+from clock import (ManualClock,
+                   use_clock)
+from signals import CommandRejected
+
+
+DISTRIBUTIONS = ("normal", "lognormal", "exponential", "uniform")
+MINUTE = 60_000_000
+DAY = 24 * 60 * MINUTE
+
+# Типи подій; порядок визначає черговість подій з однаковим часом.
+RETURN, DEPART, TICK, ANALYTICS, COMPACT = range(5)
+
+
+class TripTimes:
+    """Генератор тривалості рейсів маршруту (у мікросекундах) із заданим розподілом.
+
+    Параметри:
+        distribution (str): Розподіл (DISTRIBUTIONS).
+        mean (float): Середня тривалість рейсу у хвилинах.
+        spread (float): Коефіцієнт варіації (стандартне відхилення / середнє).
+    """
+
+    def __init__(self, generator: random.Random, distribution: str, mean: float, spread: float):
+        self.generator = generator
+        self.distribution = distribution
+        self.mean = mean
+        self.spread = spread
+        self._sigma = math.sqrt(math.log(1 + spread ** 2))
+        self._mu = math.log(mean) - self._sigma ** 2 / 2
+
+
+    def sample(self) -> int:
+        generator = self.generator
+        if self.distribution == "normal":
+            minutes = generator.gauss(self.mean, self.mean * self.spread)
+        elif self.distribution == "lognormal":
+            minutes = generator.lognormvariate(self._mu, self._sigma)
+        elif self.distribution == "exponential":
+            minutes = generator.expovariate(1 / self.mean)
+        else:
+            minutes = generator.uniform(self.mean * (1 - self.spread), self.mean * (1 + self.spread))
+        return max(1, round(minutes * MINUTE))
+
+
+class OperationStats:
+    """Час виконання викликів однієї операції у наносекундах."""
+
+    def __init__(self):
+        self.durations = array('q')
+
+
+    def add(self, duration: int):
+        self.durations.append(duration)
+
+
+    def report(self) -> dict:
+        durations = sorted(self.durations)
+        count, total = len(durations), sum(durations)
+        percentile = lambda value: durations[min(count - 1, int(count * value / 100))] / 1_000
+        return {
+            "count": count,
+            "throughput": count / total * 1e9 if total else None,
+            "mean_us": total / count / 1_000,
+            "p50_us": percentile(50),
+            "p99_us": percentile(99),
+            "max_us": durations[-1] / 1_000,
+        }
+
+
+class Simulation:
+    """
+    Клас Simulation - симуляція роботи станції з заданим автопарком.
+
+    Кожен автобус прив'язаний до маршруту та по колу відпочиває у парку (експоненційний розподіл
+    з середнім mean_dwell хвилин), вирушає у рейс та повертається через час, згенерований розподілом
+    тривалості рейсів маршруту. Якщо задано timetable, автобуси відправляє планувальник
+    за розкладом з timetable рейсів на добу для кожного маршруту, а симуляція щохвилини викликає tick.
+    Після повернення автобус з імовірністю route_change_probability переводиться на інший маршрут.
+    Кожні analytics_every годин виконуються аналітичні запити, щодоби - ущільнення історії.
+    """
+
+    def __init__(self,
+                 routes: int = 20,
+                 buses: int = 500,
+                 days: float = 30,
+                 distribution: str = "lognormal",
+                 mean_trip: float = 90,
+                 spread: float = 0.3,
+                 mean_dwell: float = 30,
+                 timetable: int = 0,
+                 route_change_probability: float = 0.01,
+                 analytics_every: float = 6,
+                 seed: int = 0,
+                 start: datetime = datetime(2024, 1, 1),
+                 journal_path: str | None = None):
+        self.generator = random.Random(seed)
+        self.days = days
+        self.mean_dwell = mean_dwell
+        self.timetable = timetable
+        self.route_change_probability = route_change_probability
+        self.analytics_every = round(analytics_every * 60 * MINUTE)
+        self.start = to_microseconds(start)
+        self.clock = ManualClock(start)
+        self.operations: dict[str, OperationStats] = {}
+        self._events: list[tuple[int, int, int, int]] = []
+        self._sequence = 0
+
+        Park().clear()
+        self.registry = FleetRegistry()
+        if journal_path:
+            self.registry.journal = EventJournal(journal_path)
+        self.manager = Manager(self.registry)
+        self.dispatcher = Dispatcher(self.registry)
+        self.analytic = Analytic(self.registry)
+        self.scheduler = DepartureScheduler(self.registry, self.dispatcher)
+
+        with use_clock(self.clock):
+            self.routes = [self.manager.create_route(f"Місто {index}", f"Місто {index + 1}")
+                           for index in range(routes)]
+            self.trip_times = {route.id: TripTimes(self.generator, distribution,
+                                                   mean_trip * self.generator.uniform(0.5, 1.5), spread)
+                               for route in self.routes}
+            self.buses: dict[int, Bus] = {}
+            for index in range(buses):
+                bus = self.manager.create_bus(f"SIM{index:06}", "Водій", f"Номер{index}")
+                self.dispatcher.change_route(bus, self.routes[index % routes])
+                self.buses[bus.id] = bus
+            for route in self.routes:
+                for slot in range(timetable):
+                    minutes = slot * 24 * 60 // timetable
+                    self.scheduler.add_departure(route, time(minutes // 60, minutes % 60), now = start)
+
+
+    def run(self) -> dict:
+        """Виконує симуляцію та повертає звіт з підсумками та показниками операцій."""
+        end = self.start + round(self.days * DAY)
+        if self.timetable:
+            self._push(self.start, TICK)
+        else:
+            for bus in self.buses.values():
+                self._push(self.start + self._dwell(), DEPART, bus.id)
+        self._push(self.start + self.analytics_every, ANALYTICS)
+        self._push(self.start + DAY, COMPACT)
+
+        events = 0
+        started = perf_counter_ns()
+        with use_clock(self.clock):
+            while self._events and self._events[0][0] <= end:
+                moment, kind, _, bus_id = heappop(self._events)
+                self.clock.set(moment * 1_000)
+                self._handle(moment, kind, bus_id)
+                events += 1
+        elapsed = (perf_counter_ns() - started) / 1e9
+
+        return {
+            "simulated_days": self.days,
+            "routes": len(self.routes),
+            "buses": len(self.buses),
+            "events": events,
+            "trips": self.registry.total_trips,
+            "scheduled_dispatches": self.scheduler.dispatched_count,
+            "missed_departures": self.scheduler.missed_count,
+            "wall_seconds": elapsed,
+            "events_per_second": events / elapsed if elapsed else None,
+            "simulated_days_per_second": self.days / elapsed if elapsed else None,
+            "operations": {name: stats.report() for name, stats in sorted(self.operations.items())},
+        }
+
+
+    def _handle(self, moment: int, kind: int, bus_id: int):
+        if kind == DEPART:
+            bus = self.buses[bus_id]
+            self._measure("dispatcher.depart_bus", self.dispatcher.depart_bus, bus)
+            self._push(moment + self.trip_times[bus.route.id].sample(), RETURN, bus_id)
+        elif kind == RETURN:
+            bus = self.buses[bus_id]
+            self._measure("dispatcher.return_bus_to_park", self.dispatcher.return_bus_to_park, bus)
+            if self.generator.random() < self.route_change_probability:
+                route = self.generator.choice(self.routes)
+                if route != bus.route:
+                    self._measure("dispatcher.change_route", self.dispatcher.change_route, bus, route)
+            if not self.timetable:
+                self._push(moment + self._dwell(), DEPART, bus_id)
+        elif kind == TICK:
+            for dispatch in self._measure("scheduler.tick", self.scheduler.tick):
+                if dispatch.status is ScheduleStatusEnum.DISPATCHED:
+                    bus = dispatch.departure.bus
+                    self._push(moment + self.trip_times[bus.route.id].sample(), RETURN, bus.id)
+            self._push(moment + MINUTE, TICK)
+        elif kind == ANALYTICS:
+            self._measure("analytic.analyze_buses", self.analytic.analyze_buses)
+            self._measure("analytic.get_recent_route_stats", self.analytic.get_recent_route_stats)
+            self._measure("analytic.travel_time_report", self.analytic.travel_time_report, ReportGroupEnum.ROUTE)
+            self._push(moment + self.analytics_every, ANALYTICS)
+        elif kind == COMPACT:
+            self._measure("registry.compact", self.registry.compact, from_microseconds(moment - DAY))
+            self._push(moment + DAY, COMPACT)
+
+
+    def _measure(self, name: str, function, *arguments):
+        started = perf_counter_ns()
+        try:
+            return function(*arguments)
+        except CommandRejected:
+            return None
+        finally:
+            stats = self.operations.get(name)
+            if stats is None:
+                stats = self.operations[name] = OperationStats()
+            stats.add(perf_counter_ns() - started)
+
+
+    def _push(self, moment: int, kind: int, bus_id: int = -1):
+        self._sequence += 1
+        heappush(self._events, (moment, kind, self._sequence, bus_id))
+
+
+    def _dwell(self) -> int:
+        return max(MINUTE, round(self.generator.expovariate(1 / self.mean_dwell) * MINUTE))
+
+
+def print_report(report: dict):
+    print(f"Симульовано {report['simulated_days']:g} діб: {report['buses']} автобусів, {report['routes']} маршрутів, "
+          f"{report['trips']} рейсів, {report['events']} подій за {report['wall_seconds']:.2f} с "
+          f"({report['simulated_days_per_second']:.1f} діб/с)")
+    if report["scheduled_dispatches"] or report["missed_departures"]:
+        print(f"За розкладом відправлено - {report['scheduled_dispatches']}, пропущено - {report['missed_departures']}")
+    print(f"\n{'операція':<36} {'викликів':>9} {'викл./с':>10} {'сер. мкс':>10} {'p50 мкс':>10} {'p99 мкс':>10} {'макс. мкс':>11}")
+    for name, stats in report["operations"].items():
+        print(f"{name:<36} {stats['count']:>9} {stats['throughput']:>10.0f} {stats['mean_us']:>10.1f} "
+              f"{stats['p50_us']:>10.1f} {stats['p99_us']:>10.1f} {stats['max_us']:>11.1f}")
+
+
+def main(arguments: list[str] | None = None) -> int:
+    parser = argparse.ArgumentParser(description = "Дискретно-подійна симуляція роботи автобусної станції")
+    parser.add_argument("--routes", type = int, default = 20)
+    parser.add_argument("--buses", type = int, default = 500)
+    parser.add_argument("--days", type = float, default = 30, help = "тривалість симуляції у добах")
+    parser.add_argument("--distribution", choices = DISTRIBUTIONS, default = "lognormal",
+                        help = "розподіл тривалості рейсів")
+    parser.add_argument("--mean-trip", type = float, default = 90, help = "середня тривалість рейсу у хвилинах")
+    parser.add_argument("--spread", type = float, default = 0.3, help = "коефіцієнт варіації тривалості рейсу")
+    parser.add_argument("--mean-dwell", type = float, default = 30, help = "середній час у парку між рейсами у хвилинах")
+    parser.add_argument("--timetable", type = int, default = 0,
+                        help = "кількість рейсів розкладу на добу для кожного маршруту (0 - без розкладу)")
+    parser.add_argument("--route-change-probability", type = float, default = 0.01)
+    parser.add_argument("--analytics-every", type = float, default = 6, help = "період аналітичних запитів у годинах")
+    parser.add_argument("--seed", type = int, default = 0, help = "зерно генератора випадкових чисел")
+    parser.add_argument("--journal", help = "записувати події у журнал за цим шляхом")
+    parser.add_argument("--output", help = "файл для запису звіту у JSON")
+    options = parser.parse_args(arguments)
+
+    simulation = Simulation(routes = options.routes,
+                            buses = options.buses,
+                            days = options.days,
+                            distribution = options.distribution,
+                            mean_trip = options.mean_trip,
+                            spread = options.spread,
+                            mean_dwell = options.mean_dwell,
+                            timetable = options.timetable,
+                            route_change_probability = options.route_change_probability,
+                            analytics_every = options.analytics_every,
+                            seed = options.seed,
+                            journal_path = options.journal)
+    report = simulation.run()
+    print_report(report)
+    if options.output:
+        with open(options.output, "w", encoding = "utf-8") as file:
+            json.dump(report, file, ensure_ascii = False, indent = 2)
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,77 @@
+import json
+import os
+
+
+SNAPSHOT_MAGIC = b'BUSPARK-SNAPSHOT-2\n'
+_SECTION = "$bytes"
+
+
+def write_snapshot(path: str, state: dict, generation: int):
+    """Атомарно записує знімок стану станції у бінарний файл.
+
+    Стан складається лише з простих значень (кортежі, рядки, числа) та байтових колонок історії.
+    Після заголовка SNAPSHOT_MAGIC у файлі записано рядок JSON з довжинами байтових секцій,
+    рядок JSON зі станом, у якому кожне значення bytes замінено посиланням {"$bytes": номер секції},
+    та самі секції підряд. Колонки історії не перетворюються у JSON, тому знімок компактний
+    та швидко завантажується, а його читання не виконує код, як pickle.
+    Файл спочатку записується поруч і скидається на диск, після чого замінює попередній знімок,
+    тож аварійне завершення не пошкоджує останній знімок.
+
+    Параметри:
+        path (str): Шлях до файлу знімку.
+        state (dict): Стан станції (FleetRegistry.export_state та вміст парку).
+        generation (int): Покоління журналу, яке продовжує цей знімок.
+    """
+    sections: list[bytes] = []
+
+    def add_section(value) -> dict:
+        if not isinstance(value, bytes):
+            raise TypeError(f"Значення типу {type(value).__name__} не можна зберегти у знімку стану")
+        sections.append(value)
+        return {_SECTION: len(sections) - 1}
+
+    document = json.dumps({"generation": generation, "state": state},
+                          ensure_ascii = False, separators = (',', ':'), default = add_section)
+    temporary_path = path + '.tmp'
+    with open(temporary_path, 'wb') as file:
+        file.write(SNAPSHOT_MAGIC)
+        file.write(json.dumps([len(section) for section in sections]).encode('utf-8') + b'\n')
+        file.write(document.encode('utf-8') + b'\n')
+        for section in sections:
+            file.write(section)
+        file.flush()
+        os.fsync(file.fileno())
+    os.replace(temporary_path, path)
+
+
+def read_snapshot(path: str) -> tuple[int, dict] | None:
+    """Читає знімок стану станції, записаний функцією write_snapshot.
+
+    Параметри:
+        path (str): Шлях до файлу знімку.
+
+    Returns:
+        tuple[int, dict] | None: Покоління журналу та стан станції або None, якщо знімку немає.
+            Кортежі стану читаються як списки.
+
+    Raises:
+        ValueError: Файл не є знімком стану станції або пошкоджений.
+    """
+    if not os.path.exists(path):
+        return None
+    with open(path, 'rb') as file:
+        if file.read(len(SNAPSHOT_MAGIC)) != SNAPSHOT_MAGIC:
+            raise ValueError(f"Файл '{path}' не є знімком стану станції")
+        try:
+            lengths = json.loads(file.readline())
+            document = file.readline()
+            if not isinstance(lengths, list) or not all(type(length) is int and length >= 0 for length in lengths):
+                raise ValueError
+            sections = [file.read(length) for length in lengths]
+            if any(len(section) != length for section, length in zip(sections, lengths)) or file.read(1):
+                raise ValueError
+            snapshot = json.loads(document, object_hook = lambda value: (sections[value[_SECTION]]
+                                                                        if value.keys() == {_SECTION} else value))
+            return snapshot["generation"], snapshot["state"]
+        except (ValueError, TypeError, KeyError, IndexError):
+            raise ValueError(f"Знімок стану '{path}' пошкоджено") from None
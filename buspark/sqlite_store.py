@@ -0,0 +1,257 @@
+import atexit
+import sqlite3
+import threading
+from contextlib import suppress
+from itertools import groupby
+
+
+SCHEMA = """
+CREATE TABLE IF NOT EXISTS cities (
+    id INTEGER PRIMARY KEY,
+    title TEXT NOT NULL UNIQUE
+);
+CREATE TABLE IF NOT EXISTS routes (
+    id INTEGER PRIMARY KEY,
+    start_city_id INTEGER NOT NULL REFERENCES cities (id),
+    end_city_id INTEGER NOT NULL REFERENCES cities (id),
+    retired INTEGER NOT NULL DEFAULT 0
+);
+CREATE TABLE IF NOT EXISTS drivers (
+    id INTEGER PRIMARY KEY,
+    first_name TEXT NOT NULL,
+    second_name TEXT NOT NULL,
+    UNIQUE (first_name, second_name)
+);
+CREATE TABLE IF NOT EXISTS buses (
+    id INTEGER PRIMARY KEY,
+    number TEXT NOT NULL,
+    driver_id INTEGER NOT NULL REFERENCES drivers (id),
+    route_id INTEGER REFERENCES routes (id),
+    retired INTEGER NOT NULL DEFAULT 0
+);
+CREATE INDEX IF NOT EXISTS buses_by_route ON buses (route_id) WHERE NOT retired;
+CREATE TABLE IF NOT EXISTS departures (
+    bus_id INTEGER NOT NULL REFERENCES buses (id),
+    route_id INTEGER NOT NULL REFERENCES routes (id),
+    departure_time INTEGER NOT NULL,
+    arrival_time INTEGER,
+    PRIMARY KEY (bus_id, departure_time)
+) WITHOUT ROWID;
+CREATE INDEX IF NOT EXISTS departures_by_route ON departures (route_id, departure_time);
+CREATE INDEX IF NOT EXISTS departures_by_arrival ON departures (arrival_time);
+"""
+
+INSERT_CITY = "INSERT OR IGNORE INTO cities (title) VALUES (?)"
+INSERT_DRIVER = "INSERT OR IGNORE INTO drivers (first_name, second_name) VALUES (?, ?)"
+UPSERT_ROUTE = """
+INSERT INTO routes (id, start_city_id, end_city_id, retired)
+VALUES (?, (SELECT id FROM cities WHERE title = ?), (SELECT id FROM cities WHERE title = ?), ?)
+ON CONFLICT (id) DO UPDATE SET retired = excluded.retired
+"""
+UPSERT_BUS = """
+INSERT INTO buses (id, number, driver_id, route_id, retired)
+VALUES (?, ?, (SELECT id FROM drivers WHERE first_name = ? AND second_name = ?), ?, ?)
+ON CONFLICT (id) DO UPDATE SET number = excluded.number, driver_id = excluded.driver_id,
+                               route_id = excluded.route_id, retired = excluded.retired
+"""
+RETIRE_ROUTE = "UPDATE routes SET retired = 1 WHERE id = ?"
+RETIRE_BUS = "UPDATE buses SET retired = 1 WHERE id = ?"
+DROP_ACTIVE_DEPARTURE = "DELETE FROM departures WHERE bus_id = ? AND arrival_time IS NULL"
+SET_BUS_ROUTE = "UPDATE buses SET route_id = ? WHERE id = ?"
+OPEN_DEPARTURE = """
+INSERT INTO departures (bus_id, route_id, departure_time) VALUES (?, ?, ?)
+ON CONFLICT (bus_id, departure_time) DO UPDATE SET route_id = excluded.route_id
+"""
+CLOSE_DEPARTURE = "UPDATE departures SET arrival_time = ? WHERE bus_id = ? AND departure_time = ?"
+UPSERT_DEPARTURE = """
+INSERT INTO departures (bus_id, route_id, departure_time, arrival_time) VALUES (?, ?, ?, ?)
+ON CONFLICT (bus_id, departure_time) DO UPDATE SET arrival_time = excluded.arrival_time
+"""
+
+SELECT_ACTIVE_DEPARTURES = """
+SELECT bus_id, route_id, departure_time FROM departures
+WHERE arrival_time IS NULL
+ORDER BY departure_time
+"""
+SELECT_ROUTE_BUSES = "SELECT id FROM buses WHERE route_id = ? AND NOT retired ORDER BY id"
+SELECT_BUS_SUMMARIES = """
+SELECT buses.id,
+       count(departures.bus_id),
+       coalesce(sum(departures.arrival_time - departures.departure_time), 0),
+       coalesce(sum(CASE WHEN departures.arrival_time IS NULL THEN ? - departures.departure_time END), 0)
+FROM buses LEFT JOIN departures ON departures.bus_id = buses.id
+WHERE NOT buses.retired
+GROUP BY buses.id
+ORDER BY buses.number
+"""
+SELECT_BUS_HISTORY = """
+SELECT route_id, departure_time, arrival_time FROM departures
+WHERE bus_id = ? AND arrival_time IS NOT NULL
+ORDER BY departure_time
+"""
+COUNT_DEPARTURES = "SELECT count(*) FROM departures"
+
+
+class SqliteStore:
+    """
+    Клас SqliteStore - необов'язкове вбудоване сховище SQLite для автопарків та історії рейсів,
+    що не вміщуються у пам'ять.
+
+    Таблиці: міста, маршрути, водії, автобуси та рейси. Рейси зберігаються за первинним ключем
+    (автобус, час відправлення), тож рейси одного автобуса лежать поруч; додатково є індекси
+    за маршрутом та часом прибуття (активні рейси - рядки без часу прибуття).
+    Час зберігається у мікросекундах від початку епохи, як і в колонковій історії реєстру.
+    Реєстр не відправляє автобус двічі в одну мікросекунду (див. FleetRegistry.open_departure),
+    тож ключ (автобус, час відправлення) визначає рейс однозначно.
+    Видалені автобуси та маршрути позначаються (retired) і залишаються для історії.
+
+    Під'єднується до реєстру (атрибут store класу FleetRegistry), який передає у нього кожну зміну.
+    Зміни накопичуються та записуються пакетами в одній транзакції (режим WAL): коли накопичується
+    batch_size змін, перед кожним запитом або фоновим потоком кожні flush_interval секунд.
+    Усі записи ідемпотентні (вставка за ідентифікатором або ключем рейсу), тому повторне
+    застосування подій журналу після аварійного завершення не дублює рядки.
+    Якщо пакет не вдалося записати, транзакція відкочується, а зміни залишаються у черзі для наступної спроби.
+    """
+
+    def __init__(self, path: str, batch_size: int = 1_000, flush_interval: float = 1.0):
+        self.path = path
+        self.batch_size = batch_size
+        self._connection = sqlite3.connect(path, isolation_level = None, check_same_thread = False)
+        self._connection.execute("PRAGMA journal_mode = WAL")
+        self._connection.execute("PRAGMA synchronous = NORMAL")
+        self._connection.executescript(SCHEMA)
+        self._lock = threading.Lock()
+        self._pending: list[tuple[str, tuple]] = []
+        self._closed = threading.Event()
+        self._flusher = threading.Thread(target = self._flush_periodically,
+                                         args = (flush_interval,),
+                                         daemon = True)
+        self._flusher.start()
+        atexit.register(self.close)
+
+
+    def add_route(self, route_key: int, start_point: str, end_point: str, retired: bool = False):
+        self._write((INSERT_CITY, (start_point,)),
+                    (INSERT_CITY, (end_point,)),
+                    (UPSERT_ROUTE, (route_key, start_point, end_point, int(retired))))
+
+
+    def remove_route(self, route_key: int):
+        self._write((RETIRE_ROUTE, (route_key,)))
+
+
+    def add_bus(self, bus_id: int, number: str, first_name: str, second_name: str,
+                route_key: int | None = None, retired: bool = False):
+        self._write((INSERT_DRIVER, (first_name, second_name)),
+                    (UPSERT_BUS, (bus_id, number, first_name, second_name, route_key, int(retired))))
+
+
+    def remove_bus(self, bus_id: int):
+        """Позначає автобус видаленим; його активний рейс, як і в реєстрі, відкидається."""
+        self._write((RETIRE_BUS, (bus_id,)), (DROP_ACTIVE_DEPARTURE, (bus_id,)))
+
+
+    def set_bus_route(self, bus_id: int, route_key: int | None):
+        self._write((SET_BUS_ROUTE, (route_key, bus_id)))
+
+
+    def open_departure(self, bus_id: int, route_key: int, departure_time: int):
+        self._write((OPEN_DEPARTURE, (bus_id, route_key, departure_time)))
+
+
+    def close_departure(self, bus_id: int, departure_time: int, arrival_time: int):
+        self._write((CLOSE_DEPARTURE, (arrival_time, bus_id, departure_time)))
+
+
+    def add_departures(self, bus_ids, route_keys, departure_times, arrival_times):
+        """Додає завершені рейси, передані колонками (як у DepartureHistory), одним пакетом."""
+        with self._lock:
+            self._flush()
+            self._execute([(UPSERT_DEPARTURE, zip(bus_ids, route_keys, departure_times, arrival_times))])
+
+
+    def get_active_departures(self) -> list[tuple[int, int, int]]:
+        """Повертає активні рейси: ідентифікатор автобуса, ключ маршруту та час відправлення."""
+        return self._query(SELECT_ACTIVE_DEPARTURES)
+
+
+    def get_route_bus_ids(self, route_key: int) -> list[int]:
+        """Повертає ідентифікатори автобусів маршруту."""
+        return [bus_id for bus_id, in self._query(SELECT_ROUTE_BUSES, (route_key,))]
+
+
+    def get_bus_summaries(self, now: int) -> list[tuple[int, int, int, int]]:
+        """Повертає для кожного автобуса, відсортованого за номером, кількість рейсів, час завершених рейсів
+        та час активного рейсу до now (мікросекунди)."""
+        return self._query(SELECT_BUS_SUMMARIES, (now,))
+
+
+    def get_bus_history(self, bus_id: int) -> list[tuple[int, int, int]]:
+        """Повертає завершені рейси автобуса: ключ маршруту, час відправлення та час прибуття у мікросекундах."""
+        return self._query(SELECT_BUS_HISTORY, (bus_id,))
+
+
+    def count_departures(self) -> int:
+        return self._query(COUNT_DEPARTURES)[0][0]
+
+
+    def flush(self):
+        """Записує накопичені зміни."""
+        with self._lock:
+            self._flush()
+
+
+    def close(self):
+        """Записує накопичені зміни та закриває сховище."""
+        if self._closed.is_set():
+            return
+        self._closed.set()
+        with self._lock:
+            self._flush()
+            self._connection.close()
+
+
+    def _write(self, *statements: tuple[str, tuple]):
+        with self._lock:
+            self._pending.extend(statements)
+            if len(self._pending) >= self.batch_size:
+                self._flush()
+
+
+    def _query(self, sql: str, parameters: tuple = ()) -> list[tuple]:
+        with self._lock:
+            self._flush()
+            return self._connection.execute(sql, parameters).fetchall()
+
+
+    def _flush(self):
+        if not self._pending:
+            return
+        pending, self._pending = self._pending, []
+        try:
+            # Послідовні однакові запити виконуються одним executemany.
+            self._execute([(sql, [parameters for _, parameters in group])
+                           for sql, group in groupby(pending, key = lambda statement: statement[0])])
+        except BaseException:
+            self._pending[:0] = pending
+            raise
+
+
+    def _execute(self, batches: list[tuple[str, list[tuple]]]):
+        self._connection.execute("BEGIN")
+        try:
+            for sql, parameters in batches:
+                self._connection.executemany(sql, parameters)
+        except BaseException:
+            self._connection.execute("ROLLBACK")
+            raise
+        self._connection.execute("COMMIT")
+
+
+    def _flush_periodically(self, interval: float):
+        while not self._closed.wait(interval):
+            with self._lock:
+                # Помилку запису (наприклад, зайнята база) отримає наступний запит або flush; зміни залишаються у черзі.
+                if not self._closed.is_set():
+                    with suppress(sqlite3.Error):
+                        self._flush()
@@ -1,63 +1,213 @@
-from typing import Self
+import os
+import threading
+from datetime import (datetime,
+                      timedelta)
+from typing import (Callable,
+                    Self)
 
 from workers import (Manager,
                      Dispatcher,
-                     Analytic)
+                     Analytic,
+                     filter_buses)
 from models import (Bus,
-                    Park,
                     Route,
-                    Departure)
+                    Park,
+                    BusStatusEnum,
+                    ReportGroupEnum,
+                    PlanCriterionEnum)
+from registry import FleetRegistry
+from journal import (EventJournal,
+                     replay_journal)
+from snapshot import (read_snapshot,
+                      write_snapshot)
+from scheduler import DepartureScheduler
+from sqlite_store import SqliteStore
+from commands import StationCommands
 from signals import (ReturnMenu, 
-                     SameRouteSelected,
-                     RouteChangedDuringDeparture,
-                     RouteSet)
+                     CommandRejected,
+                     MenuResult)
 from station_decorators import (are_here_buses,
                                 are_here_buses_tied_to_route,
                                 are_here_departures, 
                                 are_here_routes,
                                 are_here_departed_buses,
-                                are_here_free_buses)
+                                are_here_free_buses,
+                                are_here_planned_departures)
 from serializers import timedelta_to_str
+import metrics
+from clock import (current_time,
+                   current_ns,
+                   ns_to_timedelta)
 from utils import (get_object_from_suggested_options,
-                   get_route_buses,
-                   compose_objects_list_for_selection)
+                   compose_objects_list_for_selection,
+                   browse_pages,
+                   PAGE_SIZE)
+
 
+JOURNAL_PATH = os.environ.get("BUSPARK_JOURNAL", "buspark.journal")
+SNAPSHOT_PATH = os.environ.get("BUSPARK_SNAPSHOT", "buspark.snapshot")
+STORE_PATH = os.environ.get("BUSPARK_STORE")
+SNAPSHOT_EVERY = 100_000
+HISTORY_RETENTION = timedelta(days = 1)
+METRICS_PATH = os.environ.get("BUSPARK_METRICS_PATH", "buspark.prom")
+DIAGNOSTICS_OPTIONS = ["Увімкнути збір показників", "Вимкнути збір показників",
+                       "Записати показники у файл (формат Prometheus)", "Очистити показники"]
 
+
+@metrics.instrument_methods("station", exclude = ("show_menu",))
 class AutoStation:
     """
     Клас AutoStation представляє автобусну станцію.
-    Делегує обов'язки на класи Manager, Analytic, Dispatcher.
+    Делегує обов'язки на класи StationCommands, Manager, Analytic, Dispatcher, DepartureScheduler.
     Зберігає посилання на дані класи за рахунок композиції.
+    Меню лише запитує дані у користувача, а дії виконує через програмний інтерфейс StationCommands.
 
     Являється синглтоном.
-    Після створення класу ініціалізує необхідні класи (Park, Analytic, Dispatcher, Manager) та 
-        атрибути (route_list, bus_list, departure_list) у методі __new__    .
+    Після створення класу ініціалізує необхідні класи (Park, FleetRegistry, Analytic, Dispatcher, Manager,
+        DepartureScheduler, StationCommands)
+        у методі __new__. Автобуси, маршрути та рейси зберігаються у реєстрі FleetRegistry.
     Містить у собі опції для головного меню (у методі show_menu).
     Деякі методи цього классу проходять попередню перевірку за допомогою декораторів.
     Якщо метод не проходить попередню перевірку - користувача повертає до меню з повідомленням про помилку.
     """
     
     __instance = None
+    __instance_lock = threading.Lock()
     
 
     def __new__(cls, *args, **kwargs) -> Self:
-        if not cls.__instance:
-            cls.__instance = super().__new__(cls, *args, **kwargs)
-            cls.park = Park()
-            cls.route_list: list[Route] = []
-            cls.bus_list: list[Bus] = []
-            cls.departure_list: list[Departure] = []
-            cls.analytic: Analytic = Analytic()
-            cls.manager: Manager = Manager()
-            cls.dispatcher: Dispatcher = Dispatcher()
+        with cls.__instance_lock:
+            if not cls.__instance:
+                cls.__instance = super().__new__(cls, *args, **kwargs)
+                cls.park = Park()
+                cls._checkpoint_lock = threading.Lock()
+                cls.registry: FleetRegistry = FleetRegistry()
+                cls.analytic: Analytic = Analytic(cls.registry)
+                cls.manager: Manager = Manager(cls.registry)
+                cls.dispatcher: Dispatcher = Dispatcher(cls.registry)
+                cls.scheduler: DepartureScheduler = DepartureScheduler(cls.registry, cls.dispatcher)
+                cls.commands: StationCommands = StationCommands(cls.registry, cls.manager, cls.dispatcher, cls.analytic,
+                                                                cls.scheduler)
         return cls.__instance
 
 
+    def open_journal(self, path: str = JOURNAL_PATH, snapshot_path: str = SNAPSHOT_PATH, store_path: str | None = STORE_PATH):
+        """Відновлює стан станції зі знімку та журналу подій і під'єднує журнал для запису нових змін.
+
+        Кроки:
+        1. Під'єднання сховища SQLite до реєстру, якщо задано store_path (змінна середовища BUSPARK_STORE):
+           зміни, відновлені зі знімку та журналу, також передаються у сховище.
+        2. Завантаження останнього знімку стану (якщо він є) у реєстр.
+        3. Повторне застосування подій журналу, записаних після знімку (функція replay_journal).
+        4. Повернення у парк автобусів, які після відновлення не знаходяться у дорозі
+           (у порядку, збереженому у знімку).
+        5. Побудова черги відправлень планувальника з відновленого розкладу.
+        6. Синхронізація сховища SQLite з відновленим станом (історія рейсів зі знімку).
+        7. Під'єднання журналу до реєстру, після чого кожна зміна стану записується у журнал.
+        8. Створення нового знімку, якщо після попереднього накопичилось забагато подій.
+
+        Параметри:
+        - path: str - шлях до файлу журналу
+        - snapshot_path: str - шлях до файлу знімку
+        - store_path: str | None - шлях до файлу сховища SQLite або None (сховище не використовується)
+
+        Повертає:
+        None
+        """
+        self.snapshot_path = snapshot_path
+        if store_path:
+            self.registry.store = SqliteStore(store_path)
+        generation, park_numbers = 0, []
+        snapshot = read_snapshot(snapshot_path)
+        if snapshot:
+            generation, state = snapshot
+            self.registry.restore_state(state["registry"])
+            park_numbers = state["park"]
+
+        replayed_events = replay_journal(path, self.registry, generation)
+        parked_buses = {bus.number: bus for bus in self.registry.get_buses_by_status(BusStatusEnum.IN_THE_PARKING)}
+        for number in park_numbers:
+            if number in parked_buses:
+                self.park.add_bus(parked_buses.pop(number))
+        for bus in parked_buses.values():
+            self.park.add_bus(bus)
+        self.scheduler.load()
+        if self.registry.store:
+            self.registry.sync_store()
+
+        self.registry.journal = EventJournal(path, generation)
+        if replayed_events >= SNAPSHOT_EVERY:
+            self.checkpoint()
+
+
+    def checkpoint(self, retention: timedelta = HISTORY_RETENTION):
+        """Створює знімок стану станції та починає нове покоління журналу.
+
+        Кроки:
+        Усі кроки виконуються під exclusive() реєстру, тож інші термінали не змінюють стан під час створення знімку,
+        та після завершення відкритих пакетів команд (EventJournal.without_batches), щоб їх події не потрапили
+        у нове покоління журналу після знімку, який вже містить їх зміни.
+        1. Ущільнення історії рейсів: завершені рейси, старші за retention, залишаються лише
+           у накопичених підсумках автобусів (та у сховищі SQLite, якщо воно під'єднане -
+           накопичені зміни сховища записуються до створення знімку).
+        2. Запис знімку стану (реєстр та вміст парку) з номером наступного покоління журналу.
+        3. Перехід журналу до нового покоління - події, включені у знімок, відкидаються.
+        Якщо журнал не під'єднано (open_journal), знімок не створюється.
+
+        Параметри:
+        - retention: timedelta - скільки часу зберігати завершені рейси в історії
+
+        Повертає:
+        None
+        """
+        journal = self.registry.journal
+        if journal is None:
+            return
+        with journal.without_batches(), self.registry.exclusive():
+            if self.registry.store:
+                self.registry.store.flush()
+            self.registry.compact(current_time() - retention)
+            with self.park.locked_buses() as parked_buses:
+                park = [bus.number for bus in parked_buses]
+            state = {
+                "registry": self.registry.export_state(),
+                "park": park,
+            }
+            write_snapshot(self.snapshot_path, state, journal.generation + 1)
+            journal.rotate(journal.generation + 1)
+
+
+    def needs_checkpoint(self) -> bool:
+        """Повертає, чи накопичилось у поточному поколінні журналу SNAPSHOT_EVERY подій."""
+        journal = self.registry.journal
+        return journal is not None and journal.events_written >= SNAPSHOT_EVERY
+
+
+    def checkpoint_if_needed(self) -> bool:
+        """Створює знімок стану, якщо у поточному поколінні журналу накопичилось SNAPSHOT_EVERY подій.
+        Якщо знімок вже створюється іншим потоком, повертається одразу.
+
+        Повертає:
+        bool - чи було створено знімок
+        """
+        if not self.needs_checkpoint() or not self._checkpoint_lock.acquire(blocking = False):
+            return False
+        try:
+            if not self.needs_checkpoint():
+                return False
+            self.checkpoint()
+            return True
+        finally:
+            self._checkpoint_lock.release()
+
+
     def show_menu(self, menu_msg: str = None):
         """
         Метод для відображення меню та обробки вибраних опцій.
 
         Приймає необов'язковий аргумент menu_msg для виведення додаткового повідомлення у меню.
+        Меню працює у циклі: кожна опція повертає MenuResult з повідомленням, яке виводиться
+        перед наступним показом меню, тому тривала робота не збільшує стек викликів.
 
         Параметри:
         - menu_msg: str - повідомлення меню (опціонально)
@@ -65,8 +215,6 @@ class AutoStation:
         Повертає:
         None
         """
-
-        if menu_msg: print(menu_msg)
         options = (
             {
                 "title": 'Вийти',
@@ -115,6 +263,34 @@ class AutoStation:
             {
                 "title": "Вивести аналітику роботи автобусів",
                 "callback": self.show_analytics
+            },
+            {
+                "title": "Вивести звіт часу у дорозі",
+                "callback": self.show_travel_time_report
+            },
+            {
+                "title": "Вивести рейси маршрутів за останній час",
+                "callback": self.show_recent_route_stats
+            },
+            {
+                "title": "Додати рейс до розкладу",
+                "callback": self.schedule_departure
+            },
+            {
+                "title": "Видалити рейс з розкладу",
+                "callback": self.cancel_scheduled_departure
+            },
+            {
+                "title": "Вивести розклад рейсів",
+                "callback": self.show_timetable
+            },
+            {
+                "title": "Знайти шлях між містами",
+                "callback": self.plan_route
+            },
+            {
+                "title": "Діагностика",
+                "callback": self.show_diagnostics
             }
         )
 
@@ -122,34 +298,49 @@ class AutoStation:
         for option_index, option in enumerate(options):
             text += f'[{option_index}] - {option.get("title")}\n'
 
-        try:
-            choosed_option = int(input(text))
-        except ValueError as ex:
-            return self.show_menu("[!] Необхідно ввести саме цифру/число.")
-        else:
-            if choosed_option in range(len(options)):
-                options[choosed_option]["callback"]()
-            return self.show_menu("[!] Обрана неіснуюча опція :(")
+        while True:
+            self.checkpoint_if_needed()
+
+            if menu_msg: print(menu_msg)
+            try:
+                choosed_option = int(input(text))
+            except ValueError:
+                menu_msg = "[!] Необхідно ввести саме цифру/число."
+                continue
+
+            if choosed_option not in range(len(options)):
+                menu_msg = "[!] Обрана неіснуюча опція :("
+                continue
+            menu_msg = options[choosed_option]["callback"]().message
 
 
     def create_bus(self):
         """Створює автобус та додає його до парку.
 
         Кроки:
-        1. Створення нового автобуса за допомогою методу create_bus класу manager (делегування).
-        2. Додавання створеного автобуса до парку за допомогою методу add_bus класу park.
-        3. Додавання автобуса до списку bus_list.
-        4. Форматування заголовку автобуса для відображення.
-        5. Повернення результату виклику show_menu з відформатованим повідомленням про успішне створення та відправлення автобуса до парку.
+        1. Отримання від користувача номеру автобусу, імені та прізвища водія за допомогою функції input.
+        2. Створення автобуса за допомогою методу create_bus класу commands (делегування).
+            - Якщо автобус з таким номером вже існує, виведення повідомлення та повторення процесу створення автобуса.
+        3. Форматування заголовку автобуса для відображення.
+        4. Повернення MenuResult з відформатованим повідомленням про успішне створення та відправлення автобуса до парку.
 
         Returns:
-            Результат виклику show_menu з відформатованим повідомленням про успішне створення та відправлення автобуса до парку.
+            MenuResult з відформатованим повідомленням про успішне створення та відправлення автобуса до парку.
         """
-        bus = self.manager.create_bus(self.bus_list)
-        self.park.add_bus(bus)
-        self.bus_list.append(bus)
+        while True:
+            bus_number, driver_first_name, driver_second_name = (
+                input("Введіть номер автобусу: "),
+                input("Введіть ім'я водія: "),
+                input("Введіть фамілію водія: ")
+            )
+            try:
+                bus = self.commands.create_bus(bus_number, driver_first_name, driver_second_name)
+            except CommandRejected as ex:
+                print(f"\n\n{ex}")
+            else:
+                break
         bus_title_formatted = str(bus)[0].capitalize() + str(bus)[1:]
-        return self.show_menu(f"{bus_title_formatted} успішно створено та відправлено до парку!".strip()) 
+        return MenuResult(f"{bus_title_formatted} успішно створено та відправлено до парку!".strip()) 
     
 
     @are_here_buses
@@ -160,28 +351,28 @@ class AutoStation:
         """Відправляє автобус у рейс.
 
         Кроки:
-        1. Отримання списку невідправлених автобусів за допомогою методу get_not_departed_buses класу analytic (делегування).
-        2. Отримання списку автобусів, прив'язаних до маршрутів, за допомогою методу get_buses_tied_to_route класу analytic.
-        3. Виклик методу depart_bus класу dispatcher для вибору автобуса та рейсу, на який його відправити.
-        4. Додавання рейсу до списку departure_list.
-        5. Форматування заголовку вибраного автобуса для відображення.
-        6. Повернення результату виклику show_menu з відформатованим повідомленням про успішне відправлення автобуса на маршрут.
+        1. Вибір автобуса зі списку невідправлених автобусів з маршрутом (метод get_not_departed_buses класу analytic)
+           або за номером.
+        2. Відправлення обраного автобуса за допомогою методу depart_bus класу commands (делегування).
+        3. Форматування заголовку вибраного автобуса для відображення.
+        4. Повернення MenuResult з відформатованим повідомленням про успішне відправлення автобуса на маршрут.
 
         Returns:
-            Результат виклику show_menu з відформатованим повідомленням про успішне відправлення автобуса на маршрут."""
+            MenuResult з відформатованим повідомленням про успішне відправлення автобуса на маршрут."""
         try:
-            selected_bus, departure = self.dispatcher.depart_bus(
-                self.analytic.get_not_departed_buses(
-                                self.departure_list,
-                                self.analytic.get_buses_tied_to_route(self.bus_list)
-                            )
+            selected_bus = get_object_from_suggested_options(
+                self.analytic.get_not_departed_buses(),
+                **self._bus_lookups(lambda bus: bus.route is not None and self.registry.get_bus_active_departure(bus) is None)
             )
         except ReturnMenu:
-            return self.show_menu()
+            return MenuResult()
         
-        self.departure_list.append(departure)
+        try:
+            self.commands.depart_bus(selected_bus.number)
+        except CommandRejected as ex:
+            return MenuResult(str(ex))
         bus_title_formatted = str(selected_bus)[0].capitalize() + str(selected_bus)[1:]
-        return self.show_menu(f"{bus_title_formatted} відправлено у {selected_bus.route}!".strip())
+        return MenuResult(f"{bus_title_formatted} відправлено у {selected_bus.route}!".strip())
         
 
     @are_here_buses
@@ -190,66 +381,79 @@ class AutoStation:
         """Повертає автобус до парку.
 
         Кроки:
-        1. Делегування отримання списку активних рейсів до методу get_active_departures класу analytic.
-        2. Виклик методу return_bus_to_park класу dispatcher для вибору автобуса, який повернеться до парку.
+        1. Вибір автобуса зі списку автобусів активних рейсів (метод get_active_departures класу analytic)
+           або за номером.
+        2. Повернення обраного автобуса за допомогою методу return_bus_to_park класу commands (делегування).
         3. Створення повідомлення про успішне повернення автобуса до парку та зняття його з маршруту.
-        4. Повернення результату виклику show_menu з відформатованим повідомленням.
+        4. Повернення MenuResult з відформатованим повідомленням.
 
         Returns:
-            Результат виклику show_menu з відформатованим повідомленням про успішне повернення автобуса до парку.
+            MenuResult з відформатованим повідомленням про успішне повернення автобуса до парку.
         """ 
         try:
-            selected_bus = self.dispatcher.return_bus_to_park(
-                self.analytic.get_active_departures(self.departure_list)
+            selected_bus = get_object_from_suggested_options(
+                [departure.bus for departure in self.analytic.get_active_departures()],
+                **self._bus_lookups(lambda bus: self.registry.get_bus_active_departure(bus) is not None)
             )
         except ReturnMenu:
-            return self.show_menu()
+            return MenuResult()
         
-        msg = f"Автобус вдало повернено до парку та знято з '{selected_bus.route}'"
-        return self.show_menu(msg)
+        try:
+            departure = self.commands.return_bus_to_park(selected_bus.number)
+        except CommandRejected as ex:
+            return MenuResult(str(ex))
+        msg = f"Автобус вдало повернено до парку та знято з '{departure.route}'"
+        return MenuResult(msg)
         
 
     @are_here_buses
     @are_here_routes
     @are_here_departed_buses
     def show_departed_buses(self):
-        """Відображує список активних рейсів.
+        """Відображує список активних рейсів посторінково.
 
         Кроки:
-        1. Делегування отримання списку активних рейсів до методу get_active_departures класу analytic.
-        2. Створення списку опцій для відображення активних рейсів.
-        3. Повернення результату виклику show_menu зі згенерованим списком опцій.
+        1. Делегування отримання активних рейсів (з фільтрами за номером та водієм) до методу
+           iter_active_departures класу analytic.
+        2. Посторінкове відображення рейсів функцією browse_pages: форматується лише видима сторінка,
+           час у дорозі всіх рейсів рахується від одного зчитування годинника.
+           Рейс автобуса можна знайти за номером.
+        3. Повернення MenuResult без повідомлення.
 
         Returns:
-            Результат виклику show_menu зі списком активних рейсів.
+            MenuResult без повідомлення.
         """
-        options = []
-        for index, departure in enumerate(
-            self.analytic.get_active_departures(self.departure_list)
-        ):
-            options.append(f"[{index} - {departure.bus} | {departure.bus.route} | у дорозі {timedelta_to_str(departure.travel_time)}]")
-        return self.show_menu("\n".join(options))
+        now = current_ns()
+        browse_pages(self.analytic.iter_active_departures,
+                     render = lambda departure: (f"{departure.bus} | {departure.bus.route} | "
+                                                 f"у дорозі {timedelta_to_str(ns_to_timedelta(departure.travel_ns(now)))}"),
+                     find = lambda number: (self.registry.get_bus_active_departure(bus)
+                                            if (bus := self.registry.get_bus(number)) is not None else None),
+                     key = lambda departure: departure.bus.number)
+        return MenuResult()
     
 
     @are_here_buses
     def show_buses_in_park(self):
-        """Відображує список автобусів у парку.
+        """Відображує список автобусів у парку посторінково.
 
         Кроки:
         1. Перевірка, чи є автобуси в парку автобусів.
         2. В разі відсутності автобусів, виводиться повідомлення про порожній парк.
-        3. У випадку наявності автобусів, виводиться список автобусів у парку.
-        4. Повернення результату виклику show_menu.
+        3. У випадку наявності автобусів, автобуси у парку (з фільтрами за номером та водієм)
+           відображаються посторінково функцією browse_pages; автобус можна знайти за номером.
+        4. Повернення MenuResult.
 
         Returns:
-            None: Повернення результату виклику show_menu.
+            MenuResult: Повернення до головного меню.
         """
-        if not self.park.parked_buses:
-            return self.show_menu("[!] Парк пустий!")
-        
-        for index, bus in enumerate(self.park.parked_buses, 1):
-            print(f"[{index}] - {bus}")
-        return self.show_menu()
+        parked_buses = self.park.parked_buses
+        if not parked_buses:
+            return MenuResult("[!] Парк пустий!")
+
+        browse_pages(lambda **filters: filter_buses(parked_buses, **filters),
+                     find = lambda number: self._find_bus(number, lambda bus: bus in self.park))
+        return MenuResult()
 
 
     @are_here_buses
@@ -258,25 +462,29 @@ class AutoStation:
         """Встановлює маршрут для автобуса.
 
         Кроки:
-        1. Делегування отримання списку активних рейсів до методу get_active_departures класу analytic.
-        2. Перехід до відповідного пункту меню в залежності від результату виклику set_route_for_bus.
-        3. Повернення результату виклику show_menu з повідомленням.
+        1. Вибір автобуса та маршруту за допомогою функції get_object_from_suggested_options.
+        2. Встановлення маршруту за допомогою методу set_route_for_bus класу commands (делегування).
+            - Якщо автобус був у дорозі, його рейс зупиняється, а автобус повертається у парк.
+        3. Повернення MenuResult з повідомленням про результат зміни маршруту.
 
         Returns:
-            Результат виклику show_menu з повідомленням про встановлення маршруту для автобуса.
+            MenuResult з повідомленням про встановлення маршруту для автобуса.
         """
         try:
-            self.dispatcher.set_route_for_bus(self.bus_list, 
-                                                    self.route_list, 
-                                                    self.analytic.get_active_departures(self.departure_list))
+            selected_bus = get_object_from_suggested_options(list(self.registry.buses.values()), **self._bus_lookups())
+            selected_route = get_object_from_suggested_options(list(self.registry.routes.values()), search = self._search_routes)
         except ReturnMenu:
-            return self.show_menu()
-        except SameRouteSelected as ex:
-            return self.show_menu(str(ex))
-        except RouteChangedDuringDeparture as ex:
-            return self.show_menu(str(ex))
-        except RouteSet as ex:
-            return self.show_menu(str(ex))
+            return MenuResult()
+
+        previous_route = selected_bus.route
+        try:
+            stopped_departure = self.commands.set_route_for_bus(selected_bus.number,
+                                                                selected_route.id)
+        except CommandRejected as ex:
+            return MenuResult(str(ex))
+        if stopped_departure:
+            return MenuResult(f"Маршрут автобусу було змінено з '{previous_route}' на '{selected_route}', а рейс зупинено!\nАвтобус повернено у парк.")
+        return MenuResult(f"Встановлено '{selected_route}'!")
 
 
     @are_here_buses
@@ -284,35 +492,45 @@ class AutoStation:
         """Видаляє автобус.
 
         Кроки:
-        1. Делегування отримання списку активних рейсів до методу get_active_departures класу analytic.
-        2. Перехід до відповідного пункту меню в залежності від результату виклику delete_bus.
-        3. Повернення результату виклику show_menu з повідомленням.
+        1. Вибір автобуса за допомогою функції get_object_from_suggested_options.
+        2. Видалення обраного автобуса за допомогою методу delete_bus класу commands (делегування).
+        3. Повернення MenuResult з повідомленням.
 
         Returns:
-            Результат виклику show_menu з повідомленням про видалення автобуса.
+            MenuResult з повідомленням про видалення автобуса.
         """
         try:
-            self.manager.delete_bus(self.bus_list, 
-                                    self.analytic.get_active_departures(self.departure_list))
+            selected_bus = get_object_from_suggested_options(list(self.registry.buses.values()), **self._bus_lookups())
         except ReturnMenu:
-            return self.show_menu()
-        return self.show_menu("Автобус було вдало видалено!")
+            return MenuResult()
+        try:
+            self.commands.delete_bus(selected_bus.number)
+        except CommandRejected as ex:
+            return MenuResult(str(ex))
+        return MenuResult("Автобус було вдало видалено!")
     
 
     def create_route(self):
         """Створює новий маршрут.
 
         Кроки:
-        1. Делегування створення маршруту до методу create_route класу manager.
-        2. Додавання створеного маршруту до списку маршрутів.
-        3. Повернення результату виклику show_menu з повідомленням про створення маршруту.
+        1. Отримання початкової та кінцевої точок маршруту від користувача за допомогою функції input.
+        2. Створення маршруту за допомогою методу create_route класу commands (делегування).
+            - Якщо маршрут неможливо створити, повернення MenuResult з причиною.
+        3. Повернення MenuResult з повідомленням про створення маршруту.
 
         Returns:
-            Результат виклику show_menu з повідомленням про створення маршруту.
+            MenuResult з повідомленням про створення маршруту або причиною, чому його не створено.
         """
-        route = self.manager.create_route()
-        self.route_list.append(route)
-        return self.show_menu("Маршрут вдало створено!")
+        start_point, end_point = (
+            input("Початкова точка: "),
+            input("Кінцева точка: ")
+        )
+        try:
+            self.commands.create_route(start_point, end_point)
+        except CommandRejected as ex:
+            return MenuResult(str(ex))
+        return MenuResult("Маршрут вдало створено!")
     
 
     @are_here_buses
@@ -323,25 +541,26 @@ class AutoStation:
         Кроки:
         1. Вибір маршруту зі списку за допомогою методу get_object_from_suggested_options.
         2. Перехід до відповідного пункту меню в залежності від результату вибору маршруту.
-        3. Отримання списку автобусів на обраному маршруті за допомогою методу get_route_buses.
+        3. Отримання автобусів на обраному маршруті (з фільтрами за номером та водієм)
+           за допомогою методу iter_buses класу analytic.
         4. Перевірка, чи є автобуси на обраному маршруті.
-        5. Побудова повідомлення зі списком автобусів на обраному маршруті.
-        6. Повернення результату виклику show_menu з повідомленням.
+        5. Посторінкове відображення автобусів функцією browse_pages; автобус можна знайти за номером.
+        6. Повернення MenuResult без повідомлення.
 
         Returns:
-            Результат виклику show_menu з повідомленням про список автобусів на обраному маршруті.
+            MenuResult без повідомлення або з повідомленням про відсутність автобусів на обраному маршруті.
         """
         try:
-            selected_route = get_object_from_suggested_options(self.route_list)
+            selected_route = get_object_from_suggested_options(list(self.registry.routes.values()), search = self._search_routes)
         except ReturnMenu:
-            return self.show_menu()
+            return MenuResult()
         else:
-            buses_in_selected_route = get_route_buses(selected_route, self.bus_list)
-            if not buses_in_selected_route:
-                return self.show_menu(f"[!] Автобуси у '{selected_route}' відсутні!")
-            msg = f"У '{selected_route}' такі автобуси: \n"
-            buses = compose_objects_list_for_selection(buses_in_selected_route)
-            return self.show_menu(msg + '\n'.join(buses))
+            if next(self.analytic.iter_buses(route = selected_route), None) is None:
+                return MenuResult(f"[!] Автобуси у '{selected_route}' відсутні!")
+            print(f"У '{selected_route}' такі автобуси:")
+            browse_pages(lambda **filters: self.analytic.iter_buses(route = selected_route, **filters),
+                         find = lambda number: self._find_bus(number, lambda bus: bus.route == selected_route))
+            return MenuResult()
     
 
     @are_here_routes
@@ -349,22 +568,24 @@ class AutoStation:
         """Видаляє обраний маршрут.
 
         Кроки:
-        1. Делегування виклику методу delete_route класу manager для видалення маршруту.
-        2. Делегування виклику методу get_active_departures класу analytic для отримання
-        активних рейсів, пов'язаних з видаляємим маршрутом.
-        3. Обробка виключення ReturnMenu і повернення до головного меню.
-        4. Повернення результату виклику show_menu з повідомленням про успішне видалення маршруту.
+        1. Вибір маршруту за допомогою функції get_object_from_suggested_options.
+        2. Обробка виключення ReturnMenu і повернення до головного меню.
+        3. Видалення маршруту за допомогою методу delete_route класу commands (делегування);
+           активні рейси автобусів маршруту завершуються.
+        4. Повернення MenuResult з повідомленням про успішне видалення маршруту.
 
         Returns:
-            Результат виклику show_menu з повідомленням про успішне видалення маршруту.
+            MenuResult з повідомленням про успішне видалення маршруту.
         """
         try:
-            self.manager.delete_route(self.route_list, 
-                                      self.bus_list, 
-                                      self.analytic.get_active_departures(self.departure_list))
+            selected_route = get_object_from_suggested_options(list(self.registry.routes.values()), search = self._search_routes)
         except ReturnMenu:
-            return self.show_menu()
-        return self.show_menu("Маршрут вдало видалено!")
+            return MenuResult()
+        try:
+            self.commands.delete_route(selected_route.id)
+        except CommandRejected as ex:
+            return MenuResult(str(ex))
+        return MenuResult("Маршрут вдало видалено!")
 
 
     @are_here_buses
@@ -373,21 +594,287 @@ class AutoStation:
         """Відображає аналітику рейсів.
 
         Кроки:
-        1. Делегування аналізу рейсів до методу analyze_buses класу analytic.
-        2. Виведення результатів аналізу на екран.
-        3. Повернення результату виклику show_menu без повідомлення.
+        1. Делегування отримання підсумків рейсів до методу analyze_buses класу analytic.
+        2. Посторінкове відображення підсумків (з фільтрами за номером та водієм) функцією browse_pages:
+           форматується лише видима сторінка; підсумки автобуса можна знайти за номером.
+        3. Вибір автобуса для перегляду детальної інформації про його рейси
+           (рейси завантажуються лише для обраного автобуса методом analyze_bus).
+        4. Повернення MenuResult без повідомлення.
 
         Returns:
-            Результат виклику show_menu без повідомлення.
+            MenuResult без повідомлення.
         """
-        results = self.analytic.analyze_buses(self.bus_list, self.departure_list)
-        for bus_results in results:
-            print(f"\n\nРейсы '{bus_results.bus.number} з водієм {bus_results.bus.driver.first_name}'")
-            for departure in bus_results.departures:
-                print(f'{departure.route} | {timedelta_to_str(departure.travel_time)}')
-            print(f"Ітого - {bus_results.total_count} за {timedelta_to_str(bus_results.total_time)}")
-        return self.show_menu()
+        summaries = {bus_results.bus.number: bus_results for bus_results in self.analytic.analyze_buses()}
+        browse_pages(lambda **filters: (summaries[bus.number]
+                                        for bus in filter_buses((bus_results.bus for bus_results in summaries.values()),
+                                                                **filters)),
+                     render = lambda bus_results: (
+                         f"Рейси '{bus_results.bus.number}' з водієм {bus_results.bus.driver.first_name}: "
+                         f"ітого - {bus_results.total_count} за {timedelta_to_str(bus_results.total_time)} "
+                         f"(завершені - {timedelta_to_str(bus_results.finished_time)}, "
+                         f"у дорозі - {timedelta_to_str(bus_results.open_time)})"
+                     ),
+                     find = summaries.get,
+                     key = lambda bus_results: bus_results.bus.number)
+
+        print("\n\nОберіть автобус, щоб переглянути його рейси:")
+        try:
+            selected_bus = get_object_from_suggested_options([bus_results.bus for bus_results in summaries.values()],
+                                                             **self._bus_lookups())
+        except ReturnMenu:
+            return MenuResult()
+
+        bus_results = self.analytic.analyze_bus(selected_bus)
+        for departure in bus_results.departures:
+            print(f'{departure.route} | {timedelta_to_str(departure.travel_time)}')
+        print(f"Ітого - {bus_results.total_count} за {timedelta_to_str(bus_results.total_time)}")
+        return MenuResult()
             
 
+    @are_here_departures
+    def show_travel_time_report(self):
+        """Відображає статистику часу у дорозі за завершеними рейсами.
+
+        Кроки:
+        1. Вибір ознаки групування (автобус, маршрут, водій, період часу).
+        2. Делегування побудови звіту до методу travel_time_report класу analytic.
+        3. Виведення кількості рейсів, сумарного, середнього, мінімального, максимального часу
+           та перцентилів для кожної групи.
+        4. Повернення MenuResult без повідомлення.
+
+        Returns:
+            MenuResult без повідомлення.
+        """
+        try:
+            selected_group = get_object_from_suggested_options([group.value for group in ReportGroupEnum])
+        except ReturnMenu:
+            return MenuResult()
+
+        report = self.analytic.travel_time_report(ReportGroupEnum(selected_group))
+        if not report:
+            return MenuResult("[!] Жодного завершеного рейсу не відбувалось!")
+        for stats in report:
+            percentiles = ", ".join(f"p{percentile:g} - {timedelta_to_str(value)}" 
+                                    for percentile, value in stats.percentiles.items())
+            print(f"{stats.group} | рейсів - {stats.count} | всього - {timedelta_to_str(stats.total_time)} | "
+                  f"середній - {timedelta_to_str(stats.mean_time)} | мін. - {timedelta_to_str(stats.min_time)} | "
+                  f"макс. - {timedelta_to_str(stats.max_time)} | {percentiles}")
+        return MenuResult()
+            
+
+    @are_here_departures
+    def show_recent_route_stats(self):
+        """Відображає показники рейсів маршрутів у часових вікнах.
+
+        Кроки:
+        1. Отримання показників ковзного вікна (останні 15 хвилин) методом get_recent_route_stats класу analytic.
+        2. Отримання показників погодинних вікон методом get_periodic_route_stats класу analytic.
+        3. Виведення кількості відправлень, завершених рейсів та середнього часу у дорозі для кожного маршруту.
+        4. Повернення MenuResult без повідомлення.
+
+        Returns:
+            MenuResult без повідомлення.
+        """
+        print("\nЗа останні 15 хвилин:")
+        self._print_route_stats(self.analytic.get_recent_route_stats())
+        print("\nПогодинно:")
+        self._print_route_stats(self.analytic.get_periodic_route_stats())
+        return MenuResult()
+
+
+    @staticmethod
+    def _print_route_stats(route_stats: list):
+        if not route_stats:
+            print("Рейсів не було")
+        for stats in route_stats:
+            mean_time = timedelta_to_str(stats.mean_time) if stats.mean_time is not None else "-"
+            print(f"{stats.window_start:%H:%M}-{stats.window_end:%H:%M} | {stats.route} | "
+                  f"відправлень - {stats.started_count} | завершено - {stats.finished_count} | "
+                  f"середній час - {mean_time}")
+            
+
+    @are_here_routes
+    def schedule_departure(self):
+        """Додає щоденний рейс маршруту до розкладу.
+
+        Кроки:
+        1. Вибір маршруту за допомогою функції get_object_from_suggested_options.
+        2. Отримання часу відправлення від користувача (ГГ:ХХ) за допомогою функції input;
+           'в' - повернення до меню без змін.
+        3. Додавання рейсу за допомогою методу schedule_departure класу commands (делегування).
+            - Якщо час введено невірно, виведення повідомлення та повторення введення.
+            - Якщо маршрут тим часом видалено, повернення MenuResult з причиною.
+        4. Повернення MenuResult з повідомленням про додавання рейсу.
+
+        Returns:
+            MenuResult з повідомленням про додавання рейсу до розкладу, без повідомлення або з причиною відмови.
+        """
+        try:
+            selected_route = get_object_from_suggested_options(list(self.registry.routes.values()), search = self._search_routes)
+        except ReturnMenu:
+            return MenuResult()
+        while True:
+            departs_at = input("Час відправлення (ГГ:ХХ, 'в' - повернутись до меню): ").strip()
+            if departs_at == 'в':
+                return MenuResult()
+            try:
+                planned_departure = self.commands.schedule_departure(selected_route.id, departs_at)
+            except CommandRejected as ex:
+                if selected_route.id not in self.registry.routes:
+                    return MenuResult(str(ex))
+                print(f"\n\n{ex}")
+            else:
+                break
+        return MenuResult(f"Рейс '{planned_departure}' додано до розкладу!")
+
+
+    @are_here_planned_departures
+    def cancel_scheduled_departure(self):
+        """Видаляє обраний рейс з розкладу.
+
+        Кроки:
+        1. Вибір рейсу розкладу за допомогою функції get_object_from_suggested_options.
+        2. Видалення рейсу за допомогою методу cancel_scheduled_departure класу commands (делегування).
+        3. Повернення MenuResult з повідомленням про видалення рейсу.
+
+        Returns:
+            MenuResult з повідомленням про видалення рейсу з розкладу.
+        """
+        try:
+            selected_departure = get_object_from_suggested_options(self.registry.get_timetable())
+        except ReturnMenu:
+            return MenuResult()
+        try:
+            self.commands.cancel_scheduled_departure(selected_departure.id)
+        except CommandRejected as ex:
+            return MenuResult(str(ex))
+        return MenuResult("Рейс вдало видалено з розкладу!")
+
+
+    @are_here_planned_departures
+    def show_timetable(self):
+        """Відображає розклад рейсів та останні відправлення за розкладом.
+
+        Кроки:
+        1. Виведення рейсів розкладу, відсортованих за часом відправлення.
+        2. Виведення кількості відправлених та пропущених (немає вільного автобуса) рейсів.
+        3. Виведення останніх відправлень за розкладом.
+        4. Повернення MenuResult без повідомлення.
+
+        Returns:
+            MenuResult без повідомлення.
+        """
+        print('\n'.join(compose_objects_list_for_selection(self.registry.get_timetable())))
+        print(f"\nВідправлено за розкладом - {self.scheduler.dispatched_count}, "
+              f"пропущено - {self.scheduler.missed_count}")
+        for dispatch in self.commands.list_scheduled_dispatches()[:10]:
+            bus = dispatch.departure.bus.number if dispatch.departure else "-"
+            print(f"{dispatch.planned_time:%d.%m %H:%M} | {dispatch.planned_departure.route} | "
+                  f"{dispatch.status.value} | автобус {bus}")
+        return MenuResult()
+
+
+    @are_here_routes
+    def plan_route(self):
+        """Шукає шлях між містами мережею маршрутів та автобуси, якими його можна проїхати.
+
+        Кроки:
+        1. Вибір міста відправлення серед міст мережі маршрутів.
+        2. Вибір міста прибуття серед міст, досяжних з міста відправлення.
+        3. Вибір критерію: найменше пересадок або найменший середній час у дорозі.
+        4. Пошук шляху за допомогою методу plan_route класу analytic (делегування).
+        5. Виведення ділянок шляху з маршрутами, середнім часом та автобусами.
+        6. Повернення MenuResult без повідомлення.
+
+        Returns:
+            MenuResult без повідомлення.
+        """
+        try:
+            print("\n\nОберіть місто відправлення:")
+            start_point = get_object_from_suggested_options(self.commands.list_cities(),
+                                                            search = lambda query: self.registry.search_cities(query, PAGE_SIZE))
+            print("\n\nОберіть місто прибуття:")
+            reachable_cities = self.analytic.get_reachable_cities(start_point)
+            reachable = set(reachable_cities)
+            end_point = get_object_from_suggested_options(
+                reachable_cities,
+                search = lambda query: [city for city in self.registry.search_cities(query, PAGE_SIZE) if city in reachable]
+            )
+            selected_criterion = get_object_from_suggested_options([criterion.value for criterion in PlanCriterionEnum])
+        except ReturnMenu:
+            return MenuResult()
+
+        plan = self.analytic.plan_route(start_point, end_point, PlanCriterionEnum(selected_criterion))
+        for leg in plan.legs:
+            mean_time = timedelta_to_str(leg.mean_time) if leg.mean_time is not None else "-"
+            buses = ", ".join(bus.number for bus in leg.buses) or "немає автобусів"
+            print(f"{leg.start_point} - {leg.end_point} | {', '.join(str(route) for route in leg.routes)} | "
+                  f"середній час - {mean_time} | {buses}")
+        total_time = timedelta_to_str(plan.total_time) if plan.total_time is not None else "-"
+        print(f"Ітого - ділянок {len(plan.legs)}, час у дорозі - {total_time}")
+        return MenuResult()
+
+
+    def _find_bus(self, number: str, accept: Callable[[Bus], bool] | None = None) -> Bus | None:
+        """Повертає автобус за номером (O(1)), якщо він існує та задовольняє умову accept, інакше None."""
+        bus = self.registry.get_bus(number)
+        return bus if bus is not None and (accept is None or accept(bus)) else None
+
+
+    def _bus_lookups(self, accept: Callable[[Bus], bool] | None = None) -> dict:
+        """Повертає функції find та search для get_object_from_suggested_options: автобус за номером
+        та автобуси, знайдені пошуковим індексом реєстру за номером або водієм (лише ті, що задовольняють умову accept)."""
+        return {"find": lambda number: self._find_bus(number, accept),
+                "search": lambda query: self.registry.search_buses(query, PAGE_SIZE, accept)}
+
+
+    def _search_routes(self, query: str) -> list[Route]:
+        """Повертає маршрути, знайдені пошуковим індексом реєстру за назвою міста."""
+        return self.registry.search_routes(query, PAGE_SIZE)
+
+
+    def show_diagnostics(self):
+        """Відображає показники роботи станції (модуль metrics) та керує їх збором.
+
+        Кроки:
+        1. Виведення кількості викликів, середньої затримки, p50/p99 та кількості помилок для кожної операції.
+        2. Вибір дії: увімкнути або вимкнути збір показників, записати знімок показників
+           у файл METRICS_PATH у форматі Prometheus, очистити показники.
+        3. Повернення MenuResult з повідомленням про виконану дію.
+
+        Returns:
+            MenuResult з повідомленням про виконану дію.
+        """
+        print(f"\nЗбір показників {'увімкнено' if metrics.is_enabled() else 'вимкнено'}")
+        operations = metrics.get_operations()
+        if not operations:
+            print("Показників немає")
+        for name, operation in operations.items():
+            print(f"{name} | викликів - {operation.count} | "
+                  f"середня - {operation.total_ns / operation.count / 1e6:.3f} мс | "
+                  f"p50 <= {operation.quantile(0.5) * 1e3:g} мс | p99 <= {operation.quantile(0.99) * 1e3:g} мс | "
+                  f"помилок - {sum(operation.errors.values())} | відхилено - {operation.rejections}")
+
+        try:
+            selected_option = DIAGNOSTICS_OPTIONS.index(get_object_from_suggested_options(DIAGNOSTICS_OPTIONS))
+        except ReturnMenu:
+            return MenuResult()
+        if selected_option == 0:
+            metrics.enable()
+            return MenuResult("Збір показників увімкнено!")
+        if selected_option == 1:
+            metrics.disable()
+            return MenuResult("Збір показників вимкнено!")
+        if selected_option == 2:
+            with open(METRICS_PATH, "w", encoding = "utf-8") as file:
+                file.write(metrics.export_prometheus())
+            return MenuResult(f"Показники записано у файл '{METRICS_PATH}'!")
+        metrics.reset()
+        return MenuResult("Показники очищено!")
+
+
 if __name__ == "__main__":
-   AutoStation().show_menu()
\ No newline at end of file
+   station = AutoStation()
+   station.open_journal()
+   station.scheduler.start()
+   station.show_menu()
\ No newline at end of file
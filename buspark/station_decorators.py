@@ -1,3 +1,8 @@
+from signals import MenuResult
+from metrics import instrument_guard
+
+
+@instrument_guard
 def are_here_buses(func):
     def wrapper(self, *args, **kwargs):
         """
@@ -5,12 +10,13 @@ def are_here_buses(func):
 
         Якщо жодного автобусу немає, виводить повідомлення про створення нового автобусу.
         """
-        if not self.bus_list:
-            return self.show_menu('Жодного автобусу не існує, пропонуємо створити хоч якийсь!')
+        if not self.registry.buses:
+            return MenuResult('Жодного автобусу не існує, пропонуємо створити хоч якийсь!')
         return func(self, *args, **kwargs)
     return wrapper
 
 
+@instrument_guard
 def are_here_buses_tied_to_route(func):
     def wrapper(self, *args, **kwargs):
         """
@@ -19,12 +25,13 @@ def are_here_buses_tied_to_route(func):
 
         Якщо жодного автобусу немає, виводить повідомлення про створення нового автобусу.
         """
-        if not self.analytic.get_buses_tied_to_route(self.bus_list):
-            return self.show_menu("[!] Жодного автобусу з прив'язаним маршрутом не існує!")
+        if not self.registry.has_routed_buses():
+            return MenuResult("[!] Жодного автобусу з прив'язаним маршрутом не існує!")
         return func(self, *args, **kwargs)
     return wrapper
 
 
+@instrument_guard
 def are_here_free_buses(func):
     def wrapper(self, *args, **kwargs):
         """
@@ -33,13 +40,13 @@ def are_here_free_buses(func):
 
         Якщо жодного автобусу немає, виводить повідомлення про створення нового автобусу.
         """
-        if not self.analytic.get_not_departed_buses(self.departure_list, 
-                                                    self.analytic.get_buses_tied_to_route(self.bus_list)):
-            return self.show_menu("[!] Усі автобуси у дорозі, вільних немає!")
+        if not self.registry.has_ready_buses():
+            return MenuResult("[!] Усі автобуси у дорозі, вільних немає!")
         return func(self, *args, **kwargs)
     return wrapper
 
 
+@instrument_guard
 def are_here_routes(func):
     def wrapper(self, *args, **kwargs):
         """
@@ -47,12 +54,13 @@ def are_here_routes(func):
 
         Якщо жодного маршруту немає, виводить повідомлення про створення нового маршруту.
         """
-        if not self.route_list:
-            return self.show_menu('Жодного маршруту не існує, пропонуємо створити хоч якийсь!')
+        if not self.registry.routes:
+            return MenuResult('Жодного маршруту не існує, пропонуємо створити хоч якийсь!')
         return func(self, *args, **kwargs)
     return wrapper
 
 
+@instrument_guard
 def are_here_departed_buses(func):
     def wrapper(self, *args, **kwargs):
         """
@@ -60,12 +68,13 @@ def are_here_departed_buses(func):
 
         Якщо жодного активного відправлення немає, виводить повідомлення про відсутність автобусів у дорозі.
         """
-        if not self.analytic.get_active_departures(self.departure_list):
-            return self.show_menu("[!] Автобуси у дорозі відсутні!")
+        if not self.registry.has_active_departures():
+            return MenuResult("[!] Автобуси у дорозі відсутні!")
         return func(self, *args, **kwargs)
     return wrapper
 
 
+@instrument_guard
 def are_here_departures(func):
     def wrapper(self, *args, **kwargs):
         """
@@ -73,7 +82,21 @@ def are_here_departures(func):
 
         Якщо жодного відправлення немає, виводить повідомлення про відсутність автобусів у дорозі.
         """
-        if not self.departure_list:
-            return self.show_menu("[!] Жодного відправлення не відбувалось!")
+        if not self.registry.total_trips:
+            return MenuResult("[!] Жодного відправлення не відбувалось!")
+        return func(self, *args, **kwargs)
+    return wrapper
+
+
+@instrument_guard
+def are_here_planned_departures(func):
+    def wrapper(self, *args, **kwargs):
+        """
+        Декоратор класу AutoStation, який перевіряє наявність рейсів у розкладі перед викликом функції.
+
+        Якщо розклад порожній, виводить повідомлення про відсутність рейсів у розкладі.
+        """
+        if not self.registry.has_planned_departures():
+            return MenuResult("[!] Розклад рейсів порожній!")
         return func(self, *args, **kwargs)
     return wrapper
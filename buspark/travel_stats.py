@@ -0,0 +1,135 @@
+from array import array
+from math import floor
+from typing import (NamedTuple,
+                    Sequence)
+
+try:
+    import numpy as np
+except ImportError:
+    np = None
+
+
+class GroupStats(NamedTuple):
+    """Статистика часу у дорозі (у мікросекундах) для однієї групи рейсів."""
+    key: int
+    count: int
+    total: int
+    minimum: int
+    maximum: int
+    percentiles: dict[float, float]
+
+
+def group_travel_times(keys: array,
+                       departure_times: array,
+                       arrival_times: array,
+                       percentiles: Sequence[float] = (50, 90, 99)) -> list[GroupStats]:
+    """Групує рейси за ключем та рахує статистику часу у дорозі для кожної групи.
+
+    Якщо встановлено NumPy, групування виконується векторизовано за один прохід
+    (одне сортування за групою та часом, після чого суми рахуються через reduceat,
+    а мінімуми, максимуми та перцентилі - за індексами у межах груп).
+    Інакше використовується реалізація на чистому Python з тим самим результатом.
+
+    Параметри:
+        keys (array): Ключ групи для кожного рейсу (array('q') або інша послідовність int).
+        departure_times (array): Час відправлення у мікросекундах.
+        arrival_times (array): Час прибуття у мікросекундах.
+        percentiles (Sequence[float]): Перцентилі (0-100), які потрібно порахувати.
+
+    Returns:
+        list[GroupStats]: Статистика груп, відсортована за ключем.
+    """
+    if not len(keys):
+        return []
+    if np is not None:
+        return _group_with_numpy(keys, departure_times, arrival_times, percentiles)
+    return _group_with_python(keys, departure_times, arrival_times, percentiles)
+
+
+def remap_keys(keys: array, mapping: dict[int, int]) -> array:
+    """Замінює кожен ключ відповідним значенням зі словника mapping (наприклад, автобус -> водій)."""
+    if np is not None and mapping:
+        lookup = np.zeros(max(mapping) + 1, dtype = np.int64)
+        lookup[list(mapping)] = list(mapping.values())
+        return array('q', lookup[_as_numpy(keys)].tobytes())
+    return array('q', (mapping[key] for key in keys))
+
+
+def bucket_keys(times: array, bucket: int) -> array:
+    """Повертає початок часового інтервалу розміром bucket для кожного часу (у мікросекундах)."""
+    if np is not None:
+        numpy_times = _as_numpy(times)
+        return array('q', (numpy_times - numpy_times % bucket).tobytes())
+    return array('q', (time - time % bucket for time in times))
+
+
+def _as_numpy(column: array):
+    if isinstance(column, array):
+        return np.frombuffer(column, dtype = np.int64)
+    return np.asarray(column, dtype = np.int64)
+
+
+def _dense_keys(keys):
+    low, high = int(keys.min()), int(keys.max())
+    if high - low <= 4 * len(keys):
+        present = np.zeros(high - low + 1, dtype = bool)
+        present[keys - low] = True
+        return np.flatnonzero(present) + low, (np.cumsum(present) - 1)[keys - low]
+    return np.unique(keys, return_inverse = True)
+
+
+def _group_with_numpy(keys, departure_times, arrival_times, percentiles) -> list[GroupStats]:
+    unique_keys, groups = _dense_keys(_as_numpy(keys))
+    durations = _as_numpy(arrival_times) - _as_numpy(departure_times)
+
+    # Номер групи та тривалість пакуються в одне int64, тож одне сортування впорядковує
+    # рейси за групою, а всередині групи - за тривалістю (значно швидше за np.lexsort).
+    shift = int(durations.max()).bit_length()
+    if durations.min() >= 0 and shift + len(unique_keys).bit_length() <= 62:
+        packed = (groups << shift) | durations
+        packed.sort()
+        groups, durations = packed >> shift, packed & ((1 << shift) - 1)
+    else:
+        order = np.lexsort((durations, groups))
+        groups, durations = groups[order], durations[order]
+
+    starts = np.flatnonzero(np.r_[True, groups[1:] != groups[:-1]])
+    counts = np.diff(np.r_[starts, len(groups)])
+    totals = np.add.reduceat(durations, starts)
+    minimums = durations[starts]
+    maximums = durations[starts + counts - 1]
+
+    percentile_values = {}
+    for percentile in percentiles:
+        positions = (counts - 1) * (percentile / 100)
+        lower = np.floor(positions).astype(np.int64)
+        upper = np.minimum(lower + 1, counts - 1)
+        fraction = positions - lower
+        low_values = durations[starts + lower]
+        percentile_values[percentile] = low_values + (durations[starts + upper] - low_values) * fraction
+
+    return [
+        GroupStats(int(key), int(count), int(total), int(minimum), int(maximum),
+                   {percentile: float(values[index]) for percentile, values in percentile_values.items()})
+        for index, (key, count, total, minimum, maximum)
+        in enumerate(zip(unique_keys[groups[starts]], counts, totals, minimums, maximums))
+    ]
+
+
+def _group_with_python(keys, departure_times, arrival_times, percentiles) -> list[GroupStats]:
+    groups: dict[int, list[int]] = {}
+    for key, departure_time, arrival_time in zip(keys, departure_times, arrival_times):
+        groups.setdefault(key, []).append(arrival_time - departure_time)
+
+    results = []
+    for key in sorted(groups):
+        durations = sorted(groups[key])
+        count = len(durations)
+        percentile_values = {}
+        for percentile in percentiles:
+            position = (count - 1) * (percentile / 100)
+            lower = floor(position)
+            upper = min(lower + 1, count - 1)
+            percentile_values[percentile] = float(durations[lower] + (durations[upper] - durations[lower]) * (position - lower))
+        results.append(GroupStats(key, count, sum(durations), durations[0], durations[-1], percentile_values))
+    return results
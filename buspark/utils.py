@@ -1,20 +1,40 @@
+from heapq import nsmallest
+from operator import attrgetter
+from typing import (Callable,
+                    Iterable,
+                    Sequence)
+
 from models import (Bus,
-                    Route,
-                    Departure)
+                    Route)
 from signals import ReturnMenu
 
 
-def get_object_from_suggested_options(objects: list[Bus | Route]) -> Bus | Route:
+PAGE_SIZE = 20
+PAGE_HINT = "Enter - наступна сторінка, '-' - попередня сторінка"
+FIND_HINT = "'#номер' - перейти до автобуса"
+SEARCH_HINT = "'?текст' - пошук (без тексту - весь список)"
+FILTER_HINT = "'/початок номера' та '@водій' - фільтри (без тексту - скасувати)"
+
+
+def get_object_from_suggested_options(objects: Sequence[Bus | Route],
+                                      find: Callable[[str], Bus | Route | None] | None = None,
+                                      search: Callable[[str], Sequence[Bus | Route]] | None = None) -> Bus | Route:
         """
         Метод для отримання обраного об'єкта зі списку.
 
         Приймає список об'єктів `objects`, з якого користувач має обрати один об'єкт.
-        Виводиться список об'єктів для вибору. Після вибору, перевіряється чи обрана опція
-        є в списку валідних опцій. Якщо обрана опція є останньою (повернення до меню),
-        викликається виняток ReturnMenu. В іншому випадку, повертається обраний об'єкт.
+        Виводиться сторінка списку (PAGE_SIZE об'єктів) - форматуються лише об'єкти цієї сторінки.
+        Після вибору, перевіряється чи обрана опція є в списку валідних опцій (якщо ні - вибір повторюється).
+        Якщо обрана опція є останньою (повернення до меню), викликається виняток ReturnMenu.
+        В іншому випадку, повертається обраний об'єкт.
+        Якщо об'єктів більше за PAGE_SIZE, Enter та '-' перемикають сторінки. Якщо передано функцію find,
+        '#номер' одразу повертає знайдений нею об'єкт (без перегляду списку). Якщо передано функцію search,
+        '?текст' замінює список знайденими нею об'єктами, а '?' без тексту повертає весь список.
 
         Параметри:
-        - objects (list[Bus | Route]): Список об'єктів для вибору.
+        - objects (Sequence[Bus | Route]): Список об'єктів для вибору.
+        - find (Callable[[str], Bus | Route | None] | None): Пошук допустимого об'єкта за номером.
+        - search (Callable[[str], Sequence[Bus | Route]] | None): Пошук допустимих об'єктів за текстом.
 
         Повертає:
         - Bus | Route: Обраний об'єкт.
@@ -22,73 +42,147 @@ def get_object_from_suggested_options(objects: list[Bus | Route]) -> Bus | Route
         Викидає:
         - ReturnMenu: Якщо обрана опція - повернення до меню.
         """
-        options = compose_objects_list_for_selection(objects)
-        options.append(f'[{len(options)}] - повернутись до меню: ')
-
-        try:
-            selected_option = int(input('\n'.join(options)) + '\n\n')
-        except ValueError:
-            print('\n\n [!] Введено не цифру/число!')
-            return get_object_from_suggested_options(objects)
-        else:
-            if is_answer_existent(options, selected_option):
-                if selected_option == range(len(options))[-1]:
-                    raise ReturnMenu()
-                selected_object = objects[selected_option]
-                return selected_object
-            else:
+        options = objects
+        cursor = 0
+        hints = [hint for hint, enabled in ((FIND_HINT, find), (SEARCH_HINT, search)) if enabled is not None]
+
+        while True:
+            page = options[cursor:cursor + PAGE_SIZE]
+            next_cursor = cursor + PAGE_SIZE if cursor + PAGE_SIZE < len(options) else None
+            lines = compose_objects_list_for_selection(page, cursor)
+            lines.append(f'[{len(options)}] - повернутись до меню: ')
+            answer = input('\n'.join(([PAGE_HINT] if len(options) > PAGE_SIZE else []) + hints + lines) + '\n\n').strip()
+
+            if answer == '' and len(options) > PAGE_SIZE:
+                cursor = next_cursor if next_cursor is not None else 0
+                continue
+            if answer == '-' and len(options) > PAGE_SIZE:
+                cursor = max(cursor - PAGE_SIZE, 0)
+                continue
+            if answer.startswith('#') and find is not None:
+                found = find(answer[1:].strip())
+                if found is not None:
+                    return found
+                print(f"\n\n [!] Серед запропонованих немає автобуса з номером '{answer[1:].strip()}'!")
+                continue
+            if answer.startswith('?') and search is not None:
+                query = answer[1:].strip()
+                options, cursor = (search(query) if query else objects), 0
+                if not options:
+                    print(f"\n\n [!] За запитом '{query}' нічого не знайдено!")
+                    options = objects
+                continue
+            try:
+                selected_option = int(answer)
+            except ValueError:
+                print('\n\n [!] Введено не цифру/число!')
+                continue
+
+            if selected_option not in range(len(options) + 1):
                 print("\n\n [!] Обрана неіснуюча опція :(")
-                return get_object_from_suggested_options(objects)
-            
+                continue
+            if selected_option == len(options):
+                raise ReturnMenu()
+            return options[selected_option]
 
-def get_bus_active_departure(bus: Bus, active_departures: list[Departure]) -> Departure | None:
-    """Повертає активний рейс автобуса.
+
+def get_page(objects: Iterable, after: object | None = None,
+             key: Callable[[object], object] = attrgetter("number"),
+             page_size: int = PAGE_SIZE) -> tuple[list, object | None]:
+    """Повертає сторінку об'єктів з ключами, більшими за курсор after, та курсор наступної сторінки.
+
+    Курсор - ключ останнього об'єкта сторінки (пагінація за ключем), тому об'єкти, додані чи видалені
+    перед курсором під час перегляду, не зсувають наступну сторінку: вона продовжується одразу після
+    останнього показаного об'єкта. Об'єкти сторінки впорядковані за ключем незалежно від порядку джерела;
+    об'єкти (генератор) читаються один раз, а в пам'яті зберігаються лише page_size + 1 найменших.
 
     Параметри:
-        bus (Bus): Автобус.
-        active_departures (list[Departure]): Список активних рейсів.
+        objects (Iterable): Об'єкти (список або генератор).
+        after (object | None): Ключ останнього об'єкта попередньої сторінки (None - перша сторінка).
+        key (Callable[[object], object]): Унікальний ключ об'єкта (за замовчуванням - номер автобуса).
+        page_size (int): Кількість об'єктів на сторінці.
 
     Returns:
-        Departure | None: Об'єкт рейсу, в якому знаходиться автобус, або None, якщо автобус не знаходиться у жодному активному рейсі.
+        tuple[list, object | None]: Об'єкти сторінки та курсор наступної сторінки (None - сторінка остання).
     """
-    bus_departure: tuple[Departure] = next(
-        filter(lambda departure: departure.bus == bus, active_departures),
-        None
-    )
-    return bus_departure    
-
-def get_route_buses(route: Route, bus_list: list[Bus]) -> list[Bus]:
-    """Повертає список автобусів, які обслуговують заданий маршрут.
+    if after is not None:
+        objects = (item for item in objects if key(item) > after)
+    page = nsmallest(page_size + 1, objects, key = key)
+    return page[:page_size], (key(page[page_size - 1]) if len(page) > page_size else None)
+
+
+def browse_pages(source: Callable[..., Iterable],
+                 render: Callable[[object], str] = str,
+                 find: Callable[[str], object | None] | None = None,
+                 key: Callable[[object], object] = attrgetter("number"),
+                 page_size: int = PAGE_SIZE):
+    """Відображає об'єкти посторінково (у порядку ключа key, див. get_page) до виходу користувача.
+
+    Форматується (функцією render) лише видима сторінка. Об'єкти отримуються з генератора,
+    який створює source(number_prefix = ..., driver = ...) з поточними фільтрами, тому
+    відфільтровані об'єкти не збираються у список. Сторінки запам'ятовуються курсорами (ключами),
+    тож зміни списку під час перегляду не пропускають і не повторюють об'єкти. Команди:
+    Enter - наступна сторінка (на останній сторінці - вихід), '-' - попередня сторінка,
+    '/початок номера' та '@водій' - фільтри, '#номер' - об'єкт за номером (функцією find), 'в' - вихід.
 
     Параметри:
-        route (Route): Маршрут.
-        bus_list (list[Bus]): Список автобусів.
-
-    Returns:
-        list[Bus]: Список автобусів, які обслуговують заданий маршрут.
+        source (Callable[..., Iterable]): Створює об'єкти з урахуванням фільтрів number_prefix та driver.
+        render (Callable[[object], str]): Форматує об'єкт для відображення.
+        find (Callable[[str], object | None] | None): Пошук об'єкта за номером автобуса.
+        key (Callable[[object], object]): Унікальний ключ об'єкта, за яким впорядковуються сторінки.
+        page_size (int): Кількість об'єктів на сторінці.
     """
-    return list(
-        filter(lambda bus: bus.route is route, bus_list)
-    )
-        
+    filters = {"number_prefix": None, "driver": None}
+    hints = [PAGE_HINT, FILTER_HINT] + ([FIND_HINT] if find is not None else []) + ["'в' - повернутись до меню"]
+    # Курсори початку переглянутих сторінок: останній - курсор поточної сторінки.
+    cursors = [None]
+    while True:
+        page, next_cursor = get_page(source(**filters), cursors[-1], key, page_size)
+        if not page:
+            print("[!] Нічого не знайдено")
+        for index, item in enumerate(page, (len(cursors) - 1) * page_size + 1):
+            print(f"[{index}] - {render(item)}")
+
+        answer = input('\n'.join([''] + hints) + '\n\n').strip()
+        if answer == '':
+            if next_cursor is None:
+                return
+            cursors.append(next_cursor)
+        elif answer == '-':
+            if len(cursors) > 1:
+                cursors.pop()
+        elif answer[0] in '/@':
+            filters["number_prefix" if answer[0] == '/' else "driver"] = answer[1:].strip() or None
+            cursors = [None]
+        elif answer[0] == '#' and find is not None:
+            found = find(answer[1:].strip())
+            print(render(found) if found is not None else f"[!] Автобус з номером '{answer[1:].strip()}' не знайдено!")
+        elif answer == 'в':
+            return
+        else:
+            print("[!] Невідома команда :(")
+
 
-def compose_objects_list_for_selection(objects: list[Bus | Route]) -> list[str]:
+def compose_objects_list_for_selection(objects: Iterable[Bus | Route], start: int = 0) -> list[str]:
     """Створює список рядків для вибору об'єктів.
 
+    Форматуються лише передані об'єкти (наприклад, сторінка списку); номери опцій починаються з start.
+
     Параметри:
-        objects (list[Bus | Route]): Список об'єктів.
+        objects (Iterable[Bus | Route]): Об'єкти.
+        start (int): Номер першої опції.
 
     Returns:
         list[str]: Список рядків для вибору об'єктів.
     """
     options = []
-    for option_index, object in enumerate(objects):
+    for option_index, object in enumerate(objects, start):
         options.append(
             f"[{option_index}] - {object}"
         )
     return options
-            
-    
+
+
 def is_answer_existent(options: list[str], selected_option: int) -> bool:
     """Перевіряє, чи існує вибраний варіант в списку.
 
@@ -102,4 +196,4 @@ def is_answer_existent(options: list[str], selected_option: int) -> bool:
     options_range = range(len(options))
     if selected_option in options_range:
         return True
-    return False
\ No newline at end of file
+    return False
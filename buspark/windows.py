@@ -0,0 +1,213 @@
+from collections import deque
+from datetime import timedelta
+
+
+class WindowTotals:
+    """Накопичені показники рейсів одного маршруту у часовому вікні (час у мікросекундах)."""
+
+    __slots__ = ("started", "finished", "travel_time")
+
+    def __init__(self, started: int = 0, finished: int = 0, travel_time: int = 0):
+        self.started = started
+        self.finished = finished
+        self.travel_time = travel_time
+
+
+    def add(self, other: "WindowTotals", sign: int = 1):
+        self.started += sign * other.started
+        self.finished += sign * other.finished
+        self.travel_time += sign * other.travel_time
+
+
+def _add_start(window: dict[int, WindowTotals], route_key: int):
+    totals = window.get(route_key)
+    if totals is None:
+        totals = window[route_key] = WindowTotals()
+    totals.started += 1
+
+
+def _add_finish(window: dict[int, WindowTotals], route_key: int, travel_time: int):
+    totals = window.get(route_key)
+    if totals is None:
+        totals = window[route_key] = WindowTotals()
+    totals.finished += 1
+    totals.travel_time += travel_time
+
+
+def _late_window(windows: deque[tuple[int, dict[int, WindowTotals]]],
+                 start: int,
+                 oldest_start: int) -> dict[int, WindowTotals] | None:
+    # Подія, що надійшла із запізненням, потрапляє у своє вікно; якщо вікна ще немає, воно вставляється
+    # на своє місце за часом початку. Відкидаються лише події, старші за найстаріше вікно, що зберігається.
+    if start < oldest_start:
+        return None
+    position = len(windows)
+    for window_start, window in reversed(windows):
+        if window_start == start:
+            return window
+        if window_start < start:
+            break
+        position -= 1
+    window = {}
+    windows.insert(position, (start, window))
+    return window
+
+
+class TumblingWindows:
+    """
+    Клас TumblingWindows - послідовні вікна фіксованого розміру (наприклад, погодинні),
+    що не перекриваються. Кожне вікно містить показники рейсів за маршрутами.
+
+    Зберігається не більше retention останніх вікон, старіші вікна відкидаються,
+    тож пам'ять залежить лише від retention та кількості маршрутів, а не від історії рейсів.
+    Час вказується у мікросекундах від початку епохи.
+    """
+
+    def __init__(self, size: timedelta, retention: int):
+        self.size = size // timedelta(microseconds = 1)
+        self.retention = retention
+        self._windows: deque[tuple[int, dict[int, WindowTotals]]] = deque()
+
+
+    def record_start(self, route_key: int, at: int):
+        """Враховує відправлення у рейс у вікні, до якого належить час at."""
+        window = self._window(at)
+        if window is not None:
+            _add_start(window, route_key)
+
+
+    def record_finish(self, route_key: int, departure_time: int, arrival_time: int):
+        """Враховує завершений рейс у вікні, до якого належить час прибуття."""
+        window = self._window(arrival_time)
+        if window is not None:
+            _add_finish(window, route_key, arrival_time - departure_time)
+
+
+    def windows(self, now: int) -> list[tuple[int, dict[int, WindowTotals]]]:
+        """Повертає збережені вікна (час початку та показники за ключами маршрутів), від старішого до новішого.
+
+        Параметри:
+            now (int): Поточний час; вікна, що вийшли за межі retention відносно нього, відкидаються.
+        """
+        self._expire(now - now % self.size)
+        return list(self._windows)
+
+
+    def route_keys(self) -> set[int]:
+        """Повертає ключі маршрутів, показники яких містять збережені вікна."""
+        return {route_key for _, window in self._windows for route_key in window}
+
+
+    def _window(self, at: int) -> dict[int, WindowTotals] | None:
+        start = at - at % self.size
+        if not self._windows or start > self._windows[-1][0]:
+            self._windows.append((start, {}))
+            self._expire(start)
+            return self._windows[-1][1]
+        return _late_window(self._windows, start, self._windows[-1][0] - (self.retention - 1) * self.size)
+
+
+    def _expire(self, latest_start: int):
+        oldest_start = latest_start - (self.retention - 1) * self.size
+        while self._windows and self._windows[0][0] < oldest_start:
+            self._windows.popleft()
+
+
+class SlidingWindow:
+    """
+    Клас SlidingWindow - ковзне вікно заданої довжини (наприклад, останні 15 хвилин).
+
+    Вікно складається з проміжків розміром resolution. Для кожного маршруту підтримуються
+    поточні суми за всі проміжки вікна: нова подія додається до сум, а проміжок, що виходить
+    за межі вікна, віднімається. Тому запит показників не переглядає події,
+    а пам'ять обмежена кількістю проміжків (length / resolution) та маршрутів.
+    Час вказується у мікросекундах від початку епохи.
+    """
+
+    def __init__(self, length: timedelta, resolution: timedelta):
+        self.length = length // timedelta(microseconds = 1)
+        self.resolution = resolution // timedelta(microseconds = 1)
+        self._slots: deque[tuple[int, dict[int, WindowTotals]]] = deque()
+        self._totals: dict[int, WindowTotals] = {}
+
+
+    def record_start(self, route_key: int, at: int):
+        """Враховує відправлення у рейс, якщо час at потрапляє у вікно."""
+        slot = self._slot(at)
+        if slot is not None:
+            _add_start(slot, route_key)
+            _add_start(self._totals, route_key)
+
+
+    def record_finish(self, route_key: int, departure_time: int, arrival_time: int):
+        """Враховує завершений рейс, якщо час прибуття потрапляє у вікно."""
+        slot = self._slot(arrival_time)
+        if slot is not None:
+            _add_finish(slot, route_key, arrival_time - departure_time)
+            _add_finish(self._totals, route_key, arrival_time - departure_time)
+
+
+    def totals(self, now: int) -> dict[int, WindowTotals]:
+        """Повертає показники за ключами маршрутів у вікні, що закінчується часом now."""
+        self._expire(now - now % self.resolution)
+        return {route_key: WindowTotals(totals.started, totals.finished, totals.travel_time)
+                for route_key, totals in self._totals.items()}
+
+
+    def route_keys(self) -> set[int]:
+        """Повертає ключі маршрутів, показники яких містить вікно."""
+        return set(self._totals)
+
+
+    def _slot(self, at: int) -> dict[int, WindowTotals] | None:
+        start = at - at % self.resolution
+        if not self._slots or start > self._slots[-1][0]:
+            self._expire(start)
+            self._slots.append((start, {}))
+            return self._slots[-1][1]
+        return _late_window(self._slots, start, self._slots[-1][0] - self.length + self.resolution)
+
+
+    def _expire(self, latest_start: int):
+        oldest_start = latest_start - self.length + self.resolution
+        while self._slots and self._slots[0][0] < oldest_start:
+            for route_key, totals in self._slots.popleft()[1].items():
+                route_totals = self._totals[route_key]
+                route_totals.add(totals, -1)
+                if not route_totals.started and not route_totals.finished:
+                    del self._totals[route_key]
+
+
+class DepartureWindows:
+    """
+    Клас DepartureWindows - потокова аналітика рейсів у часових вікнах.
+    Належить реєстру FleetRegistry, який передає у нього кожне відправлення та повернення автобуса.
+
+    Містить погодинні вікна (TumblingWindows) за останню добу
+    та ковзне вікно (SlidingWindow) за останні 15 хвилин з кроком у хвилину.
+    """
+
+    def __init__(self,
+                 tumbling_size: timedelta = timedelta(hours = 1),
+                 tumbling_retention: int = 24,
+                 sliding_length: timedelta = timedelta(minutes = 15),
+                 sliding_resolution: timedelta = timedelta(minutes = 1)):
+        self.tumbling = TumblingWindows(tumbling_size, tumbling_retention)
+        self.sliding = SlidingWindow(sliding_length, sliding_resolution)
+
+
+    def record_start(self, route_key: int, at: int):
+        """Враховує відправлення у рейс маршруту route_key у момент at (мікросекунди)."""
+        self.tumbling.record_start(route_key, at)
+        self.sliding.record_start(route_key, at)
+
+
+    def record_finish(self, route_key: int, departure_time: int, arrival_time: int):
+        """Враховує завершений рейс маршруту route_key (час у мікросекундах)."""
+        self.tumbling.record_finish(route_key, departure_time, arrival_time)
+        self.sliding.record_finish(route_key, departure_time, arrival_time)
+
+
+    def route_keys(self) -> set[int]:
+        """Повертає ключі маршрутів, показники яких містять вікна."""
+        return self.tumbling.route_keys() | self.sliding.route_keys()
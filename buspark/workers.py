@@ -1,4 +1,7 @@
-from datetime import timedelta
+from datetime import (datetime,
+                      timedelta)
+from typing import (Iterable,
+                    Iterator)
 
 from models import (City,
                     Driver,
@@ -7,361 +10,687 @@ from models import (City,
                     Route,
                     Departure,
                     BusStatusEnum,
-                    BusDepartureResults)
-from utils import (get_object_from_suggested_options,
-                   get_bus_active_departure,
-                   get_route_buses)
-from signals import (ReturnMenu,
-                     SameRouteSelected,
-                     RouteChangedDuringDeparture,
-                     RouteSet)
+                    DepartureRecord,
+                    BusDepartureResults,
+                    BusDepartureSummary,
+                    ReportGroupEnum,
+                    TravelTimeStats,
+                    RouteWindowStats,
+                    PlanCriterionEnum,
+                    PartitionEnum,
+                    RoutePlanLeg,
+                    RoutePlan)
+from registry import FleetRegistry
+from history import (to_microseconds,
+                     from_microseconds)
+from windows import WindowTotals
+from metrics import instrument_methods
+from search_index import SEARCH_LIMIT
+from clock import (current_time,
+                   current_ns,
+                   ns_to_timedelta)
+from parallel_analytics import (ANALYTICS_WORKERS,
+                                PARALLEL_MIN_ROWS,
+                                aggregate_bus_totals,
+                                aggregate_in_processes)
+from travel_stats import (group_travel_times,
+                          remap_keys,
+                          bucket_keys)
+from signals import (SameRouteSelected,
+                     CommandRejected)
+
+
+# Середній час маршрутів для пошуку найшвидшого шляху оновлюється кожні ROUTE_TIMES_REFRESH відправлень;
+# маршрутам без завершених рейсів в історії призначається DEFAULT_ROUTE_TIME.
+ROUTE_TIMES_REFRESH = 1_000
+DEFAULT_ROUTE_TIME = timedelta(hours = 1)
+
+
+def filter_buses(buses: Iterable[Bus],
+                 route: Route | None = None,
+                 driver: str | None = None,
+                 status: BusStatusEnum | None = None,
+                 number_prefix: str | None = None) -> Iterator[Bus]:
+    """Повертає генератор автобусів, що відповідають усім заданим умовам (None - умова не перевіряється).
+
+    Параметри:
+        buses (Iterable[Bus]): Автобуси.
+        route (Route | None): Маршрут автобуса.
+        driver (str | None): Частина імені та прізвища водія (без урахування регістру).
+        status (BusStatusEnum | None): Статус автобуса.
+        number_prefix (str | None): Початок номера автобуса.
+    """
+    driver = driver.casefold() if driver else None
+    for bus in buses:
+        if route is not None and bus.route != route:
+            continue
+        if status is not None and bus.status is not status:
+            continue
+        if number_prefix and not bus.number.startswith(number_prefix):
+            continue
+        if driver and driver not in f"{bus.driver.first_name} {bus.driver.second_name}".casefold():
+            continue
+        yield bus
+
+
+@instrument_methods("dispatcher")
+class Dispatcher:
+    def __init__(self, registry: FleetRegistry):
+        self.registry = registry
 
 
-class Dispatcher:
-    def depart_bus(self, not_departed_buses: list[Bus]) -> tuple[Bus, Departure]:
-        """Відправляє обраний автобус у рейс.
+    def depart_bus(self, bus: Bus) -> Departure:
+        """Відправляє автобус у рейс.
 
         Параметри:
-            not_departed_buses (list[Bus]): Список невідправлених автобусів.
+            bus (Bus): Автобус, який відправляється.
 
         Кроки:
-        1. Отримання обраний автобус зі списку невідправлених автобусів за допомогою функції get_object_from_suggested_options.
-        2. Створення рейсу за допомогою створення об'єкту Departure з обраним автобусом та його маршрутом.
+        1. Під блокуванням автобуса (lock_bus реєстру) - перевірка, що автобус прив'язаний до маршруту
+           та не знаходиться у дорозі, тому два термінали не можуть відправити автобус двічі.
+        2. Створення рейсу за допомогою створення об'єкту Departure з автобусом та його маршрутом.
         3. Видалення автобуса з парку за допомогою виклику методу remove_bus класу Park.
         4. Запуск рейсу за допомогою виклику методу start_travel об'єкту Departure.
-        5. Зміна статусу обраного автобуса на "У русі" (BusStatusEnum.ON_THE_ROAD).
-        6. Повернення обраного автобуса та рейсу як результат функції.
+        5. Реєстрація рейсу у реєстрі, що змінює статус автобуса на "У дорозі" (BusStatusEnum.ON_THE_ROAD).
+        6. Повернення рейсу як результат функції.
 
         Returns:
-            Tuple[Bus, Departure]: Кортеж з обраним автобусом та рейсом.
+            Departure: Розпочатий рейс.
         
         Raises:
-            ReturnMenu: Виключення, яке сигналізує про повернення до головного меню.
+            CommandRejected: Автобус не має маршруту або вже знаходиться у дорозі.
         """
-        try:
-            selected_bus = get_object_from_suggested_options(not_departed_buses)
-        except ReturnMenu:
-            raise ReturnMenu()
-        else:
-            departure = Departure(bus = selected_bus, route = selected_bus.route)
-            Park().remove_bus(selected_bus)
+        with self.registry.lock_bus(bus):
+            if bus.route is None:
+                raise CommandRejected(f"[!] {bus} не має маршруту!")
+            if self.registry.get_bus_active_departure(bus):
+                raise CommandRejected(f"[!] {bus} вже у дорозі!")
+            departure = Departure(bus = bus, route = bus.route)
+            Park().remove_bus(bus)
             departure.start_travel()
-            selected_bus.status = BusStatusEnum.ON_THE_ROAD
-            return selected_bus, departure
+            self.registry.open_departure(bus, departure)
+        return departure
     
     
-    def return_bus_to_park(self, active_departures: list[Departure]) -> Bus:
-        """Повертає обраний автобус у парк.
+    def return_bus_to_park(self, bus: Bus) -> Departure:
+        """Повертає автобус у парк.
 
         Параметри:
-            active_departures (list[Departure]): Список активних рейсів.
+            bus (Bus): Автобус, який повертається.
 
         Кроки:
-        1. Отримання обраного автобуса зі списку автобусів, що знаходяться у активних рейсах, за допомогою функції get_object_from_suggested_options.
-        2. Отримання активного рейсу обраного автобуса за допомогою функції get_bus_active_departure.
-        3. Завершення активного рейсу за допомогою виклику методу finish_travel об'єкту активного рейсу.
-        4. Додавання автобуса у парк за допомогою виклику методу add_bus класу Park.
-        5. Зміна статусу обраного автобуса на "У парку" (BusStatusEnum.IN_THE_PARKING).
-        6. Повернення обраного автобуса.
+        1. Під блокуванням автобуса (lock_bus реєстру) - завершення активного рейсу автобуса за допомогою
+           методу close_departure реєстру, що змінює статус автобуса на "У парку" (BusStatusEnum.IN_THE_PARKING).
+        2. Додавання автобуса у парк за допомогою виклику методу add_bus класу Park.
+        3. Повернення завершеного рейсу.
 
         Returns:
-            Bus: Обраний автобус для повернення у парк.
+            Departure: Завершений рейс.
 
         Raises:
-            ReturnMenu: Виключення, яке сигналізує про повернення до головного меню.
+            CommandRejected: Автобус не знаходиться у дорозі.
         """
-        try:
-            selected_bus = get_object_from_suggested_options([departure.bus for departure in active_departures])
-        except ReturnMenu:
-            raise ReturnMenu()
-        else:
-            bus_departure: Departure = get_bus_active_departure(selected_bus, active_departures) # гарантовано, що має бути лише один результат
-            bus_departure.finish_travel()
-            Park().add_bus(selected_bus)
-            selected_bus.status = BusStatusEnum.IN_THE_PARKING
-            return selected_bus
-    
-    
-    def set_route_for_bus(self, bus_list: list[Bus], 
-                                route_list: list[Route],
-                                active_departures: list[Departure]):
-        """Встановлює маршрут для обраного автобуса.
-
-        Параметри:
-            bus_list (list[Bus]): Список автобусів.
-            route_list (list[Route]): Список маршрутів.
-            active_departures (list[Departure]): Список активних рейсів.
-
-        Кроки:
-        1. Отримання обраного автобуса зі списку автобусів за допомогою функції get_object_from_suggested_options.
-        2. Отримання обраного маршруту зі списку маршрутів за допомогою функції get_object_from_suggested_options.
-        3. Перевірка, чи обраний автобус вже прив'язаний до обраного маршруту.
-            - Якщо так, повертається повідомлення про те, що зміни не внесено.
-        4. Виклик функції change_route з обраним автобусом, обраним маршрутом та списком активних рейсів.
-        5. Повернення повідомлення з результатом зміни маршруту.
-
-        Returns:
-            str: Сигнал з результатом зміни маршруту.
-
-        Raises:
-        1. ReturnMenu: Виключення, яке сигналізує про повернення до головного меню.
-        2. RouteSet: Сигнал з результатом встановлення маршруту.
-        3. RouteChangedDuringDeparture: Сигнал з результатом зміни маршруту під час відправлення.
-        4. SameRouteSelected: Сигнал з повідомленням, що обраний маршрут наразі актуальний. 
-        """
-        try:
-            selected_bus: Bus = get_object_from_suggested_options(bus_list)
-            selected_route: Route = get_object_from_suggested_options(route_list)
-        except ReturnMenu:
-            raise ReturnMenu()
-        
-        if selected_bus.route == selected_route:
-            raise SameRouteSelected("[!] Обрано один й той самий маршрут для автобусу, ніяких змін не внесено.")
-
-        try:
-            self.change_route(selected_bus, selected_route, active_departures)
-        except RouteChangedDuringDeparture as ex:
-            raise RouteChangedDuringDeparture(str(ex))
-        except RouteSet as ex:
-            raise RouteSet(str(ex))
+        with self.registry.lock_bus(bus):
+            departure = self.registry.close_departure(bus)
+            if departure is None:
+                raise CommandRejected(f"[!] {bus} не знаходиться у дорозі!")
+            Park().add_bus(bus)
+        return departure
 
 
-    def change_route(self, bus: Bus, route: Route, active_departures: list[Departure]):
-        """Змінює маршрут для обраного автобуса.
+    def change_route(self, bus: Bus, route: Route) -> Departure | None:
+        """Змінює маршрут для автобуса.
 
         Параметри:
-            bus (Bus): Обраний автобус.
-            route (Route): Обраний маршрут.
-            active_departures (list[Departure]): Список активних рейсів.
+            bus (Bus): Автобус.
+            route (Route): Новий маршрут.
 
         Кроки:
-        1. Отримання активного рейсу для обраного автобуса за допомогою функції get_bus_active_departure.
-        2. Якщо активний рейс існує:
-            - Завершення активного рейсу за допомогою виклику методу finish_travel об'єкту активного рейсу.
-            - Додавання автобуса у парк за допомогою виклику методу add_bus класу Park.
-            - Оновлення повідомлення про зміну маршруту.
-        3. Зміна маршруту для обраного автобуса.
-        4. Повернення повідомлення з результатом зміни маршруту.
+        1. Під блокуванням структури та автобуса - перевірка, що маршрут існує
+           та автобус ще не прив'язаний до обраного маршруту.
+        2. Завершення активного рейсу автобуса за допомогою методу close_departure реєстру.
+        3. Зміна маршруту для автобуса за допомогою методу set_bus_route реєстру.
+        4. Якщо активний рейс існував - додавання автобуса у парк за допомогою виклику методу add_bus класу Park,
+           інакше - оновлення маршруту автобуса у парку методом change_bus_route.
+
+        Returns:
+            Departure | None: Рейс, зупинений через зміну маршруту, або None.
 
         Raises:
-        1. RouteSet: Сигнал з результатом встановлення маршруту.
-        2. RouteChangedDuringDeparture: Сигнал з результатом зміни маршруту під час відправлення.
+            SameRouteSelected: Сигнал з повідомленням, що обраний маршрут наразі актуальний. 
+            CommandRejected: Автобус або маршрут видалено іншим терміналом.
         """
-        bus_active_departure = get_bus_active_departure(bus, active_departures)
-
-        if bus_active_departure:
-            bus_active_departure.finish_travel()
-            Park().add_bus(bus)
-            raise RouteChangedDuringDeparture(f"Маршрут автобусу було змінено з '{bus.route}' на '{route}', а рейс зупинено!\nАвтобус повернено у парк.")   
-        bus.route = route
-        raise RouteSet(f"Встановлено '{route}'!")
+        with self.registry.structure_lock, self.registry.lock_bus(bus):
+            if route.id not in self.registry.routes:
+                raise CommandRejected(f"[!] {route} вже видалено!")
+            if bus.route == route:
+                raise SameRouteSelected("[!] Обрано один й той самий маршрут для автобусу, ніяких змін не внесено.")
+
+            bus_active_departure = self.registry.close_departure(bus)
+            self.registry.set_bus_route(bus, route)
+            if bus_active_departure:
+                Park().add_bus(bus)
+            else:
+                Park().change_bus_route(bus)
+        return bus_active_departure
+
+
+@instrument_methods("manager")
+class Manager:
+    def __init__(self, registry: FleetRegistry):
+        self.registry = registry
 
 
-class Manager:
-    def create_bus(self, bus_list: list[Bus]) -> Bus:
-        """Створює новий автобус.
+    def create_bus(self, number: str, first_name: str, second_name: str, trusted: bool = False) -> Bus:
+        """Створює новий автобус та додає його до парку.
 
         Параметри:
-            bus_list (list[Bus]): Список існуючих автобусів.
+            number (str): Номер автобуса.
+            first_name (str): Ім'я водія.
+            second_name (str): Прізвище водія.
+            trusted (bool): Дані отримано з довіреного джерела, моделі створюються без валідації.
 
         Кроки:
-        1. Отримання від користувача номеру автобусу, імені та прізвища водія за допомогою функції input.
-        2. Перевірка, чи автобус з введеним номером вже існує у списку існуючих автобусів.
-            - Якщо так, виведення повідомлення про те, що автобус з таким номером вже існує і повторення процесу створення автобуса.
-        3. Створення об'єкту водія за допомогою введених імені та прізвища.
-        4. Створення об'єкту автобуса з отриманим номером та створеним об'єктом водія.
-        5. Повернення створеного автобуса.
+        1. Створення об'єкту водія та об'єкту автобуса.
+        2. Під блокуванням структури реєстру - перевірка, чи автобус з таким номером вже існує у реєстрі.
+        3. Додавання автобуса до парку за допомогою виклику методу add_bus класу Park.
+        4. Реєстрація автобуса у реєстрі.
 
         Returns:
             Bus: Створений автобус.
+
+        Raises:
+            CommandRejected: Автобус з таким номером вже існує.
         """
-        bus_number, driver_first_name, driver_second_name = (
-            input("Введіть номер автобусу: "),
-            input("Введіть ім'я водія: "),
-            input("Введіть фамілію водія: ")
-        )
-        if bus_number in (bus.number for bus in bus_list):
-            print("\n\n[!] Автобус з таким номером вже існує!")
-            return self.create_bus(bus_list)
-        driver = Driver(first_name = driver_first_name, second_name = driver_second_name)
-        bus = Bus(number = bus_number, driver = driver)
+        if trusted:
+            bus = Bus.construct(number = number, driver = Driver.construct(first_name = first_name, second_name = second_name))
+        else:
+            bus = Bus(number = number, driver = Driver(first_name = first_name, second_name = second_name))
+        with self.registry.structure_lock:
+            if self.registry.get_bus(number) is not None:
+                raise CommandRejected("[!] Автобус з таким номером вже існує!")
+            Park().add_bus(bus)
+            self.registry.add_bus(bus)
         return bus
     
     
-    def delete_bus(self, bus_list: list[Bus], active_departures: list[Departure]):
-        """Видаляє обраний автобус.
+    def delete_bus(self, bus: Bus):
+        """Видаляє автобус.
 
         Параметри:
-            bus_list (list[Bus]): Список автобусів.
-            active_departures (list[Departure]): Список активних рейсів.
+            bus (Bus): Автобус для видалення.
 
         Кроки:
-        1. Отримання обраного автобуса зі списку автобусів за допомогою функції get_object_from_suggested_options.
-        2. Отримання активного рейсу для обраного автобуса за допомогою функції get_bus_active_departure.
-        3. Якщо активний рейс існує:
-            - Завершення активного рейсу за допомогою виклику методу finish_travel об'єкту активного рейсу.
-            - Видалення обраного автобуса зі списку автобусів.
-        4. Інакше:
-            - Видалення обраного автобуса зі списку автобусів у парку за допомогою виклику методу remove_bus класу Park.
-
-        Raises:
-            ReturnMenu: Виключення, яке сигналізує про повернення до головного меню.
+        1. Під блокуванням структури та автобуса - завершення активного рейсу автобуса за допомогою методу close_departure реєстру.
+        2. Якщо активного рейсу не було - видалення автобуса з парку за допомогою виклику методу remove_bus класу Park.
+        3. Видалення автобуса з реєстру.
         """
-        try:
-            selected_bus = get_object_from_suggested_options(bus_list)
-        except ReturnMenu:
-            raise ReturnMenu()
-        else:
-            selected_bus_active_departure: Departure = get_bus_active_departure(selected_bus,
-                                                                                active_departures)
-            if selected_bus_active_departure:
-                selected_bus_active_departure.finish_travel()
-                return
-            bus_list.remove(selected_bus)
-            Park().remove_bus(selected_bus)
+        with self.registry.structure_lock, self.registry.lock_bus(bus):
+            if not self.registry.close_departure(bus):
+                Park().remove_bus(bus)
+            self.registry.remove_bus(bus)
     
     
-    def create_route(self) -> Route:
+    def create_route(self, start_point: str, end_point: str, trusted: bool = False) -> Route:
         """Створює новий маршрут.
 
+        Параметри:
+            start_point (str): Назва початкової точки.
+            end_point (str): Назва кінцевої точки.
+            trusted (bool): Дані отримано з довіреного джерела, маршрут створюється без валідації.
+
         Кроки:
-        1. Отримання початкової та кінцевої точок маршруту від користувача за допомогою функції input.
-        2. Створення об'єкту міста для початкової точки за допомогою отриманих даних.
-        3. Створення об'єкту міста для кінцевої точки за допомогою отриманих даних.
-        4. Створення об'єкту маршруту з отриманими об'єктами міст.
+        1. Отримання об'єктів міст для початкової та кінцевої точок (City.intern - одне місто на назву).
+        2. Створення об'єкту маршруту з отриманими об'єктами міст.
+        3. Під блокуванням структури реєстру - реєстрація маршруту у реєстрі.
 
         Returns:
             Route: Створений маршрут.
         """
-        start_point, end_point = (
-            City(title = input("Початкова точка: ")),
-            City(title = input("Кінцева точка: "))
-        )
-        return Route(start_point = start_point, end_point = end_point)
+        model = Route.construct if trusted else Route
+        route = model(start_point = City.intern(start_point), end_point = City.intern(end_point))
+        with self.registry.structure_lock:
+            self.registry.add_route(route)
+        return route
 
     
-    def delete_route(self, 
-                     route_list: list[Route], 
-                     bus_list: list[Bus],
-                     active_departures: list[Departure]):
-        """Видаляє обраний маршрут.
+    def delete_route(self, route: Route):
+        """Видаляє маршрут.
 
         Параметри:
-            route_list (list[Route]): Список маршрутів.
-            bus_list (list[Bus]): Список автобусів.
-            active_departures (list[Departure]): Список активних рейсів.
+            route (Route): Маршрут для видалення.
 
         Кроки:
-        1. Отримання обраного маршруту зі списку маршрутів за допомогою функції get_object_from_suggested_options.
-        2. Перебір автобусів, які обслуговують обраний маршрут.
-            - Отримання активного рейсу для кожного автобуса за допомогою функції get_bus_active_departure.
-            - Якщо активний рейс існує:
-                - Завершення активного рейсу за допомогою виклику методу finish_travel об'єкту активного рейсу.
-                - Додавання автобуса у парк за допомогою виклику методу add_bus класу Park.
-            - Скидання маршруту для кожного автобуса шляхом присвоєння значення None атрибуту route.
-        3. Видалення обраного маршруту зі списку маршрутів.
-
-        Raises:
-            ReturnMenu: Виключення, яке сигналізує про повернення до головного меню.
+        1. Під блокуванням структури реєстру - перебір автобусів, які обслуговують маршрут (індекс реєстру),
+           кожен автобус змінюється під своїм блокуванням.
+            - Завершення активного рейсу автобуса за допомогою методу close_departure реєстру.
+            - Скидання маршруту для кожного автобуса за допомогою методу set_bus_route реєстру.
+            - Якщо активний рейс існував - додавання автобуса у парк за допомогою виклику методу add_bus класу Park,
+              інакше - оновлення маршруту автобуса у парку методом change_bus_route.
+        2. Видалення маршруту з реєстру.
         """
-        try:
-            selected_route: Route = get_object_from_suggested_options(route_list)
-        except ReturnMenu:
-            raise ReturnMenu()
-        else:
-            for bus in get_route_buses(selected_route, bus_list):
-                bus_departure: Departure = get_bus_active_departure(bus, active_departures)
-                if bus_departure:
-                    bus_departure.finish_travel()
-                    Park().add_bus(bus)
-                bus.route = None
-            route_list.remove(selected_route)
+        with self.registry.structure_lock:
+            if route.id not in self.registry.routes:
+                raise CommandRejected(f"[!] {route} вже видалено!")
+            for bus in self.registry.get_route_buses(route):
+                with self.registry.lock_bus(bus):
+                    departure = self.registry.close_departure(bus)
+                    self.registry.set_bus_route(bus, None)
+                    if departure:
+                        Park().add_bus(bus)
+                    else:
+                        Park().change_bus_route(bus)
+            self.registry.remove_route(route)
+
+
+@instrument_methods("analytic")
+class Analytic:
+    def __init__(self, registry: FleetRegistry):
+        self.registry = registry
 
 
-class Analytic:
-    def get_active_departures(self, departure_list: list[Departure]) -> list[Departure]:
-        """Повертає список активних рейсів.
+    def get_active_departures(self) -> list[Departure]:
+        """Повертає список активних рейсів (рейсів, у яких час прибуття не вказаний).
 
-        Параметри:
-            departure_list (list[Departure]): Список рейсів.
+        Якщо до реєстру під'єднано сховище SQLite, рейси читаються зі сховища за індексом часу прибуття.
 
         Returns:
-            list[Departure]: Список активних рейсів (рейсів, у яких час прибуття не вказаний).
+            list[Departure]: Список активних рейсів.
         """
-        return list(
-            filter(lambda departure: departure.arrival_time is None, departure_list)
-        )
+        store = self.registry.store
+        if store is None:
+            return self.registry.get_active_departures()
+        return [Departure.construct(bus = self.registry.get_bus_by_id(bus_id),
+                                    route = self.registry.get_route_by_key(route_key),
+                                    departed_ns = departure_time * 1_000)
+                for bus_id, route_key, departure_time in store.get_active_departures()]
 
 
-    def get_departed_buses(self, departure_list: list[Departure]) -> list[Bus]:
+    def get_departed_buses(self) -> list[Bus]:
         """Повертає список автобусів, що вирушили у рейс.
 
-        Параметри:
-            departure_list (list[Departure]): Список рейсів.
-
         Returns:
             list[Bus]: Список автобусів, що вирушили у рейс.
         """
-        return [departure.bus for departure in self.get_active_departures(departure_list)]
+        return self.registry.get_buses_by_status(BusStatusEnum.ON_THE_ROAD)
     
     
-    def get_not_departed_buses(self, 
-                               departure_list: list[Bus], 
-                               buses_tied_to_route: list[Bus]) -> list[Bus]:
-        """Повертає список автобусів, які ще не вирушили у рейс.
-
-        Параметри:
-            departure_list (list[Bus]): Список автобусів, що знаходяться у рейсі.
-            buses_tied_to_route (list[Bus]): Список автобусів, пов'язаних з маршрутом.
+    def get_not_departed_buses(self) -> list[Bus]:
+        """Повертає список автобусів, пов'язаних з маршрутом, які ще не вирушили у рейс.
 
         Returns:
             list[Bus]: Список автобусів, які ще не вирушили у рейс.
         """
-        return list(
-            filter(lambda bus: bus not in self.get_departed_buses(departure_list), buses_tied_to_route)
-        )
+        return self.registry.get_not_departed_buses()
     
     
-    def get_buses_tied_to_route(self, bus_list: list[Bus]) -> list[Bus]:
+    def get_buses_tied_to_route(self) -> list[Bus]:
         """Повертає список автобусів, які пов'язані з маршрутом.
 
+        Returns:
+            list[Bus]: Список автобусів, які пов'язані з маршрутом.
+        """
+        return self.registry.get_buses_tied_to_route()
+
+
+    def search_buses(self, query: str, limit: int = SEARCH_LIMIT) -> list[Bus]:
+        """Шукає автобуси за початком або частиною номера та імені водія (пошуковий індекс реєстру).
+
         Параметри:
-            bus_list (list[Bus]): Список автобусів.
+            query (str): Текст запиту.
+            limit (int): Найбільша кількість автобусів.
 
         Returns:
-            list[Bus]: Список автобусів, які пов'язані з маршрутом.
+            list[Bus]: Знайдені автобуси: спочатку збіги за початком слова, потім - за входженням.
+        """
+        return self.registry.search_buses(query, limit)
+
+
+    def search_cities(self, query: str, limit: int = SEARCH_LIMIT) -> list[City]:
+        """Шукає міста мережі маршрутів за початком або частиною назви.
+
+        Returns:
+            list[City]: Знайдені міста.
+        """
+        return self.registry.search_cities(query, limit)
+
+
+    def search_routes(self, query: str, limit: int = SEARCH_LIMIT) -> list[Route]:
+        """Шукає маршрути, що проходять через міста, знайдені за початком або частиною назви.
+
+        Returns:
+            list[Route]: Знайдені маршрути.
+        """
+        return self.registry.search_routes(query, limit)
+
+
+    def iter_buses(self,
+                   route: Route | None = None,
+                   driver: str | None = None,
+                   status: BusStatusEnum | None = None,
+                   number_prefix: str | None = None) -> Iterator[Bus]:
+        """Повертає генератор автобусів у порядку створення, відфільтрованих функцією filter_buses.
+
+        Якщо задано маршрут або статус, автобуси читаються з відповідного індексу реєстру,
+        а не з усього автопарку. Генератор працює з копією індексу, тож зміни автопарку під час перегляду
+        не переривають його.
+
+        Returns:
+            Iterator[Bus]: Генератор автобусів.
         """
-        return list(
-            filter(lambda bus: bus.route is not None, bus_list)
-        ) 
+        if route is not None:
+            buses = self.get_route_buses(route)
+        elif status is not None:
+            buses = self.registry.get_buses_by_status(status)
+        else:
+            buses = list(self.registry.buses.values())
+        return filter_buses(buses, route, driver, status, number_prefix)
+
+
+    def iter_active_departures(self,
+                               route: Route | None = None,
+                               driver: str | None = None,
+                               number_prefix: str | None = None) -> Iterator[Departure]:
+        """Повертає генератор активних рейсів, автобуси яких відповідають умовам функції filter_buses.
+
+        Returns:
+            Iterator[Departure]: Генератор активних рейсів.
+        """
+        for departure in self.get_active_departures():
+            if next(filter_buses((departure.bus,), route, driver, None, number_prefix), None) is not None:
+                yield departure
+
+
+    def get_route_buses(self, route: Route) -> list[Bus]:
+        """Повертає список автобусів, які обслуговують заданий маршрут.
+
+        Параметри:
+            route (Route): Маршрут.
+
+        Якщо до реєстру під'єднано сховище SQLite, автобуси читаються зі сховища за індексом маршруту.
+
+        Returns:
+            list[Bus]: Список автобусів, які обслуговують заданий маршрут.
+        """
+        store = self.registry.store
+        if store is None:
+            return self.registry.get_route_buses(route)
+        return [self.registry.get_bus_by_id(bus_id) for bus_id in store.get_route_bus_ids(route.id)]
     
     
-    def analyze_buses(self, bus_list: list[Bus], departure_list: list[Departure]) -> list[BusDepartureResults]:
-        """Аналізує автобуси і повертає результати аналізу.
+    def analyze_buses(self) -> list[BusDepartureSummary]:
+        """Повертає підсумки рейсів для кожного автобуса, відсортовані за номером.
+
+        Підсумки накопичуються у реєстрі під час відправлення та повернення автобусів,
+        тому аналіз не переглядає історію рейсів. До загального часу додається час
+        активного рейсу автобуса; тривалість усіх активних рейсів рахується від одного зчитування годинника.
+        Якщо до реєстру під'єднано сховище SQLite, підсумки обчислюються одним запитом до сховища
+        (агрегування рейсів кожного автобуса за первинним ключем рейсів), тобто за всю історію у сховищі.
+
+        Returns:
+            list[BusDepartureSummary]: Список підсумків рейсів автобусів.
+        """
+        results = []
+        now = current_ns()
+        store = self.registry.store
+        if store is not None:
+            for bus_id, trip_count, finished_time, open_time in store.get_bus_summaries(now // 1_000):
+                finished_time, open_time = timedelta(microseconds = finished_time), timedelta(microseconds = open_time)
+                results.append(BusDepartureSummary(bus = self.registry.get_bus_by_id(bus_id),
+                                                   total_count = trip_count,
+                                                   total_time = finished_time + open_time,
+                                                   finished_time = finished_time,
+                                                   open_time = open_time))
+            return results
+        for bus, trip_count, finished_time in sorted(self.registry.get_buses_totals(), key = lambda totals: totals[0].number):
+            active_departure = self.registry.get_bus_active_departure(bus)
+            open_time = ns_to_timedelta(active_departure.travel_ns(now)) if active_departure else timedelta()
+            results.append(BusDepartureSummary(bus = bus,
+                                               total_count = trip_count,
+                                               total_time = finished_time + open_time,
+                                               finished_time = finished_time,
+                                               open_time = open_time))
+        return results
+
+
+    def analyze_buses_in_period(self, start: datetime, end: datetime,
+                                partition: PartitionEnum = PartitionEnum.TIME,
+                                workers: int = ANALYTICS_WORKERS) -> list[BusDepartureSummary]:
+        """Повертає підсумки рейсів кожного автобуса, відправлених у період [start, end), відсортовані за номером.
+
+        На відміну від analyze_buses, підсумки за період не накопичуються, тому переглядається вся історія рейсів
+        реєстру. Якщо історія містить не менше PARALLEL_MIN_ROWS рейсів і workers більше 1, вона ділиться
+        на частини (за автобусами або на проміжки часу - partition), які агрегуються у пулі процесів
+        (див. aggregate_in_processes), інакше - у поточному процесі тією самою функцією aggregate_bus_totals,
+        тож результат не залежить від режиму. Активний рейс, відправлений у період, додається до підсумків
+        автобуса, як і в analyze_buses.
 
         Параметри:
-            bus_list (list[Bus]): Список автобусів.
-            departure_list (list[Departure]): Список рейсів.
+            start (datetime): Початок періоду.
+            end (datetime): Кінець періоду (не включно).
+            partition (PartitionEnum): Спосіб поділу історії між процесами.
+            workers (int): Кількість процесів.
 
         Returns:
-            list[BusDepartureResults]: Список результатів аналізу автобусів.
+            list[BusDepartureSummary]: Список підсумків рейсів автобусів за період.
         """
-        sorted_buses = sorted(bus_list, key = lambda bus: bus.number)
+        now = current_ns()
+        period_start, period_end = to_microseconds(start), to_microseconds(end)
+        if partition is PartitionEnum.BUS:
+            (bus_ids, _, departure_times, arrival_times), bus_rows = self.registry.get_history_columns_by_bus()
+        else:
+            (bus_ids, _, departure_times, arrival_times), bus_rows = self.registry.get_history_columns(), None
+        columns = (bus_ids, departure_times, arrival_times)
+        if workers > 1 and len(bus_ids) >= PARALLEL_MIN_ROWS:
+            totals = aggregate_in_processes(columns, period_start, period_end, workers, bus_rows)
+        else:
+            totals = aggregate_bus_totals(*columns, period_start, period_end)
+
         results = []
-        for bus in sorted_buses:
-            total_count = 0
-            total_time = timedelta()
-            bus_results_kwargs = {"bus": bus, "departures": []}
-
-            for departure in filter(lambda departure: departure.bus == bus, departure_list):
-                total_count += 1
-                total_time += departure.travel_time
-                bus_results_kwargs["departures"].append(
-                    departure
-                )
-            bus_results_kwargs.update({
-                "total_count": total_count,
-                "total_time": total_time
-            })
-            results.append(BusDepartureResults(**bus_results_kwargs))
-        return results
\ No newline at end of file
+        for bus in sorted(self.registry.buses.values(), key = lambda bus: bus.number):
+            trip_count, finished_time = totals.get(bus.id, (0, 0))
+            finished_time, open_time = timedelta(microseconds = finished_time), timedelta()
+            active_departure = self.registry.get_bus_active_departure(bus)
+            if active_departure and period_start <= active_departure.departed_ns // 1_000 < period_end:
+                trip_count += 1
+                open_time = ns_to_timedelta(active_departure.travel_ns(now))
+            results.append(BusDepartureSummary(bus = bus,
+                                               total_count = trip_count,
+                                               total_time = finished_time + open_time,
+                                               finished_time = finished_time,
+                                               open_time = open_time))
+        return results
+
+
+    def analyze_bus(self, bus: Bus) -> BusDepartureResults:
+        """Повертає детальні результати рейсів обраного автобуса.
+
+        Завершені рейси читаються безпосередньо з колонок історії за номерами рядків автобуса,
+        до них додається активний рейс автобуса (якщо він є).
+
+        Параметри:
+            bus (Bus): Автобус.
+
+        Returns:
+            BusDepartureResults: Рейси автобуса, що зберігаються в історії, та їх підсумки.
+        """
+        departures = [
+            DepartureRecord.construct(route = self.registry.get_route_by_key(route_key),
+                                      departed_us = departure_time,
+                                      arrived_us = arrival_time)
+            for route_key, departure_time, arrival_time in self.registry.get_bus_history(bus)
+        ]
+        active_departure = self.registry.get_bus_active_departure(bus)
+        if active_departure:
+            departures.append(DepartureRecord.construct(route = active_departure.route,
+                                                        departed_us = active_departure.departed_ns // 1_000,
+                                                        arrived_us = None))
+        now = current_ns() // 1_000
+        return BusDepartureResults(bus = bus,
+                                   departures = departures,
+                                   total_count = len(departures),
+                                   total_time = timedelta(microseconds = sum(departure.travel_us(now)
+                                                                             for departure in departures)))
+
+
+    def travel_time_report(self, 
+                           group_by: ReportGroupEnum,
+                           bucket: timedelta = timedelta(hours = 1),
+                           percentiles: tuple[float, ...] = (50, 90, 99)) -> list[TravelTimeStats]:
+        """Повертає статистику часу у дорозі за завершеними рейсами історії, згруповану за автобусом,
+        маршрутом, водієм або періодом часу.
+
+        Групування виконується за колонками історії одним проходом функції group_travel_times
+        (векторизовано, якщо встановлено NumPy).
+
+        Параметри:
+            group_by (ReportGroupEnum): Ознака групування.
+            bucket (timedelta): Розмір періоду часу для групування за часом відправлення.
+            percentiles (tuple[float, ...]): Перцентилі часу у дорозі (0-100).
+
+        Returns:
+            list[TravelTimeStats]: Кількість, сумарний, середній, мінімальний, максимальний час
+            та перцентилі часу у дорозі для кожної групи.
+        """
+        bus_ids, route_keys, departure_times, arrival_times = self.registry.get_history_columns()
+        if group_by is ReportGroupEnum.BUS:
+            keys = bus_ids
+            label = lambda key: self.registry.get_bus_by_id(key).number
+        elif group_by is ReportGroupEnum.ROUTE:
+            keys = route_keys
+            label = lambda key: str(self.registry.get_route_by_key(key))
+        elif group_by is ReportGroupEnum.DRIVER:
+            driver_keys, bus_drivers = {}, {}
+            for bus_id, bus in self.registry.get_known_buses().items():
+                name = f"{bus.driver.first_name} {bus.driver.second_name}"
+                bus_drivers[bus_id] = driver_keys.setdefault(name, len(driver_keys))
+            keys = remap_keys(bus_ids, bus_drivers)
+            driver_names = list(driver_keys)
+            label = lambda key: driver_names[key]
+        else:
+            keys = bucket_keys(departure_times, bucket // timedelta(microseconds = 1))
+            label = lambda key: from_microseconds(key).strftime('%Y-%m-%d %H:%M')
+
+        return [
+            TravelTimeStats(group = label(stats.key),
+                            count = stats.count,
+                            total_time = timedelta(microseconds = stats.total),
+                            mean_time = timedelta(microseconds = stats.total / stats.count),
+                            min_time = timedelta(microseconds = stats.minimum),
+                            max_time = timedelta(microseconds = stats.maximum),
+                            percentiles = {percentile: timedelta(microseconds = value)
+                                           for percentile, value in stats.percentiles.items()})
+            for stats in group_travel_times(keys, departure_times, arrival_times, percentiles)
+        ]
+
+
+    def get_recent_route_stats(self, now: datetime | None = None) -> list[RouteWindowStats]:
+        """Повертає показники рейсів маршрутів у ковзному вікні (за замовчуванням - останні 15 хвилин).
+
+        Показники накопичуються реєстром під час відправлення та повернення автобусів,
+        тому запит не переглядає історію рейсів.
+
+        Параметри:
+            now (datetime | None): Кінець вікна, за замовчуванням - поточний час.
+
+        Returns:
+            list[RouteWindowStats]: Кількість відправлень, завершених рейсів та час у дорозі для кожного маршруту.
+        """
+        now = to_microseconds(now or current_time())
+        sliding_window, _ = self.registry.get_window_totals(now)
+        return self._window_stats(*sliding_window)
+
+
+    def get_periodic_route_stats(self, now: datetime | None = None) -> list[RouteWindowStats]:
+        """Повертає показники рейсів маршрутів у послідовних вікнах (за замовчуванням - погодинно за останню добу).
+
+        Параметри:
+            now (datetime | None): Поточний час, відносно якого відкидаються застарілі вікна.
+
+        Returns:
+            list[RouteWindowStats]: Показники маршрутів для кожного вікна, від старішого до новішого.
+        """
+        _, tumbling_windows = self.registry.get_window_totals(to_microseconds(now or current_time()))
+        return [stats for window in tumbling_windows for stats in self._window_stats(*window)]
+
+
+    def get_reachable_cities(self, city: City) -> list[City]:
+        """Повертає міста, до яких можна дістатися з заданого міста маршрутами станції (з пересадками).
+
+        Параметри:
+            city (City): Місто відправлення.
+
+        Returns:
+            list[City]: Досяжні міста, відсортовані за назвою.
+        """
+        return list(self.registry.network.reachable_cities(city))
+
+
+    def plan_route(self, start_point: City, end_point: City,
+                   criterion: PlanCriterionEnum = PlanCriterionEnum.HOPS) -> RoutePlan | None:
+        """Шукає шлях між містами мережею маршрутів та автобуси, якими його можна проїхати.
+
+        Шлях шукається з найменшою кількістю ділянок (пересадок) або з найменшим сумарним середнім часом у дорозі,
+        де середній час маршруту обчислюється за завершеними рейсами історії. Шляхи кешуються мережею
+        до зміни маршрутів (та до оновлення середнього часу - кожні ROUTE_TIMES_REFRESH відправлень),
+        а автобуси маршрутів кожної ділянки читаються з реєстру під час запиту.
+
+        Параметри:
+            start_point (City): Місто відправлення.
+            end_point (City): Місто прибуття.
+            criterion (PlanCriterionEnum): Критерій вибору шляху.
+
+        Returns:
+            RoutePlan | None: Ділянки шляху з маршрутами, автобусами та середнім часом або None, якщо шляху немає.
+        """
+        network = self.registry.network
+        default_time = DEFAULT_ROUTE_TIME // timedelta(microseconds = 1)
+        if criterion is PlanCriterionEnum.TIME:
+            legs = network.fastest_legs(start_point, end_point, self.registry.total_trips // ROUTE_TIMES_REFRESH,
+                                        self._mean_route_times, default_time)
+        else:
+            legs = network.fewest_legs(start_point, end_point)
+        if legs is None:
+            return None
+
+        plan_legs = []
+        for leg_start, leg_end, routes in legs:
+            route_times = [time for route in routes if (time := network.get_route_time(route)) is not None]
+            plan_legs.append(RoutePlanLeg(start_point = leg_start,
+                                          end_point = leg_end,
+                                          routes = list(routes),
+                                          buses = [bus for route in routes for bus in self.registry.get_route_buses(route)],
+                                          mean_time = timedelta(microseconds = min(route_times)) if route_times else None))
+        known_times = [leg.mean_time for leg in plan_legs if leg.mean_time is not None]
+        return RoutePlan(start_point = start_point,
+                         end_point = end_point,
+                         criterion = criterion,
+                         legs = plan_legs,
+                         total_time = sum(known_times, timedelta()) if len(known_times) == len(plan_legs) else None)
+
+
+    def _mean_route_times(self) -> dict[int, int]:
+        """Повертає середній час завершених рейсів історії у мікросекундах за ключем маршруту."""
+        _, route_keys, departure_times, arrival_times = self.registry.get_history_columns()
+        totals: dict[int, list[int]] = {}
+        for route_key, departure_time, arrival_time in zip(route_keys, departure_times, arrival_times):
+            route_totals = totals.get(route_key)
+            if route_totals is None:
+                route_totals = totals[route_key] = [0, 0]
+            route_totals[0] += arrival_time - departure_time
+            route_totals[1] += 1
+        return {route_key: travel_time // count for route_key, (travel_time, count) in totals.items()}
+
+
+    def _window_stats(self, window_start: int, window_end: int, window: dict[int, WindowTotals]) -> list[RouteWindowStats]:
+        return [
+            RouteWindowStats(route = self.registry.get_route_by_key(route_key),
+                             window_start = from_microseconds(window_start),
+                             window_end = from_microseconds(window_end),
+                             started_count = totals.started,
+                             finished_count = totals.finished,
+                             total_time = timedelta(microseconds = totals.travel_time),
+                             mean_time = timedelta(microseconds = totals.travel_time / totals.finished)
+                                         if totals.finished else None)
+            for route_key, totals in sorted(window.items())
+        ]
@@ -0,0 +1,64 @@
+import os
+import sys
+import time
+import unittest
+from datetime import (datetime,
+                      timedelta,
+                      timezone)
+
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.dirname(os.path.abspath(__file__))), "buspark"))
+
+from station import AutoStation
+from clock import (ManualClock,
+                   set_clock)
+from serializers import to_primitive
+
+
+class AnalyzeBusTest(unittest.TestCase):
+    """Перевіряє детальні результати рейсів автобуса."""
+
+    @classmethod
+    def setUpClass(cls):
+        cls.station = AutoStation()
+        cls.commands = cls.station.commands
+        cls.route_key = cls.commands.create_route("Житомир", "Рівне")
+
+
+    def setUp(self):
+        self.timezone = os.environ.get("TZ")
+        os.environ["TZ"] = "Europe/Kyiv"
+        time.tzset()
+        # 03:10 за київським часом у ніч переходу на зимовий час; через годину годинник знову показує 03:10.
+        self.clock = ManualClock(datetime(2026, 10, 25, 0, 10, tzinfo = timezone.utc))
+        self.previous_clock = set_clock(self.clock)
+
+
+    def tearDown(self):
+        set_clock(self.previous_clock)
+        if self.timezone is None:
+            del os.environ["TZ"]
+        else:
+            os.environ["TZ"] = self.timezone
+        time.tzset()
+
+
+    def test_travel_time_across_dst_change(self):
+        self.commands.create_bus("DST1", "Іван", "Петренко")
+        self.commands.set_route_for_bus("DST1", self.route_key)
+        self.commands.depart_bus("DST1")
+        self.clock.advance(timedelta(hours = 1))
+        self.commands.return_bus_to_park("DST1")
+        self.commands.depart_bus("DST1")
+        self.clock.advance(timedelta(minutes = 30))
+
+        results = self.commands.analyze_bus("DST1")
+        first, active = results.departures
+        self.assertEqual(first.departure_time, first.arrival_time)
+        self.assertEqual(first.travel_time, timedelta(hours = 1))
+        self.assertEqual(active.travel_time, timedelta(minutes = 30))
+        self.assertEqual(results.total_time, timedelta(hours = 1, minutes = 30))
+        self.assertEqual(to_primitive(first)["departure_time"], first.departure_time.isoformat())
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,59 @@
+import os
+import sys
+import unittest
+from datetime import (datetime,
+                      timedelta)
+
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.dirname(os.path.abspath(__file__))), "buspark"))
+
+from clock import (ManualClock,
+                   current_ns,
+                   current_time,
+                   get_clock,
+                   use_clock)
+from models import Park
+from simulator import Simulation
+
+
+class ManualClockTest(unittest.TestCase):
+    """Перевіряє керований годинник та детермінованість симуляції з ним."""
+
+    def test_set_and_advance(self):
+        clock = ManualClock(datetime(2026, 3, 1, 12, 0, 0, 250))
+        previous = get_clock()
+        with use_clock(clock):
+            self.assertIs(get_clock(), clock)
+            self.assertEqual(current_time(), datetime(2026, 3, 1, 12, 0, 0, 250))
+            self.assertEqual(current_ns(), current_ns())
+            self.assertEqual(clock.advance(timedelta(minutes = 5)), datetime(2026, 3, 1, 12, 5, 0, 250))
+            clock.set(datetime(2026, 3, 2))
+            self.assertEqual(current_time(), datetime(2026, 3, 2))
+        self.assertIs(get_clock(), previous)
+
+
+    def test_simulation_is_deterministic(self):
+        park = Park()
+        parked = park.parked_buses
+        try:
+            runs = []
+            for _ in range(2):
+                simulation = Simulation(routes = 3, buses = 12, days = 2, timetable = 6, seed = 7)
+                report = simulation.run()
+                # Ідентифікатори автобусів та маршрутів видаються глобально, тому рейси порівнюються за номерами.
+                routes = {route.id: index for index, route in enumerate(simulation.routes)}
+                bus_ids, route_keys, departure_times, arrival_times = simulation.registry.history.columns()
+                trips = [(simulation.buses[bus_id].number, routes[route_key], departure_time, arrival_time)
+                         for bus_id, route_key, departure_time, arrival_time
+                         in zip(bus_ids, route_keys, departure_times, arrival_times)]
+                runs.append(((report["events"], report["trips"], report["scheduled_dispatches"],
+                              report["missed_departures"]), trips))
+        finally:
+            park.clear()
+            for bus in parked:
+                park.add_bus(bus)
+        self.assertGreater(runs[0][0][1], 0)
+        self.assertEqual(runs[0], runs[1])
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,87 @@
+import os
+import sys
+import tempfile
+import unittest
+
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.dirname(os.path.abspath(__file__))), "buspark"))
+
+from station import AutoStation
+from models import BusStatusEnum
+from journal import (EventJournal,
+                     read_events,
+                     replay_journal)
+from registry import FleetRegistry
+from signals import (CommandRejected,
+                     InvalidArguments)
+
+
+class ExecuteBatchTest(unittest.TestCase):
+    """Перевіряє пакетне виконання команд станції."""
+
+    @classmethod
+    def setUpClass(cls):
+        cls.station = AutoStation()
+        cls.commands = cls.station.commands
+
+
+    def test_rejected_commands_do_not_stop_batch(self):
+        route_key = self.commands.create_route("Ужгород", "Мукачево")
+        results = self.commands.execute_batch([
+            {"command": "create_bus", "number": "BT1", "first_name": "Іван", "second_name": "Петренко"},
+            {"command": "create_bus", "number": "BT1", "first_name": "Іван", "second_name": "Петренко"},
+            {"command": "set_route_for_bus", "number": "BT1", "route_key": route_key},
+            {"command": "depart_bus", "number": "BT1"},
+            {"command": "no_such_command"},
+        ])
+        self.assertEqual([isinstance(result, CommandRejected) for result in results], [False, True, False, False, True])
+        self.assertEqual(results[3].bus.number, "BT1")
+
+        results = self.commands.execute_batch([{"command": "depart_bus", "number": "BT404"},
+                                               {"command": "return_bus_to_park", "number": "BT1"}],
+                                              stop_on_error = True)
+        self.assertEqual(len(results), 1)
+        self.assertIs(self.commands.get_bus("BT1").status, BusStatusEnum.ON_THE_ROAD)
+
+
+    def test_malformed_items_are_rejected_one_by_one(self):
+        results = self.commands.execute_batch([
+            {"command": "create_route", "start_point": "Ужгород", "end_point": "Чоп"},
+            "abc",
+            5,
+            None,
+            {"command": "depart_bus", "number": [1]},
+            {"command": "depart_bus"},
+            {"command": "depart_bus", "number": "BT404", "extra": 1},
+            {"command": "set_route_for_bus", "number": "BT404", "route_key": True},
+            {"command": "list_buses", "route_key": None},
+        ])
+        self.assertIsInstance(results[0], int)
+        self.assertTrue(all(isinstance(result, InvalidArguments) for result in results[1:8]))
+        self.assertIsInstance(results[8], list)
+
+
+    def test_batch_is_journaled_once(self):
+        with tempfile.TemporaryDirectory() as directory:
+            path = os.path.join(directory, "station.journal")
+            journal = EventJournal(path, sync_interval = 60)
+            self.station.registry.journal = journal
+            try:
+                results = self.commands.execute_batch([
+                    {"command": "create_route", "start_point": "Ужгород", "end_point": "Берегове"},
+                    {"command": "create_bus", "number": "BT2", "first_name": "Олена", "second_name": "Коваль"},
+                    "abc",
+                ])
+            finally:
+                self.station.registry.journal = None
+                journal.close()
+            self.assertEqual(journal.events_written, 2)
+            self.assertEqual([event[0] for event in read_events(path)], ["journal", "route", "bus"])
+
+            registry = FleetRegistry()
+            replay_journal(path, registry)
+            self.assertEqual(list(registry.routes), [results[0]])
+            self.assertEqual(list(registry.buses), ["BT2"])
+
+
+if __name__ == "__main__":
+    unittest.main()
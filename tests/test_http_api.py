@@ -0,0 +1,195 @@
+import http.client
+import json
+import os
+import sys
+import threading
+import unittest
+from unittest import mock
+
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.dirname(os.path.abspath(__file__))), "buspark"))
+
+from station import AutoStation
+from http_api import FleetHTTPServer
+
+
+class FleetHTTPServerTest(unittest.TestCase):
+    """Перевіряє HTTP API станції на сервері, запущеному у тому ж процесі на вільному порту."""
+
+    @classmethod
+    def setUpClass(cls):
+        cls.station = AutoStation()
+        cls.server = FleetHTTPServer(("127.0.0.1", 0), cls.station)
+        cls.thread = threading.Thread(target = cls.server.serve_forever, daemon = True)
+        cls.thread.start()
+        cls.route_key = cls.station.commands.create_route("Київ", "Львів")
+
+
+    @classmethod
+    def tearDownClass(cls):
+        cls.server.shutdown()
+        cls.server.server_close()
+        cls.thread.join()
+
+
+    def setUp(self):
+        self.connection = http.client.HTTPConnection(*self.server.server_address, timeout = 10)
+
+
+    def tearDown(self):
+        self.connection.close()
+
+
+    def request(self, method: str, path: str, body = None, headers: dict | None = None):
+        self.connection.request(method, path, body = None if body is None else json.dumps(body), headers = headers or {})
+        response = self.connection.getresponse()
+        data = response.read()
+        return response, json.loads(data) if data else None
+
+
+    def create_buses(self, prefix: str, count: int) -> list[str]:
+        numbers = [f"{prefix}{index:03}" for index in range(count)]
+        response, results = self.request("POST", "/batch/buses", {
+            "buses": [{"number": number, "first_name": "Іван", "second_name": "Петренко"} for number in numbers]
+        })
+        self.assertEqual(response.status, 200)
+        self.assertTrue(all(result["ok"] for result in results))
+        response, results = self.request("POST", "/batch", {"commands": [
+            {"command": "set_route_for_bus", "number": number, "route_key": self.route_key} for number in numbers
+        ]})
+        self.assertTrue(all(result["ok"] for result in results))
+        return numbers
+
+
+    def test_bulk_create_reports_each_command(self):
+        response, results = self.request("POST", "/batch/buses", {"buses": [
+            {"number": "BULK1", "first_name": "Іван", "second_name": "Петренко"},
+            {"number": "BULK1", "first_name": "Іван", "second_name": "Петренко"},
+            {"number": "BULK2", "first_name": "Олена", "second_name": "Коваль"},
+        ]})
+        self.assertEqual(response.status, 200)
+        self.assertEqual([result["ok"] for result in results], [True, False, True])
+        self.assertEqual(results[0]["result"]["number"], "BULK1")
+        self.assertIn("error", results[1])
+
+        self.request("POST", "/buses/BULK2/route", {"route_key": self.route_key})
+        response, results = self.request("POST", "/batch/depart", {"numbers": ["BULK2", "BULK404"]})
+        self.assertEqual([result["ok"] for result in results], [True, False])
+
+
+    def test_pagination(self):
+        numbers = self.create_buses("PAGE", 25)
+        response, page = self.request("GET", "/buses?number_prefix=PAGE&offset=20&limit=10")
+        self.assertEqual(response.status, 200)
+        self.assertEqual(page["total"], 25)
+        self.assertEqual((page["offset"], page["limit"]), (20, 10))
+        self.assertEqual([bus["number"] for bus in page["items"]], numbers[20:])
+
+        collected, offset = [], 0
+        while True:
+            _, page = self.request("GET", f"/buses?number_prefix=PAGE&offset={offset}&limit=7")
+            if not page["items"]:
+                break
+            collected.extend(bus["number"] for bus in page["items"])
+            offset += 7
+        self.assertEqual(collected, numbers)
+
+        for query in ("limit=0", "offset=-1", "limit=abc"):
+            response, body = self.request("GET", f"/buses?{query}")
+            self.assertEqual(response.status, 400, query)
+            self.assertIn("error", body)
+
+
+    def test_etag_not_modified_until_state_changes(self):
+        self.create_buses("ETAG", 2)
+        response, _ = self.request("GET", "/buses?number_prefix=ETAG")
+        etag = response.getheader("ETag")
+        self.assertIsNotNone(etag)
+
+        response, body = self.request("GET", "/buses?number_prefix=ETAG", headers = {"If-None-Match": etag})
+        self.assertEqual(response.status, 304)
+        self.assertIsNone(body)
+
+        self.request("POST", "/buses/ETAG000/depart")
+        response, page = self.request("GET", "/buses?number_prefix=ETAG", headers = {"If-None-Match": etag})
+        self.assertEqual(response.status, 200)
+        self.assertNotEqual(response.getheader("ETag"), etag)
+        self.assertEqual(page["items"][0]["status"], "У дорозі")
+
+
+    def test_etag_differs_between_server_runs(self):
+        response, _ = self.request("GET", "/routes")
+        etag = response.getheader("ETag")
+        with mock.patch.object(self.server, "epoch", "restarted"):
+            response, body = self.request("GET", "/routes", headers = {"If-None-Match": etag})
+        self.assertEqual(response.status, 200)
+        self.assertIsNotNone(body)
+        self.assertNotEqual(response.getheader("ETag"), etag)
+
+
+    def test_invalid_content_length_closes_connection(self):
+        for length in ("-1", "abc", "1_0"):
+            connection = http.client.HTTPConnection(*self.server.server_address, timeout = 10)
+            connection.putrequest("POST", "/batch")
+            connection.putheader("Content-Length", length)
+            connection.endheaders()
+            response = connection.getresponse()
+            self.assertEqual(response.status, 400, length)
+            self.assertIn("error", json.loads(response.read()))
+            self.assertTrue(response.will_close)
+            connection.close()
+
+
+    def test_keep_alive(self):
+        self.request("GET", "/routes")
+        sock = self.connection.sock
+        self.assertIsNotNone(sock)
+        for path in ("/buses?limit=1", "/park?limit=1", "/buses/NOPE", "/routes"):
+            self.request("GET", path)
+        self.assertIs(self.connection.sock, sock)
+
+
+    def test_error_statuses(self):
+        self.create_buses("ERR", 1)
+        cases = [
+            ("POST", "/buses", {"number": "ERR100"}, 400),
+            ("POST", "/buses", {"number": "ERR100", "driver": "Іван"}, 400),
+            ("GET", "/buses/ERR404", None, 404),
+            ("GET", "/unknown", None, 404),
+            ("POST", "/buses", {"number": "ERR000", "first_name": "Іван", "second_name": "Петренко"}, 409),
+            ("POST", "/buses/ERR000/return", None, 409),
+        ]
+        for method, path, body, status in cases:
+            response, result = self.request(method, path, body)
+            self.assertEqual(response.status, status, (method, path, body))
+            self.assertIn("error", result)
+
+
+    def test_malformed_batch_items_are_rejected_one_by_one(self):
+        response, results = self.request("POST", "/batch", {"commands": [
+            {"command": "create_route", "start_point": "Одеса", "end_point": "Херсон"},
+            "abc",
+            {"command": "depart_bus", "number": [1]},
+            5,
+            {"command": "set_route_for_bus", "number": "NOPE", "route_key": True},
+            {"command": "list_routes"},
+        ]})
+        self.assertEqual(response.status, 200)
+        self.assertEqual([result["ok"] for result in results], [True, False, False, False, False, True])
+        self.assertTrue(all("error" in result for result in results[1:5]))
+
+
+    def test_unexpected_error_returns_json_500(self):
+        with mock.patch.object(self.server.commands, "list_routes", side_effect = RuntimeError("boom")), \
+                mock.patch("sys.stderr"):
+            response, body = self.request("GET", "/routes?limit=5")
+        self.assertEqual(response.status, 500)
+        self.assertEqual(response.getheader("Content-Type"), "application/json; charset=utf-8")
+        self.assertIn("error", body)
+        self.assertNotIn("boom", body["error"])
+
+        response, _ = self.request("GET", "/routes?limit=5")
+        self.assertEqual(response.status, 200)
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,73 @@
+import json
+import os
+import sys
+import tempfile
+import unittest
+
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.dirname(os.path.abspath(__file__))), "buspark"))
+
+from journal import (read_generation,
+                     replay_journal)
+from registry import FleetRegistry
+
+
+class ReplayJournalTest(unittest.TestCase):
+    """Перевіряє відновлення реєстру з журналу подій."""
+
+    def setUp(self):
+        self.directory = tempfile.TemporaryDirectory()
+        self.path = os.path.join(self.directory.name, "station.journal")
+
+
+    def tearDown(self):
+        self.directory.cleanup()
+
+
+    def write(self, *events):
+        with open(self.path, "w", encoding = "utf-8") as file:
+            file.writelines(json.dumps(event) + "\n" for event in events)
+
+
+    def test_replay(self):
+        self.write(["journal", 3],
+                   ["route", 900, "Київ", "Львів"],
+                   ["bus", "J1", "Іван", "Петренко", 900],
+                   ["set_route", "J1", 900],
+                   ["depart", "J1", 1_700_000_000_000_000_000],
+                   ["return", "J1", 1_700_003_600_000_000_000],
+                   ["depart", "J1", 1_700_007_200_000_000_000])
+        registry = FleetRegistry()
+        self.assertEqual(read_generation(self.path), 3)
+        self.assertEqual(replay_journal(self.path, registry, 4), 0)
+        self.assertEqual(replay_journal(self.path, registry, 3), 7)
+        self.assertEqual(len(registry.history), 1)
+        (route_key, departure_time, arrival_time), = registry.get_bus_history(registry.get_bus("J1"))
+        self.assertEqual((route_key, arrival_time - departure_time), (900, 3_600_000_000))
+        self.assertEqual(registry.get_bus_active_departure(registry.get_bus("J1")).departed_ns, 1_700_007_200_000_000_000)
+
+
+    def test_truncated_last_event_is_dropped(self):
+        self.write(["journal", 0], ["route", 901, "Київ", "Одеса"])
+        with open(self.path, "a", encoding = "utf-8") as file:
+            file.write('["route", 902, "Київ')
+        registry = FleetRegistry()
+        self.assertEqual(replay_journal(self.path, registry), 2)
+        self.assertEqual(list(registry.routes), [901])
+
+
+    def test_other_formats_are_rejected(self):
+        cases = [
+            (["route", 903, "Київ", "Львів"],),
+            (["journal", 0], ["route", 904, "Київ", "Львів"], ["bus", "J2", "Іван", "Петренко"]),
+            (["journal", 0], ["route", 905, "Київ", "Львів"], ["bus", "J3", "Іван", "Петренко", 905],
+             ["set_route", "J3", 905], ["depart", "J3", 1_000_000.5]),
+            (["journal", 0], ["unknown", 1]),
+        ]
+        for events in cases:
+            self.write(*events)
+            with self.assertRaises((ValueError, TypeError), msg = events):
+                replay_journal(self.path, FleetRegistry())
+
+
+if __name__ == "__main__":
+    unittest.main()
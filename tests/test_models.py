@@ -0,0 +1,113 @@
+import os
+import sys
+import threading
+import unittest
+
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.dirname(os.path.abspath(__file__))), "buspark"))
+
+from models import (Bus,
+                    City,
+                    Driver,
+                    Park,
+                    Route)
+
+
+def make_bus(number: str, route: Route | None = None) -> Bus:
+    return Bus(number = number, driver = Driver(first_name = "Іван", second_name = "Петренко"), route = route)
+
+
+class ParkTest(unittest.TestCase):
+    """Перевіряє порядок автобусів у парку та підрахунок автобусів маршрутів."""
+
+    def setUp(self):
+        self.park = Park()
+        self.parked = self.park.parked_buses
+        self.park.clear()
+
+
+    def tearDown(self):
+        self.park.clear()
+        for bus in self.parked:
+            self.park.add_bus(bus)
+
+
+    def test_singleton(self):
+        self.assertIs(Park(), self.park)
+
+
+    def test_order_of_arrival(self):
+        buses = [make_bus(f"PK{index}") for index in range(4)]
+        for bus in buses:
+            self.park.add_bus(bus)
+        self.park.add_bus(buses[0])
+        self.assertEqual(self.park.parked_buses, buses)
+
+        self.park.remove_bus(buses[1])
+        self.park.remove_bus(buses[1])
+        self.park.add_bus(buses[1])
+        self.assertEqual(self.park.parked_buses, [buses[0], buses[2], buses[3], buses[1]])
+        self.assertEqual(len(self.park), 4)
+        self.assertIn(buses[1], self.park)
+
+
+    def test_locked_buses_without_copy(self):
+        buses = [make_bus(f"PK{index}") for index in range(20, 23)]
+        for bus in buses:
+            self.park.add_bus(bus)
+        added = threading.Event()
+
+        def add():
+            self.park.add_bus(make_bus("PK23"))
+            added.set()
+
+        with self.park.locked_buses() as parked_buses:
+            self.assertEqual(list(parked_buses), buses)
+            thread = threading.Thread(target = add)
+            thread.start()
+            self.assertFalse(added.wait(0.1))
+            self.assertEqual(len(parked_buses), 3)
+        thread.join()
+        self.assertEqual(len(self.park), 4)
+
+
+    def test_route_counts(self):
+        route = Route(start_point = City.intern("Чернігів"), end_point = City.intern("Ніжин"))
+        other = Route(start_point = City.intern("Чернігів"), end_point = City.intern("Прилуки"))
+        first, second = make_bus("PK10", route), make_bus("PK11", route)
+        self.park.add_bus(first)
+        self.park.add_bus(second)
+        self.assertEqual(self.park.count_route_buses(route), 2)
+
+        second.route = other
+        self.park.change_bus_route(second)
+        self.park.remove_bus(first)
+        self.assertEqual((self.park.count_route_buses(route), self.park.count_route_buses(other)), (0, 1))
+
+
+class CityInternTest(unittest.TestCase):
+    """Перевіряє, що місто з однією назвою - один об'єкт, зокрема при створенні з кількох потоків."""
+
+    def test_same_object(self):
+        self.assertIs(City.intern("Вінниця"), City.intern("Вінниця"))
+        self.assertIsNot(City.intern("Вінниця"), City.intern("Хмельницький"))
+
+
+    def test_concurrent_intern(self):
+        barrier = threading.Barrier(8)
+        cities = []
+
+        def intern():
+            barrier.wait()
+            cities.append(City.intern("Кременчук"))
+
+        threads = [threading.Thread(target = intern) for _ in range(8)]
+        for thread in threads:
+            thread.start()
+        for thread in threads:
+            thread.join()
+        self.assertEqual(len({id(city) for city in cities}), 1)
+        self.assertEqual(len({city.id for city in cities}), 1)
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,105 @@
+import json
+import os
+import random
+import sys
+import tempfile
+import unittest
+from array import array
+from datetime import datetime
+from unittest import mock
+
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.dirname(os.path.abspath(__file__))), "buspark"))
+
+import parallel_analytics
+import workers
+from parallel_analytics import (aggregate_bus_totals,
+                                aggregate_in_processes,
+                                merge_bus_totals,
+                                partition_buses,
+                                partition_rows)
+from journal import replay_journal
+from models import PartitionEnum
+from registry import FleetRegistry
+
+
+MINUTE = 60_000_000
+START = 1_700_000_000_000_000
+
+
+def make_columns(rows: int, buses: int, seed: int = 3) -> tuple[array, array, array]:
+    generator = random.Random(seed)
+    bus_ids, departure_times, arrival_times = array('q'), array('q'), array('q')
+    moment = START
+    for _ in range(rows):
+        moment += generator.randrange(MINUTE)
+        bus_ids.append(generator.randrange(buses))
+        departure_times.append(moment)
+        arrival_times.append(moment + generator.randrange(1, 120) * MINUTE)
+    return bus_ids, departure_times, arrival_times
+
+
+class ParallelAnalyticsTest(unittest.TestCase):
+    """Перевіряє, що паралельна агрегація дає той самий результат, що й послідовна."""
+
+    @classmethod
+    def tearDownClass(cls):
+        parallel_analytics.shutdown_executors()
+
+
+    def test_partitions(self):
+        self.assertEqual(partition_rows(10, 3), [(0, 3), (3, 6), (6, 10)])
+        self.assertEqual(partition_rows(2, 4), [(0, 1), (1, 2)])
+        bus_rows = {1: array('q', range(5)), 2: array('q', range(3)), 3: array('q', range(2))}
+        self.assertEqual(partition_buses(bus_rows, 2), [[1], [2, 3]])
+        self.assertEqual(merge_bus_totals([{1: (1, 5)}, {1: (2, 5), 2: (1, 1)}]), {1: (3, 10), 2: (1, 1)})
+
+
+    def test_parallel_equals_serial(self):
+        columns = make_columns(5_000, 40)
+        bus_ids = columns[0]
+        bus_rows = {}
+        for row, bus_id in enumerate(bus_ids):
+            bus_rows.setdefault(bus_id, array('q')).append(row)
+        start, end = columns[1][1_000], columns[1][4_000]
+
+        with mock.patch.object(parallel_analytics, "np", None):
+            serial = aggregate_bus_totals(*columns, start, end)
+        self.assertEqual(sum(count for count, _ in serial.values()), 3_000)
+        self.assertEqual(aggregate_bus_totals(*columns, start, end), serial)
+        self.assertEqual(aggregate_in_processes(columns, start, end, 2), serial)
+        self.assertEqual(aggregate_in_processes(columns, start, end, 3, bus_rows), serial)
+        self.assertEqual(aggregate_bus_totals(*columns, end, start), {})
+
+
+    def test_analyze_buses_in_period(self):
+        bus_ids, departure_times, arrival_times = make_columns(600, 12, seed = 5)
+        events = [["journal", 0], ["route", 990, "Київ", "Чернігів"]]
+        for bus_id in range(12):
+            events += [["bus", f"PA{bus_id:02}", "Іван", "Петренко", 9_900 + bus_id], ["set_route", f"PA{bus_id:02}", 990]]
+        # Рейси одного автобуса не перекриваються: кожен наступний починається після прибуття попереднього.
+        available = {}
+        for bus_id, departure_time, arrival_time in zip(bus_ids, departure_times, arrival_times):
+            duration = arrival_time - departure_time
+            departure_time = max(departure_time, available.get(bus_id, 0) + 1)
+            arrival_time = departure_time + duration
+            available[bus_id] = arrival_time
+            events += [["depart", f"PA{bus_id:02}", departure_time * 1_000], ["return", f"PA{bus_id:02}", arrival_time * 1_000]]
+
+        registry = FleetRegistry()
+        with tempfile.TemporaryDirectory() as directory:
+            path = os.path.join(directory, "station.journal")
+            with open(path, "w", encoding = "utf-8") as file:
+                file.writelines(json.dumps(event) + "\n" for event in events)
+            replay_journal(path, registry)
+        analytic = workers.Analytic(registry)
+        start, end = datetime.fromtimestamp(START / 1e6), datetime.fromtimestamp(max(available.values()) / 1e6)
+
+        serial = analytic.analyze_buses_in_period(start, end, workers = 1)
+        self.assertGreater(sum(summary.total_count for summary in serial), 0)
+        with mock.patch.object(workers, "PARALLEL_MIN_ROWS", 1):
+            for partition in PartitionEnum:
+                self.assertEqual(analytic.analyze_buses_in_period(start, end, partition, workers = 2), serial)
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,74 @@
+import os
+import sys
+import unittest
+
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.dirname(os.path.abspath(__file__))), "buspark"))
+
+from models import (City,
+                    Route)
+from route_network import RouteNetwork
+
+
+HOUR = 3_600_000_000
+
+
+def make_route(start_point: str, end_point: str) -> Route:
+    return Route(start_point = City.intern(start_point), end_point = City.intern(end_point))
+
+
+class RouteNetworkTest(unittest.TestCase):
+    """Перевіряє пошук шляхів у мережі маршрутів."""
+
+    def setUp(self):
+        self.network = RouteNetwork()
+        self.direct = make_route("Обухів", "Фастів")
+        self.first = make_route("Обухів", "Бровари")
+        self.second = make_route("Бровари", "Фастів")
+        self.separate = make_route("Ізюм", "Балаклія")
+        for route in (self.direct, self.first, self.second, self.separate):
+            self.network.add_route(route)
+        self.city = City.intern
+
+
+    def cities(self, legs) -> list[str]:
+        return [legs[0][0].title] + [leg[1].title for leg in legs]
+
+
+    def test_reachable_cities(self):
+        self.assertEqual([city.title for city in self.network.reachable_cities(self.city("Фастів"))], ["Бровари", "Обухів"])
+        self.assertEqual([city.title for city in self.network.reachable_cities(self.city("Ізюм"))], ["Балаклія"])
+
+
+    def test_fewest_legs(self):
+        legs = self.network.fewest_legs(self.city("Обухів"), self.city("Фастів"))
+        self.assertEqual(self.cities(legs), ["Обухів", "Фастів"])
+        self.assertEqual(legs[0][2], (self.direct,))
+        self.assertIsNone(self.network.fewest_legs(self.city("Обухів"), self.city("Ізюм")))
+
+        self.network.remove_route(self.direct)
+        self.assertEqual(self.cities(self.network.fewest_legs(self.city("Фастів"), self.city("Обухів"))),
+                         ["Фастів", "Бровари", "Обухів"])
+
+
+    def test_fastest_legs(self):
+        times = {self.direct.id: 5 * HOUR, self.first.id: HOUR, self.second.id: HOUR}
+        legs = self.network.fastest_legs(self.city("Обухів"), self.city("Фастів"), 1, lambda: times, HOUR)
+        self.assertEqual(self.cities(legs), ["Обухів", "Бровари", "Фастів"])
+        self.assertEqual(self.network.get_route_time(self.first), HOUR)
+
+        times = {self.direct.id: HOUR}
+        # Та сама епоха - час не завантажується знову, шлях береться з кешу.
+        legs = self.network.fastest_legs(self.city("Обухів"), self.city("Фастів"), 1, lambda: times, HOUR)
+        self.assertEqual(len(legs), 2)
+        legs = self.network.fastest_legs(self.city("Обухів"), self.city("Фастів"), 2, lambda: times, HOUR)
+        self.assertEqual(self.cities(legs), ["Обухів", "Фастів"])
+
+
+    def test_removed_city_leaves_network(self):
+        self.network.remove_route(self.separate)
+        self.assertIsNone(self.network.get_city("Ізюм"))
+        self.assertEqual([city.title for city in self.network.get_cities()], ["Бровари", "Обухів", "Фастів"])
+
+
+if __name__ == "__main__":
+    unittest.main()
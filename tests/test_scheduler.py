@@ -0,0 +1,59 @@
+import os
+import sys
+import unittest
+from datetime import (datetime,
+                      time)
+
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.dirname(os.path.abspath(__file__))), "buspark"))
+
+from station import AutoStation
+from clock import (ManualClock,
+                   use_clock)
+from models import ScheduleStatusEnum
+
+
+class DepartureSchedulerTest(unittest.TestCase):
+    """Перевіряє відправлення за розкладом викликами tick у заданий час."""
+
+    @classmethod
+    def setUpClass(cls):
+        cls.station = AutoStation()
+        cls.scheduler = cls.station.scheduler
+
+
+    def tick(self, route, *moment) -> list:
+        return [(dispatch.planned_time.time(), dispatch.status, dispatch.departure and dispatch.departure.bus.number)
+                for dispatch in self.scheduler.tick(datetime(*moment))
+                if dispatch.planned_departure.route is route]
+
+
+    def test_ticks(self):
+        commands = self.station.commands
+        with use_clock(ManualClock(datetime(2030, 5, 4, 7, 0))):
+            route = self.station.registry.routes[commands.create_route("Луцьк", "Ковель")]
+            commands.create_bus("SCH1", "Іван", "Петренко")
+            commands.set_route_for_bus("SCH1", route.id)
+            commands.schedule_departure(route.id, "07:30")
+            commands.schedule_departure(route.id, "07:40")
+            self.assertEqual(self.scheduler.next_due(), datetime(2030, 5, 4, 7, 30))
+
+            self.assertEqual(self.tick(route, 2030, 5, 4, 7, 29), [])
+            self.assertEqual(self.tick(route, 2030, 5, 4, 7, 30),
+                             [(time(7, 30), ScheduleStatusEnum.DISPATCHED, "SCH1")])
+            # Єдиний автобус маршруту у дорозі: відправлення о 07:40 чекає, доки затримка не перевищить max_delay.
+            self.assertEqual(self.tick(route, 2030, 5, 4, 7, 40), [])
+            self.assertEqual(self.tick(route, 2030, 5, 4, 7, 50), [])
+            self.assertEqual(self.tick(route, 2030, 5, 4, 7, 56), [(time(7, 40), ScheduleStatusEnum.MISSED, None)])
+
+            commands.return_bus_to_park("SCH1")
+            self.assertEqual(self.tick(route, 2030, 5, 5, 7, 30),
+                             [(time(7, 30), ScheduleStatusEnum.DISPATCHED, "SCH1")])
+            commands.return_bus_to_park("SCH1")
+            planned_departure = self.station.registry.get_timetable()[-1]
+            self.assertEqual(planned_departure.departs_at, time(7, 40))
+            commands.cancel_scheduled_departure(planned_departure.id)
+            self.assertEqual(self.tick(route, 2030, 5, 5, 7, 45), [])
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,64 @@
+import os
+import sys
+import unittest
+
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.dirname(os.path.abspath(__file__))), "buspark"))
+
+from search_index import (RESORT_THRESHOLD,
+                          SearchIndex,
+                          normalize)
+
+
+class SearchIndexTest(unittest.TestCase):
+    """Перевіряє пошук за префіксом, за входженням та оновлення індексу."""
+
+    def setUp(self):
+        self.index = SearchIndex()
+        for key, text in enumerate(("AA1234 Іван Петренко", "AB7777 Олена Коваль", "BC0001 Іван Коваленко")):
+            self.index.add(key, text, text.split()[0])
+
+
+    def test_normalize(self):
+        self.assertEqual(normalize("  Іван   ПЕТРЕНКО "), "іван петренко")
+
+
+    def test_prefix_then_substring(self):
+        self.assertEqual(self.index.search("іва"), ["AA1234", "BC0001"])
+        self.assertEqual(self.index.search("іван ков"), ["BC0001"])
+        self.assertEqual(self.index.search("a"), ["AA1234", "AB7777"])
+        # "вал" не є початком жодного слова: об'єкти знаходяться за триграмами у порядку тексту.
+        self.assertEqual(self.index.search("вал"), ["AB7777", "BC0001"])
+        self.assertEqual(self.index.search("коваль"), ["AB7777"])
+        self.assertEqual(self.index.search("ZZZ"), [])
+        self.assertEqual(self.index.search("  "), [])
+
+
+    def test_limit_and_accept(self):
+        self.assertEqual(self.index.search("іван", limit = 1), ["AA1234"])
+        self.assertEqual(self.index.search("іван", limit = 0), [])
+        self.assertEqual(self.index.search("іван", accept = lambda item: item.startswith("B")), ["BC0001"])
+
+
+    def test_replace_and_remove(self):
+        self.index.add(0, "AA1234 Марія Шевчук", "AA1234")
+        self.assertEqual(self.index.search("петренко"), [])
+        self.assertEqual(self.index.search("шевч"), ["AA1234"])
+        self.index.remove(1)
+        self.index.remove(404)
+        self.assertEqual(self.index.search("коваль"), [])
+        self.assertEqual(len(self.index), 2)
+        self.assertNotIn(1, self.index)
+
+
+    def test_bulk_add(self):
+        for key in range(3, 3 + RESORT_THRESHOLD * 2):
+            self.index.add(key, f"ZX{key:04} Водій", f"ZX{key:04}")
+        self.assertEqual(self.index.search("zx", limit = 3), ["ZX0003", "ZX0004", "ZX0005"])
+        for key in range(3, 3 + RESORT_THRESHOLD * 2):
+            self.index.remove(key)
+        self.assertEqual(self.index.search("zx"), [])
+        self.assertEqual(self.index.search("іван"), ["AA1234", "BC0001"])
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,68 @@
+import asyncio
+import json
+import os
+import sys
+import threading
+import unittest
+from unittest import mock
+
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.dirname(os.path.abspath(__file__))), "buspark"))
+
+from station import AutoStation
+from session_server import SessionServer
+
+
+class SessionServerTest(unittest.TestCase):
+    """Перевіряє обробку запитів сервером сесій без мережевого з'єднання."""
+
+    @classmethod
+    def setUpClass(cls):
+        cls.station = AutoStation()
+        cls.server = SessionServer(cls.station)
+
+
+    @classmethod
+    def tearDownClass(cls):
+        cls.server.executor.shutdown()
+        cls.server.analytics_executor.shutdown()
+
+
+    def process(self, command) -> dict:
+        line = command if isinstance(command, bytes) else json.dumps(command).encode("utf-8")
+        return json.loads(asyncio.run(self.server.process(line)))
+
+
+    def test_errors_are_replied_per_command(self):
+        self.assertFalse(self.process(b"not json")["ok"])
+        self.assertFalse(self.process({"command": "depart_bus", "number": [1]})["ok"])
+        for error in (ValueError("bad value"), TypeError("bad type")):
+            with mock.patch.object(self.server.commands, "list_routes", side_effect = error):
+                response = self.process({"command": "list_routes"})
+            self.assertFalse(response["ok"])
+            self.assertIn(str(error), response["error"])
+        self.assertTrue(self.process({"command": "list_routes"})["ok"])
+
+
+    def test_analytics_do_not_occupy_command_workers(self):
+        started, release = threading.Event(), threading.Event()
+
+        def slow_report(*arguments, **options):
+            started.set()
+            release.wait(10)
+            return []
+
+        async def run():
+            with mock.patch.object(self.server.commands, "analyze_buses", side_effect = slow_report):
+                reports = [asyncio.create_task(self.server.process(b'{"command": "analyze_buses"}'))
+                           for _ in range(self.server.executor._max_workers)]
+                await asyncio.get_running_loop().run_in_executor(None, started.wait, 10)
+                response = await asyncio.wait_for(self.server.process(b'{"command": "list_routes"}'), 5)
+                release.set()
+                await asyncio.gather(*reports)
+            return json.loads(response)
+
+        self.assertTrue(asyncio.run(run())["ok"])
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,107 @@
+import json
+import os
+import pickle
+import sys
+import tempfile
+import unittest
+from datetime import datetime
+
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.dirname(os.path.abspath(__file__))), "buspark"))
+
+from journal import replay_journal
+from registry import FleetRegistry
+from snapshot import (SNAPSHOT_MAGIC,
+                      read_snapshot,
+                      write_snapshot)
+
+
+HOUR = 3_600_000_000_000
+
+
+class SnapshotTest(unittest.TestCase):
+    """Перевіряє запис, читання та ущільнення знімку стану реєстру."""
+
+    def setUp(self):
+        self.directory = tempfile.TemporaryDirectory()
+        self.path = os.path.join(self.directory.name, "station.snapshot")
+
+
+    def tearDown(self):
+        self.directory.cleanup()
+
+
+    def registry(self) -> FleetRegistry:
+        journal_path = os.path.join(self.directory.name, "station.journal")
+        events = [["journal", 0],
+                  ["route", 950, "Київ", "Львів"],
+                  ["route", 951, "Київ", "Одеса"],
+                  ["route", 952, "Київ", "Харків"],
+                  ["bus", "N1", "Іван", "Петренко", 950],
+                  ["bus", "N2", "Олена", "Коваль", 951],
+                  ["set_route", "N1", 950],
+                  ["set_route", "N2", 951],
+                  ["depart", "N1", 1_700_000_000 * 10 ** 9],
+                  ["return", "N1", 1_700_000_000 * 10 ** 9 + HOUR],
+                  ["depart", "N2", 1_700_000_000 * 10 ** 9 + 2 * HOUR],
+                  ["plan", 950, 951, "08:30"]]
+        with open(journal_path, "w", encoding = "utf-8") as file:
+            file.writelines(json.dumps(event) + "\n" for event in events)
+        registry = FleetRegistry()
+        replay_journal(journal_path, registry)
+        return registry
+
+
+    def test_round_trip(self):
+        registry = self.registry()
+        state = registry.export_state()
+        write_snapshot(self.path, {"registry": state, "park": ["N1"]}, 7)
+        generation, restored = read_snapshot(self.path)
+        self.assertEqual(generation, 7)
+        self.assertEqual(restored["park"], ["N1"])
+
+        copy = FleetRegistry()
+        copy.restore_state(restored["registry"])
+        self.assertEqual(json.loads(json.dumps(copy.export_state(), default = bytes.hex)),
+                         json.loads(json.dumps(state, default = bytes.hex)))
+        self.assertEqual(copy.get_bus_history(copy.get_bus("N1")), registry.get_bus_history(registry.get_bus("N1")))
+
+
+    def test_other_files_are_rejected(self):
+        self.assertIsNone(read_snapshot(self.path))
+
+        class Payload:
+            def __reduce__(self):
+                return exec, ("raise SystemExit('executed')",)
+
+        for content in (b"BUSPARK-SNAPSHOT-1\n" + pickle.dumps(Payload()),
+                        SNAPSHOT_MAGIC + pickle.dumps(Payload()),
+                        SNAPSHOT_MAGIC + b'[4]\n{"generation":0,"state":{"$bytes":0}}\nabc',
+                        SNAPSHOT_MAGIC + b'[3]\n{"generation":0,"state":{"$bytes":1}}\nabc',
+                        SNAPSHOT_MAGIC + b'[-1]\n{"generation":0,"state":{}}\n'):
+            with open(self.path, "wb") as file:
+                file.write(content)
+            with self.assertRaises(ValueError, msg = content):
+                read_snapshot(self.path)
+
+
+    def test_compact_prunes_unreferenced_retired_routes(self):
+        registry = self.registry()
+        registry.windows.tumbling._windows.clear()
+        registry.windows.sliding._slots.clear()
+        registry.windows.sliding._totals.clear()
+        registry.set_bus_route(registry.get_bus("N1"), None)
+        for key in (950, 952):
+            registry.remove_route(registry.routes[key])
+
+        registry.compact(datetime.fromtimestamp(1_700_000_000))
+        self.assertEqual(str(registry.get_route_by_key(950)), "маршрут Київ - Львів")
+        with self.assertRaises(KeyError):
+            registry.get_route_by_key(952)
+
+        registry.compact(datetime.fromtimestamp(1_800_000_000))
+        self.assertEqual(len(registry.history), 0)
+        self.assertEqual(registry.export_state()["retired_routes"], [])
+
+
+if __name__ == "__main__":
+    unittest.main()
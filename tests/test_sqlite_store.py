@@ -0,0 +1,81 @@
+import os
+import sqlite3
+import sys
+import tempfile
+import unittest
+from array import array
+from unittest import mock
+
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.dirname(os.path.abspath(__file__))), "buspark"))
+
+from sqlite_store import SqliteStore
+
+
+HOUR = 3_600_000_000
+
+
+class SqliteStoreTest(unittest.TestCase):
+    """Перевіряє запис та читання сховища SQLite."""
+
+    def setUp(self):
+        self.directory = tempfile.TemporaryDirectory()
+        self.path = os.path.join(self.directory.name, "station.sqlite")
+        self.store = SqliteStore(self.path, flush_interval = 60)
+        self.store.add_route(1, "Київ", "Львів")
+        self.store.add_route(2, "Київ", "Одеса")
+        self.store.add_bus(10, "AA0001", "Іван", "Петренко", 1)
+        self.store.add_bus(11, "AA0002", "Олена", "Коваль", 1)
+
+
+    def tearDown(self):
+        self.store.close()
+        self.directory.cleanup()
+
+
+    def test_departures(self):
+        store = self.store
+        store.open_departure(10, 1, 0)
+        store.close_departure(10, 0, HOUR)
+        store.open_departure(10, 1, 2 * HOUR)
+        store.open_departure(11, 1, 3 * HOUR)
+        self.assertEqual(store.get_active_departures(), [(10, 1, 2 * HOUR), (11, 1, 3 * HOUR)])
+        self.assertEqual(store.get_bus_history(10), [(1, 0, HOUR)])
+        self.assertEqual(store.get_bus_summaries(4 * HOUR), [(10, 2, HOUR, 2 * HOUR), (11, 1, 0, HOUR)])
+
+        store.remove_bus(11)
+        store.set_bus_route(10, 2)
+        self.assertEqual(store.get_active_departures(), [(10, 1, 2 * HOUR)])
+        self.assertEqual(store.get_route_bus_ids(1), [])
+        self.assertEqual(store.get_route_bus_ids(2), [10])
+
+
+    def test_writes_are_idempotent(self):
+        columns = (array('q', [10, 10, 11]), array('q', [1, 1, 2]),
+                   array('q', [0, 2 * HOUR, HOUR]), array('q', [HOUR, 3 * HOUR, 2 * HOUR]))
+        for _ in range(2):
+            self.store.add_route(1, "Київ", "Львів")
+            self.store.add_bus(10, "AA0001", "Іван", "Петренко", 1)
+            self.store.add_departures(*columns)
+        self.assertEqual(self.store.count_departures(), 3)
+        self.assertEqual(self.store.get_bus_history(10), [(1, 0, HOUR), (1, 2 * HOUR, 3 * HOUR)])
+
+
+    def test_failed_flush_keeps_changes(self):
+        self.store.flush()
+        self.store.open_departure(10, 1, 0)
+        with mock.patch.object(self.store, "_execute", side_effect = sqlite3.OperationalError("database is locked")):
+            with self.assertRaises(sqlite3.OperationalError):
+                self.store.flush()
+        self.store.close_departure(10, 0, HOUR)
+        self.assertEqual(self.store.get_bus_history(10), [(1, 0, HOUR)])
+
+
+    def test_reopen(self):
+        self.store.open_departure(10, 1, 0)
+        self.store.close()
+        self.store = SqliteStore(self.path, flush_interval = 60)
+        self.assertEqual(self.store.get_active_departures(), [(10, 1, 0)])
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,74 @@
+import os
+import sys
+import unittest
+from unittest import mock
+
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.dirname(os.path.abspath(__file__))), "buspark"))
+
+from station import AutoStation
+from signals import CommandRejected
+
+
+class AutoStationMenuTest(unittest.TestCase):
+    """Перевіряє дії меню станції з підставленим введенням користувача."""
+
+    @classmethod
+    def setUpClass(cls):
+        cls.station = AutoStation()
+
+
+    def setUp(self):
+        self.route = self.station.registry.routes[self.station.commands.create_route("Суми", "Полтава")]
+
+
+    def run_action(self, action, answers):
+        answers = iter(answers)
+        with mock.patch("builtins.input", side_effect = lambda prompt = "": next(answers)), \
+                mock.patch("builtins.print"), \
+                mock.patch("station.get_object_from_suggested_options", return_value = self.route):
+            return action()
+
+
+    def test_create_route_rejection_returns_to_menu(self):
+        with mock.patch.object(self.station.commands, "create_route", side_effect = CommandRejected("[!] Відхилено")):
+            result = self.run_action(self.station.create_route, ["Суми", "Суми"])
+        self.assertEqual(result.message, "[!] Відхилено")
+
+
+    def test_schedule_departure_can_be_cancelled(self):
+        result = self.run_action(self.station.schedule_departure, ["25:99", "в"])
+        self.assertIsNone(result.message)
+        self.assertFalse(any(planned.route is self.route for planned in self.station.registry.get_timetable()))
+
+        result = self.run_action(self.station.schedule_departure, ["07:45"])
+        self.assertIn("додано до розкладу", result.message)
+
+
+    def test_schedule_departure_for_deleted_route_returns_to_menu(self):
+        prompts = []
+
+        def answer(prompt = ""):
+            # Інший термінал видаляє маршрут, поки користувач вводить час.
+            prompts.append(prompt)
+            if len(prompts) > 2:
+                raise AssertionError("Дія меню не повернулась після видалення маршруту")
+            if self.route.id in self.station.registry.routes:
+                self.station.commands.delete_route(self.route.id)
+            return "08:00"
+
+        with mock.patch("builtins.input", side_effect = answer), \
+                mock.patch("builtins.print"), \
+                mock.patch("station.get_object_from_suggested_options", return_value = self.route):
+            result = self.station.schedule_departure()
+        self.assertIsNotNone(result.message)
+        self.assertEqual(len(prompts), 1)
+
+
+    def test_checkpoint_without_journal(self):
+        self.assertIsNone(self.station.registry.journal)
+        self.assertIsNone(self.station.checkpoint())
+        self.assertFalse(self.station.checkpoint_if_needed())
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,75 @@
+import os
+import sys
+import unittest
+from datetime import timedelta
+
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.dirname(os.path.abspath(__file__))), "buspark"))
+
+from windows import (SlidingWindow,
+                     TumblingWindows)
+
+
+MINUTE = 60_000_000
+
+
+class TumblingWindowsTest(unittest.TestCase):
+    """Перевіряє погодинні (послідовні) вікна."""
+
+    def test_late_events(self):
+        windows = TumblingWindows(timedelta(minutes = 5), retention = 3)
+        windows.record_start(1, 0)
+        windows.record_start(1, 10 * MINUTE)
+        windows.record_finish(1, 0, 7 * MINUTE)
+        windows.record_finish(1, 0, 3 * MINUTE)
+        windows.record_start(2, -1 * MINUTE)
+
+        starts = [(start, {key: (totals.started, totals.finished, totals.travel_time) for key, totals in window.items()})
+                  for start, window in windows.windows(10 * MINUTE)]
+        self.assertEqual(starts, [(0, {1: (1, 1, 3 * MINUTE)}),
+                                  (5 * MINUTE, {1: (0, 1, 7 * MINUTE)}),
+                                  (10 * MINUTE, {1: (1, 0, 0)})])
+        self.assertEqual(windows.route_keys(), {1})
+
+
+    def test_expiry(self):
+        windows = TumblingWindows(timedelta(minutes = 5), retention = 2)
+        for minute in (0, 5, 10):
+            windows.record_start(minute, minute * MINUTE)
+        self.assertEqual([start for start, _ in windows.windows(10 * MINUTE)], [5 * MINUTE, 10 * MINUTE])
+        self.assertEqual([start for start, _ in windows.windows(20 * MINUTE)], [])
+
+
+class SlidingWindowTest(unittest.TestCase):
+    """Перевіряє ковзне вікно."""
+
+    def test_late_event_gets_missing_slot(self):
+        window = SlidingWindow(timedelta(minutes = 15), timedelta(minutes = 1))
+        window.record_start(1, 0)
+        window.record_start(1, 5 * MINUTE)
+        window.record_finish(1, 0, 3 * MINUTE)
+        window.record_finish(1, 0, 20 * MINUTE)
+        window.record_finish(2, 0, 3 * MINUTE)
+
+        totals = window.totals(20 * MINUTE)
+        self.assertEqual({key: (value.started, value.finished) for key, value in totals.items()}, {1: (0, 1)})
+        self.assertEqual(window.route_keys(), {1})
+
+        window.record_finish(2, 0, 10 * MINUTE)
+        totals = window.totals(20 * MINUTE)
+        self.assertEqual((totals[2].finished, totals[2].travel_time), (1, 10 * MINUTE))
+        self.assertEqual(window.totals(40 * MINUTE), {})
+
+
+    def test_totals_keep_late_slot_until_it_expires(self):
+        window = SlidingWindow(timedelta(minutes = 15), timedelta(minutes = 1))
+        window.record_start(1, 0)
+        window.record_start(1, 5 * MINUTE)
+        window.record_finish(1, 0, 3 * MINUTE)
+        self.assertEqual((window.totals(5 * MINUTE)[1].started, window.totals(5 * MINUTE)[1].finished), (2, 1))
+        self.assertEqual(window.totals(17 * MINUTE)[1].finished, 1)
+        self.assertEqual(window.totals(18 * MINUTE)[1].finished, 0)
+        self.assertEqual(window.totals(20 * MINUTE), {})
+
+
+if __name__ == "__main__":
+    unittest.main()